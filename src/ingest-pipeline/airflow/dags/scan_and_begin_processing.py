@@ -60,6 +60,12 @@ with DAG('scan_and_begin_processing',
         print('retcodes: ', retcode_dct)
         success = all([rc == 0 for rc in retcodes])
         ds_dir = ctx['lz_path']
+        profile_fname = os.path.join(utils.get_tmp_dir_path(kwargs['run_id']),
+                                     'scan_profile.json')
+        if os.path.exists(profile_fname):
+            # A summary of the scan's cost, for charting across submissions
+            with open(profile_fname, 'r') as f:
+                kwargs['ti'].xcom_push(key='scan_profile', value=json.load(f)['summary'])
         http_conn_id='ingest_api_connection'
         endpoint='/datasets/status'
         method='PUT'
@@ -131,6 +137,13 @@ with DAG('scan_and_begin_processing',
         print('response: ')
         pprint(response.json())
 
+    # The parsed-metadata cache is per host by default, so each worker host
+    # warms its own.  Setting MD_EXTRACT_CACHE_DIR in the workers' environment
+    # to a directory on shared storage lets them share one cache; SQLite then
+    # relies on that filesystem's POSIX locks (unreliable on some NFS setups),
+    # and the cache must stay in its default rollback journal mode, since WAL
+    # does not work across hosts.  Only the DAG's own user should be able to
+    # write there.
     t_run_md_extract = BashOperator(
         task_id='run_md_extract',
         bash_command=""" \
@@ -138,9 +151,16 @@ with DAG('scan_and_begin_processing',
         src_dir="{{dag_run.conf.src_path}}/md" ; \
         top_dir="{{dag_run.conf.src_path}}" ; \
         work_dir="{{tmp_dir_path(run_id)}}" ; \
+        cache_dir="${MD_EXTRACT_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/ingest-pipeline}" ; \
+        mkdir -p -m 700 "$cache_dir" ; \
         cd $work_dir ; \
         env PYTHONPATH=${PYTHONPATH}:$top_dir \
-        python $src_dir/metadata_extract.py --out ./rslt.yml --yaml "$lz_dir" \
+        python $src_dir/metadata_extract.py --out ./rslt.yml --yaml \
+          --cache "$cache_dir/md_extract_cache.sqlite" \
+          --fastq_sample 100000 --parse_processes 4 \
+          --profile ./scan_profile.json \
+          {{ '--profile_memory' if dag_run.conf.get('profile_memory') else '' }} \
+          "$lz_dir" \
           > ./session.log 2>&1 ; \
         echo $?
         """,
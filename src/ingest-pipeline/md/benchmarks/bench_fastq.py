@@ -0,0 +1,122 @@
+#! /usr/bin/env python
+
+"""
+Compare FASTQ statistics gathered record by record through the gzip module
+against FASTQMetadataFile, which works a decompressed buffer at a time, and
+time FASTQMetadataFile over several files serially and in a process pool.
+
+Usage:
+  python bench_fastq.py [--n_files N] [--n_reads N] [--read_len N]
+                        [--processes N] [--sample N] [--repeat N] [FILE ...]
+
+Without FILEs, --n_files gzipped FASTQ files are generated.  Time is the
+best of --repeat runs; peak memory of one parse is measured separately
+with tracemalloc.
+"""
+
+import sys
+import os
+import io
+import gzip
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_file_types.fastq_metadata_file import FASTQMetadataFile
+from synthetic_lz import write_fastq_gz
+
+
+def gzip_stats(fname):
+    n_reads = 0
+    lengths = Counter()
+    quality_sums = []
+    with gzip.open(fname, 'rb') as f:
+        for idx, line in enumerate(f):
+            if idx % 4 == 3:
+                qual = line.rstrip(b'\n')
+                n_reads += 1
+                lengths[len(qual)] += 1
+                if len(quality_sums) < len(qual):
+                    quality_sums.extend([0] * (len(qual) - len(quality_sums)))
+                for cycle, q in enumerate(qual):
+                    quality_sums[cycle] += q - 33
+    return n_reads, lengths, quality_sums
+
+
+def fastq_stats(fname):
+    with redirect_stdout(io.StringIO()):
+        return FASTQMetadataFile(fname).collect_metadata()
+
+
+def best_of(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(fun, fname):
+    tracemalloc.start()
+    fun(fname)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark FASTQ statistics')
+    parser.add_argument('files', nargs='*', help='gzipped FASTQ files')
+    parser.add_argument('--n_files', default=4, type=int)
+    parser.add_argument('--n_reads', default=100000, type=int)
+    parser.add_argument('--read_len', default=100, type=int)
+    parser.add_argument('--processes', default=os.cpu_count(), type=int)
+    parser.add_argument('--sample', default=None, type=int,
+                        help='also time sampling the first N reads')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    fnames = ns.files
+    if not fnames:
+        tmpdir = tempfile.mkdtemp()
+        fnames = [os.path.join(tmpdir, 'bench_{}_R1_001.fastq.gz'.format(idx))
+                  for idx in range(ns.n_files)]
+        for idx, fname in enumerate(fnames):
+            write_fastq_gz(fname, ns.n_reads, ns.read_len, seed=idx)
+    try:
+        print('{} files, {} compressed bytes'.format(
+            len(fnames), sum(os.path.getsize(fname) for fname in fnames)))
+        print('{:<24} {:>10} {:>14}'.format('method', 'best_sec', 'peak_bytes'))
+        sec = best_of(lambda: [gzip_stats(fname) for fname in fnames], ns.repeat)
+        print('{:<24} {:>10.4f} {:>14d}'.format('gzip per record', sec,
+                                               peak_memory(gzip_stats, fnames[0])))
+        sec = best_of(lambda: [fastq_stats(fname) for fname in fnames], ns.repeat)
+        print('{:<24} {:>10.4f} {:>14d}'.format('buffered, serial', sec,
+                                               peak_memory(fastq_stats, fnames[0])))
+        with ProcessPoolExecutor(max_workers=ns.processes) as executor:
+            sec = best_of(lambda: list(executor.map(fastq_stats, fnames)), ns.repeat)
+        print('{:<24} {:>10.4f}'.format('buffered, {} processes'.format(ns.processes), sec))
+        if ns.sample is not None:
+            FASTQMetadataFile.sample_reads = ns.sample
+            sec = best_of(lambda: [fastq_stats(fname) for fname in fnames], ns.repeat)
+            FASTQMetadataFile.sample_reads = None
+            print('{:<24} {:>10.4f}'.format('sample {} reads'.format(ns.sample), sec))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#! /usr/bin/env python
+
+"""
+Compare the cost of identifying a landing zone's collection type by
+probing each type's expected_files in turn against the cost of evaluating
+all the types' patterns with one MultiGlobMatcher walk.
+
+Usage:
+  python bench_glob_matcher.py [--dir DIR] [--n_dirs N] [--n_files N] [--delay_ms MS]
+
+Without --dir a temporary tree is built containing a metadata.tsv file
+and many subdirectories of other files, so that STANFORD_CODEX (which
+searches every subdirectory for its top file) and several other types
+probe and fail before a metadata.tsv type matches.  The first three modes
+use only the expected_files rules.  The last two identify the type as
+scan() does, with each type's test_match checks: 'test_match' calls it
+for every type in turn, and 'scan' calls it only for the types whose
+expected files the compiled matcher found.  --delay_ms adds an artificial
+delay to every directory read to mimic a network filesystem.
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+import glob
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dir_snapshot import DirSnapshot
+from glob_matcher import match_collection_types
+from metadata_extract import get_known_data_collection_types
+
+
+class DirReadCounter(object):
+    """
+    Wraps os.scandir to count (and optionally delay) directory reads
+    """
+    def __init__(self, delay_sec=0.0):
+        self.delay_sec = delay_sec
+        self.count = 0
+        self._scandir = os.scandir
+
+    def __enter__(self):
+        def scandir(*args, **kwargs):
+            self.count += 1
+            if self.delay_sec:
+                time.sleep(self.delay_sec)
+            return self._scandir(*args, **kwargs)
+        os.scandir = scandir
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        os.scandir = self._scandir
+
+
+def build_tree(topdir, n_dirs, n_files):
+    with open(os.path.join(topdir, 'bench-metadata.tsv'), 'w') as f:
+        f.write('assay_type\tdata_path\nbench\t.\n')
+    for d_idx in range(n_dirs):
+        subdir = os.path.join(topdir, 'raw_{:04d}'.format(d_idx), 'lane')
+        os.makedirs(subdir)
+        for f_idx in range(n_files):
+            open(os.path.join(subdir, 'file_{:05d}.dat'.format(f_idx)), 'w').close()
+
+
+def sequential_probe(path, collection_types):
+    """
+    The pre-snapshot behavior: each type finds its top directory and globs
+    each of its expected files against the disk, and the matching type globs
+    everything again to collect.
+    """
+    for collection_type in collection_types:
+        # A fresh unprefetched snapshot stands in for find_top's os.listdir calls
+        patterns = collection_type.get_file_patterns(path, DirSnapshot(path, max_depth=0))
+        if patterns is None:
+            continue
+        if all(any(glob.iglob(os.path.join(path, pattern)))
+               for pattern, _, expected in patterns if expected):
+            return collection_type, [fpath for pattern, _, _ in patterns
+                                     for fpath in glob.iglob(os.path.join(path, pattern))]
+    return None, []
+
+
+def snapshot_probe(path, collection_types):
+    """
+    Sequential probing against a fully prefetched DirSnapshot
+    """
+    snapshot = DirSnapshot(path)
+    for collection_type in collection_types:
+        patterns = collection_type.get_file_patterns(path, snapshot)
+        if patterns is None:
+            continue
+        if all(any(snapshot.iglob(os.path.join(path, pattern)))
+               for pattern, _, expected in patterns if expected):
+            return collection_type, [fpath for pattern, _, _ in patterns
+                                     for fpath in snapshot.iglob(os.path.join(path, pattern))]
+    return None, []
+
+
+def compiled_probe(path, collection_types):
+    """
+    One MultiGlobMatcher walk, reading only the directories the patterns reach
+    """
+    snapshot = DirSnapshot(path, max_depth=0)
+    rslt = match_collection_types(path, collection_types, snapshot)
+    for collection_type in collection_types:
+        if rslt[collection_type]['match']:
+            return collection_type, [os.path.join(path, relpath)
+                                     for relpath, _ in rslt[collection_type]['files']]
+    return None, []
+
+
+def collected_files(path, collection_type, snapshot):
+    return [fpath for pattern, _, _ in collection_type.get_file_patterns(path, snapshot)
+            for fpath in snapshot.iglob(os.path.join(path, pattern))]
+
+
+def test_match_probe(path, collection_types):
+    """
+    Each type's test_match in turn against an on-demand DirSnapshot
+    """
+    snapshot = DirSnapshot(path, max_depth=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for collection_type in collection_types:
+            if collection_type.test_match(path, snapshot):
+                return collection_type, collected_files(path, collection_type, snapshot)
+    return None, []
+
+
+def scan_probe(path, collection_types):
+    """
+    One MultiGlobMatcher walk, then test_match only for the candidates
+    """
+    snapshot = DirSnapshot(path, max_depth=0)
+    rslt = match_collection_types(path, collection_types, snapshot)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for collection_type in collection_types:
+            if rslt[collection_type]['match'] and collection_type.test_match(path, snapshot):
+                return collection_type, collected_files(path, collection_type, snapshot)
+    return None, []
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark collection type matching')
+    parser.add_argument('--dir', default=None, help='landing zone to test against')
+    parser.add_argument('--n_dirs', default=200, type=int)
+    parser.add_argument('--n_files', default=50, type=int)
+    parser.add_argument('--delay_ms', default=0.0, type=float)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.dir is None:
+        tmpdir = tempfile.mkdtemp()
+        build_tree(tmpdir, ns.n_dirs, ns.n_files)
+        path = tmpdir
+    else:
+        path = ns.dir
+    collection_types = get_known_data_collection_types()
+    try:
+        print('{:<12} {:>10} {:>10} {:>8}  {}'.format('mode', 'best_sec', 'dir_reads',
+                                                   'n_files', 'match'))
+        for mode, fun in [('sequential', sequential_probe),
+                          ('snapshot', snapshot_probe),
+                          ('compiled', compiled_probe),
+                          ('test_match', test_match_probe),
+                          ('scan', scan_probe)]:
+            best = None
+            for _ in range(ns.repeat):
+                with DirReadCounter(ns.delay_ms / 1000.0) as counter:
+                    t0 = time.perf_counter()
+                    match, files = fun(path, collection_types)
+                    elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            print('{:<12} {:>10.4f} {:>10d} {:>8d}  {}'.format(
+                mode, best, counter.count, len(files),
+                match.category_name if match else None))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+
+"""
+Report the import cost of metadata_extract, using python -X importtime.
+
+The 'lazy' case is what every scan now pays at startup.  The 'eager' case
+additionally imports every registered parser module, which is what
+importing data_file_types used to do.  Parser modules whose dependencies
+are missing in this environment are reported and skipped.
+
+Usage:
+  python bench_import_time.py [--top N] [--repeat N]
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+
+MD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MD_DIR)
+
+from data_file_types import FILE_TYPE_REGISTRY
+
+EAGER_SNIPPET = """
+import importlib
+import metadata_extract
+from data_file_types import FILE_TYPE_REGISTRY
+for key, (module_name, _, _) in sorted(FILE_TYPE_REGISTRY.items()):
+    try:
+        importlib.import_module(module_name, 'data_file_types')
+    except ImportError as e:
+        print('skipped {}: {}'.format(key, e))
+"""
+
+
+def run_importtime(snippet):
+    """
+    Returns (list of (self_us, cumulative_us, module name), stdout)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', snippet],
+                          cwd=MD_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    rslt = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        rslt.append((int(self_us), int(cum_us), name.rstrip()))
+    if proc.returncode:
+        raise RuntimeError('import failed:\n' + proc.stderr[-2000:])
+    return rslt, proc.stdout
+
+
+def import_depth(name):
+    # importtime indents the module name two spaces per level of nesting
+    return (len(name) - len(name.lstrip()) - 1) // 2
+
+
+def total_us(rows):
+    return sum(cum for _, cum, name in rows if import_depth(name) == 0)
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark metadata_extract import time')
+    parser.add_argument('--top', default=10, type=int,
+                        help='number of heaviest imports to list')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    cases = [('lazy', 'import metadata_extract'), ('eager', EAGER_SNIPPET)]
+    for label, snippet in cases:
+        best = None
+        for _ in range(ns.repeat):
+            rows, out = run_importtime(snippet)
+            if best is None or total_us(rows) < total_us(best):
+                best = rows
+        print('{}: {:.1f} ms total, {} modules'.format(label, total_us(best) / 1000.0,
+                                                      len(best)))
+        for line in out.splitlines():
+            print('    ' + line)
+        heavy = sorted([row for row in best if import_depth(row[2]) <= 1],
+                       key=lambda row: -row[1])
+        for self_us, cum_us, name in heavy[:ns.top]:
+            print('    {:>10.1f} ms  {}'.format(cum_us / 1000.0, name.strip()))
+    print('registered file types: {}'.format(len(FILE_TYPE_REGISTRY)))
+
+
+if __name__ == '__main__':
+    main()
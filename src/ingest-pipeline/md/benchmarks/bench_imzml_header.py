@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+
+"""
+Compare reading imzML metadata with pyimzml.ImzMLParser against the
+header-only imzml_header.read_imzml_header.
+
+Usage:
+  python bench_imzml_header.py [--n_x N] [--n_y N] [--repeat N] [FILE]
+
+Without FILE, an imzML/ibd pair of --n_x by --n_y spectra is generated.
+Time is the best of --repeat runs; peak memory is measured separately with
+tracemalloc.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+from pyimzml.ImzMLParser import ImzMLParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from imzml_header import read_imzml_header
+from synthetic_lz import write_imzml
+
+
+def pyimzml_header(fname):
+    with ImzMLParser(fname) as parser:
+        md = parser.imzmldict
+    return {k: (int(v) if type(v) == np.int64 else v) for k, v in md.items()}
+
+
+def measure(fun, fname, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun(fname)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    rslt = fun(fname)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rslt, best, peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark imzML header reading')
+    parser.add_argument('file', nargs='?', default=None, help='imzML file')
+    parser.add_argument('--n_x', default=300, type=int)
+    parser.add_argument('--n_y', default=300, type=int)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.file is None:
+        tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(tmpdir, 'bench.imzML')
+        write_imzml(fname, os.path.join(tmpdir, 'bench.ibd'), ns.n_x, ns.n_y, n_peaks=10)
+    else:
+        fname = ns.file
+    try:
+        print('{} bytes of imzML'.format(os.path.getsize(fname)))
+        print('{:<14} {:>10} {:>14}'.format('method', 'best_sec', 'peak_bytes'))
+        old, old_sec, old_peak = measure(pyimzml_header, fname, ns.repeat)
+        print('{:<14} {:>10.4f} {:>14d}'.format('pyimzml', old_sec, old_peak))
+        new, new_sec, new_peak = measure(read_imzml_header, fname, ns.repeat)
+        print('{:<14} {:>10.4f} {:>14d}  {}'.format('imzml_header', new_sec, new_peak,
+                                                    'identical' if old == new else 'DIFFERENT'))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#! /usr/bin/env python
+
+"""
+Time test_match, collect_metadata and a full scan for each data collection
+type against synthetic landing zones built by synthetic_lz.py, and record
+the results for comparison against later runs.
+
+Usage:
+  python bench_scan.py [--type TYPE ...] [--param name=value ...] [--repeat N]
+                       [--collect_all] [--lz_root DIR] [--results FILE]
+                       [--baseline FILE] [--threshold RATIO]
+
+Each timing is the best of --repeat runs.  --param values are passed to
+every generator that accepts them.  With --baseline, each timing is shown
+as a ratio to the same timing in an earlier results file, and the exit
+status is 1 if any ratio exceeds --threshold.  Parser output is discarded
+while timing.  A type whose parsers cannot run here (for example for lack
+of a dependency) records the error instead of its timings.
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import traceback
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dir_snapshot import DirSnapshot
+from metadata_extract import get_known_data_collection_types, scan, DEFAULT_SCHEMA
+from synthetic_lz import GENERATORS, make_lz, parse_params
+
+
+def get_collection_type(category_name):
+    for collection_type in get_known_data_collection_types():
+        if collection_type.category_name == category_name:
+            return collection_type
+    raise KeyError(category_name)
+
+
+def lz_stats(topdir):
+    n_files = n_bytes = 0
+    for dirpath, _, fnames in os.walk(topdir):
+        for fname in fnames:
+            n_files += 1
+            n_bytes += os.path.getsize(os.path.join(dirpath, fname))
+    return {'n_files': n_files, 'n_bytes': n_bytes}
+
+
+def best_of(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fun()
+            elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_type(category_name, lz_dir, out_dir, repeat, collect_all):
+    collection_type = get_collection_type(category_name)
+
+    def probe():
+        # All types are probed in priority order, as scan does
+        snapshot = DirSnapshot(lz_dir, max_depth=0)
+        for ct in get_known_data_collection_types():
+            if ct.test_match(lz_dir, snapshot):
+                if ct is not collection_type:
+                    raise RuntimeError('{} matched as {}'.format(category_name,
+                                                                  ct.category_name))
+                return
+
+    def collect():
+        collector = collection_type(lz_dir, DirSnapshot(lz_dir, max_depth=0))
+        collector.collect_all = collect_all
+        collector.filter_metadata(collector.collect_metadata())
+
+    def full_scan():
+        scan(lz_dir, os.path.join(out_dir, category_name + '.json'), DEFAULT_SCHEMA,
+             collect_all=collect_all)
+
+    rslt = {}
+    for name, fun in [('test_match', probe), ('collect_metadata', collect),
+                      ('scan', full_scan)]:
+        try:
+            rslt[name] = best_of(fun, repeat)
+        except Exception as e:
+            rslt[name] = None
+            rslt.setdefault('errors', {})[name] = ''.join(
+                traceback.format_exception_only(type(e), e)).strip()
+    return rslt
+
+
+def environment():
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'host': socket.gethostname(),
+            'cpu_count': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each timing's ratio to the baseline, returning True if any
+    exceeds threshold
+    """
+    regressed = False
+    print('{:<20} {:<18} {:>10} {:>10} {:>7}'.format('type', 'timing', 'baseline', 'now',
+                                                     'ratio'))
+    for category_name, rslt in sorted(results['types'].items()):
+        old = baseline['types'].get(category_name)
+        if old is None:
+            continue
+        for name in ['test_match', 'collect_metadata', 'scan']:
+            if not rslt.get(name) or not old.get(name):
+                continue
+            ratio = rslt[name] / old[name]
+            flag = '  <-- regression' if ratio > threshold else ''
+            regressed = regressed or bool(flag)
+            print('{:<20} {:<18} {:>10.4f} {:>10.4f} {:>7.2f}{}'.format(
+                category_name, name, old[name], rslt[name], ratio, flag))
+    return regressed
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark scans of synthetic landing zones')
+    parser.add_argument('--type', action='append', choices=sorted(GENERATORS), default=None,
+                        help='collection type to benchmark; may be repeated (default all)')
+    parser.add_argument('--param', action='append', default=[],
+                        help='generator parameter as name=value; may be repeated')
+    parser.add_argument('--repeat', default=3, type=int)
+    parser.add_argument('--collect_all', action='store_true',
+                        help='parse every matched file, not just those filter_metadata uses')
+    parser.add_argument('--lz_root', default=None,
+                        help='build the landing zones here and keep them (default a temp dir)')
+    parser.add_argument('--results', default=None, help='write the results as JSON here')
+    parser.add_argument('--baseline', default=None,
+                        help='an earlier results file to compare against')
+    parser.add_argument('--threshold', default=1.2, type=float,
+                        help='slowdown ratio reported as a regression')
+    ns = parser.parse_args(myargv[1:])
+
+    params = parse_params(ns.param)
+    tmpdir = tempfile.mkdtemp()
+    lz_root = ns.lz_root or os.path.join(tmpdir, 'lz')
+    results = {'environment': environment(), 'repeat': ns.repeat,
+               'collect_all': ns.collect_all, 'types': {}}
+    try:
+        for category_name in ns.type or sorted(GENERATORS):
+            lz_dir = os.path.join(lz_root, category_name)
+            defaults = GENERATORS[category_name][1]
+            if not os.path.exists(lz_dir):
+                with redirect_stdout(io.StringIO()):
+                    make_lz(category_name, lz_dir,
+                            **{k: v for k, v in params.items() if k in defaults})
+            rslt = bench_type(category_name, lz_dir, tmpdir, ns.repeat, ns.collect_all)
+            rslt.update(lz_stats(lz_dir))
+            results['types'][category_name] = rslt
+            print('{:<20} {:>6d} files {:>12d} bytes  test_match {}  collect {}  scan {}'.format(
+                category_name, rslt['n_files'], rslt['n_bytes'],
+                *['{:.4f}'.format(rslt[name]) if rslt[name] is not None else 'error'
+                  for name in ['test_match', 'collect_metadata', 'scan']]))
+            for name, msg in rslt.get('errors', {}).items():
+                print('    {}: {}'.format(name, msg))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if ns.results:
+        with open(ns.results, 'w') as f:
+            json.dump(results, f, indent=1)
+    if ns.baseline:
+        with open(ns.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, ns.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+
+"""
+Compare reading a CSV file as the metadata file types used to (a 256 byte
+csv.Sniffer sample, then csv.DictReader with a copy of every row) against
+tabular_reader.read_table as records, as typed columns and schema only.
+
+Usage:
+  python bench_tabular.py [--n_rows N] [--n_cols N] [--repeat N] [FILE]
+
+Without FILE, a numeric CSV of --n_rows by --n_cols is generated.  Time is
+the best of --repeat runs; peak memory is measured separately with
+tracemalloc.
+"""
+
+import sys
+import os
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tabular_reader import read_table
+from synthetic_lz import write_csv
+
+
+def dictreader_records(fname):
+    md = []
+    with open(fname, 'r', newline='') as f:
+        dialect = csv.Sniffer().sniff(f.read(256))
+        f.seek(0)
+        reader = csv.DictReader(f, dialect=dialect)
+        for row in reader:
+            md.append({k : v for k, v in row.items()})
+    return md
+
+
+METHODS = [
+    ('DictReader', dictreader_records),
+    ('read_table records', lambda fname: read_table(fname, typed=False).records()),
+    ('read_table typed', lambda fname: read_table(fname).columns),
+    ('read_table schema', lambda fname: read_table(fname, schema_only=True).schema()),
+]
+
+
+def measure(fun, fname, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun(fname)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    rslt = fun(fname)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rslt, best, peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark tabular file reading')
+    parser.add_argument('file', nargs='?', default=None, help='CSV or TSV file')
+    parser.add_argument('--n_rows', default=200000, type=int)
+    parser.add_argument('--n_cols', default=8, type=int)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.file is None:
+        tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(tmpdir, 'bench.csv')
+        write_csv(fname, ns.n_rows, ns.n_cols)
+    else:
+        fname = ns.file
+    try:
+        print('{} bytes of table'.format(os.path.getsize(fname)))
+        print('{:<20} {:>10} {:>14}'.format('method', 'best_sec', 'peak_bytes'))
+        reference = None
+        for name, fun in METHODS:
+            rslt, sec, peak = measure(fun, fname, ns.repeat)
+            note = ''
+            if name == 'DictReader':
+                reference = rslt
+            elif name == 'read_table records':
+                note = '  identical' if rslt == reference else '  DIFFERENT'
+            print('{:<20} {:>10.4f} {:>14d}{}'.format(name, sec, peak, note))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
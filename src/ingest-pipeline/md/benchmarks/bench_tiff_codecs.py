@@ -0,0 +1,106 @@
+#! /usr/bin/env python
+
+"""
+Time the NumPy codec fallbacks in thirdparty.tifffile (tifffile.NUMPY_CODECS)
+against the imagecodecs functions they stand in for, on one tile.
+
+Usage:
+  python bench_tiff_codecs.py [--size PIXELS] [--repeat N]
+
+The tile is a --size square of uint16 (float32 for the float predictor)
+holding a smooth gradient plus noise, as microscope tiles roughly do.
+LZW and PackBits input is encoded by imagecodecs, so those two codecs are
+skipped when imagecodecs cannot be imported; the others are timed alone.
+Each fallback's output is checked against imagecodecs where both exist.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+
+try:
+    import imagecodecs
+except ImportError:
+    imagecodecs = None
+
+
+def build_cases(size):
+    rng = np.random.RandomState(0)
+    yy, xx = np.mgrid[0:size, 0:size]
+    tile = (yy * 7 + xx * 3 + rng.randint(0, 16, (size, size))).astype('uint16')
+    ftile = tile.astype('float32') / 3.0
+    raw = tile.tobytes()
+    # 12 bit values packed MSB first, as in a BitsPerSample=12 strip
+    bits = np.unpackbits((tile & 0xfff).astype('>u2').view('uint8')).reshape(-1, 16)
+    packed12 = np.packbits(bits[:, 4:].ravel()).tobytes()
+    cases = [
+        ('bitorder_decode', (raw,), {}),
+        ('packints_decode', (packed12, 'uint16', 12), {}),
+        ('delta_decode', (tifffile.delta_encode(tile, axis=-1),), {'axis': -1}),
+        ('floatpred_decode', (_floatpred_encoded(ftile),), {'axis': -1}),
+    ]
+    if imagecodecs is not None:
+        cases.append(('lzw_decode', (imagecodecs.lzw_encode(raw),), {}))
+        cases.append(('packbits_decode', (imagecodecs.packbits_encode(raw),), {}))
+    return cases
+
+
+def _floatpred_encoded(data):
+    # The predictor shuffles bytes into big-endian planes of each row
+    return tifffile.floatpred_encode(data.astype('>f4'), axis=-1)
+
+
+def best_of(fun, args, kwargs, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def same(a, b):
+    # Compared by value: the fallbacks may return native byte order
+    if isinstance(a, bytes) or isinstance(b, bytes):
+        return bytes(a) == bytes(b)
+    return np.array_equal(np.asarray(a).ravel(), np.asarray(b).ravel())
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark the NumPy TIFF codec fallbacks')
+    parser.add_argument('--size', default=512, type=int, help='tile edge in pixels')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    if imagecodecs is None:
+        print('imagecodecs is not installed: timing the fallbacks alone,'
+              ' without lzw_decode and packbits_decode')
+    print('{:<18} {:>12} {:>12} {:>8}'.format('codec', 'numpy_sec', 'imagecodecs', 'check'))
+    for name, args, kwargs in build_cases(ns.size):
+        fallback = tifffile.NUMPY_CODECS[name]
+        sec = best_of(fallback, args, kwargs, ns.repeat)
+        ref_sec, check = '-', '-'
+        if imagecodecs is not None:
+            ref = getattr(imagecodecs, name)
+            # imagecodecs decodes delta and float predictor data in place
+            ref_args = tuple(a.copy() if isinstance(a, np.ndarray) else a for a in args)
+            ref_sec = '{:.5f}'.format(best_of(ref, ref_args, kwargs, ns.repeat))
+            ref_args = tuple(a.copy() if isinstance(a, np.ndarray) else a for a in args)
+            mine_args = tuple(a.copy() if isinstance(a, np.ndarray) else a for a in args)
+            check = 'same' if same(fallback(*mine_args, **kwargs),
+                                   ref(*ref_args, **kwargs)) else 'DIFFERENT'
+        print('{:<18} {:>12.5f} {:>12} {:>8}'.format(name, sec, ref_sec, check))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#! /usr/bin/env python
+
+"""
+Compare reading the first page's ImageDescription with tifffile.TiffFile
+against reading it with the header-only reader in thirdparty.tiff_header.
+
+Usage:
+  python bench_tiff_header.py [--n_pages N] [--size PIXELS] [--repeat N] [FILE ...]
+
+Without FILE arguments, classic, BigTIFF, NDPI-style and SCN files are
+built in a temporary directory; the OME-TIFFs have --n_pages tiled pages
+and an OME-XML description with one Plane element per page.  For each
+file the two descriptions are checked for equality, and the best time
+and the bytes read (where /proc reports them) are shown for each reader.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+from thirdparty import tiff_header
+from scan_profile import thread_bytes_read
+from synthetic_lz import ome_xml, write_scn_tiff
+
+
+def build_files(tmpdir, n_pages, size):
+    data = np.zeros((n_pages, size, size), dtype='uint16')
+    rslt = []
+    for name, kwargs in [('classic', {}), ('bigtiff', {'bigtiff': True})]:
+        fname = os.path.join(tmpdir, name + '.ome.tiff')
+        tifffile.imwrite(fname, data, photometric='minisblack', tile=(16, 16),
+                         description=ome_xml(n_pages, size, size), metadata=None, **kwargs)
+        rslt.append(fname)
+    # An NDPI-style file: classic little-endian with the Hamamatsu tags
+    fname = os.path.join(tmpdir, 'ndpi_style.ndpi')
+    tifffile.imwrite(fname, data[:1], photometric='minisblack', description='NDPI test',
+                     metadata=None,
+                     extratags=[(271, 's', 0, 'Hamamatsu', True),
+                                (65420, 'I', 1, 1, True)])
+    rslt.append(fname)
+    fname = os.path.join(tmpdir, 'leica.scn')
+    write_scn_tiff(fname, size, size)
+    rslt.append(fname)
+    return rslt
+
+
+def tifffile_description(fname):
+    with tifffile.TiffFile(fname) as tf:
+        return tf.pages[0].description
+
+
+def measure(fun, fname, repeat):
+    best = None
+    for _ in range(repeat):
+        read0 = thread_bytes_read()
+        t0 = time.perf_counter()
+        value = fun(fname)
+        elapsed = time.perf_counter() - t0
+        read1 = thread_bytes_read()
+        best = elapsed if best is None else min(best, elapsed)
+    n_read = None if read0 is None else read1 - read0
+    return value, best, n_read
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark header-only TIFF metadata reads')
+    parser.add_argument('files', nargs='*', help='TIFF files to read')
+    parser.add_argument('--n_pages', default=2000, type=int)
+    parser.add_argument('--size', default=64, type=int, help='page width and height')
+    parser.add_argument('--repeat', default=5, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.files:
+        fnames = ns.files
+    else:
+        tmpdir = tempfile.mkdtemp()
+        fnames = build_files(tmpdir, ns.n_pages, ns.size)
+    try:
+        print('{:<24} {:<8} {:>10} {:>12} {:>10} {:>12} {:>6}'.format(
+            'file', 'layout', 'tifffile_s', 'tifffile_io', 'header_s', 'header_io', 'same'))
+        for fname in fnames:
+            with open(fname, 'rb') as fh:
+                layout = tiff_header.TiffHeader(fh).layout.name
+            old, old_sec, old_io = measure(tifffile_description, fname, ns.repeat)
+            new, new_sec, new_io = measure(tiff_header.read_description, fname, ns.repeat)
+            print('{:<24} {:<8} {:>10.5f} {:>12} {:>10.5f} {:>12} {:>6}'.format(
+                os.path.basename(fname)[:24], layout, old_sec, old_io, new_sec, new_io,
+                str(old == new)))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+
+"""
+Compare opening a multi-page TIFF and reading its last page by walking the
+IFD chain against doing so with an IFD index sidecar file
+(tifffile.TiffFile(..., indexcache=DIR)).
+
+Usage:
+  python bench_tiff_index.py [--n_pages N] [--size PIXELS] [--repeat N] [FILE ...]
+
+Without FILE arguments, a --n_pages stack of --size square pages is built
+in a temporary directory.  For each file three cases are shown: no index,
+the first open with an empty index directory (which walks the chain and
+writes the index on close) and later opens which read the index.  The
+best time and the bytes read (where /proc reports them, sidecar included)
+are shown for each case.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+from scan_profile import thread_bytes_read
+
+
+def last_page(fname, indexcache):
+    with tifffile.TiffFile(fname, indexcache=indexcache) as tf:
+        n_pages = len(tf.pages)
+        page = tf.pages[-1]
+        return n_pages, page.shape
+
+
+def measure(fname, indexcache, repeat, fresh=False):
+    best = None
+    for _ in range(repeat):
+        if fresh:
+            shutil.rmtree(indexcache, ignore_errors=True)
+        read0 = thread_bytes_read()
+        t0 = time.perf_counter()
+        value = last_page(fname, indexcache)
+        elapsed = time.perf_counter() - t0
+        read1 = thread_bytes_read()
+        best = elapsed if best is None else min(best, elapsed)
+    n_read = None if read0 is None else read1 - read0
+    return value, best, n_read
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark the TIFF IFD index sidecar')
+    parser.add_argument('files', nargs='*', help='TIFF files to read')
+    parser.add_argument('--n_pages', default=10000, type=int)
+    parser.add_argument('--size', default=16, type=int, help='page width and height')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        if ns.files:
+            fnames = ns.files
+        else:
+            fname = os.path.join(tmpdir, 'stack.tif')
+            tifffile.imwrite(fname, np.zeros((ns.n_pages, ns.size, ns.size), dtype='uint16'),
+                             photometric='minisblack', metadata=None)
+            fnames = [fname]
+        print('{:<24} {:<10} {:>8} {:>10} {:>12} {:>6}'.format(
+            'file', 'index', 'pages', 'best_sec', 'bytes_read', 'same'))
+        for fname in fnames:
+            indexcache = os.path.join(tmpdir, 'ifdindex')
+            reference = None
+            for case, cache, fresh in [('none', None, False),
+                                       ('writing', indexcache, True),
+                                       ('reading', indexcache, False)]:
+                value, sec, n_read = measure(fname, cache, ns.repeat, fresh)
+                if reference is None:
+                    reference = value
+                print('{:<24} {:<10} {:>8} {:>10.5f} {:>12} {:>6}'.format(
+                    os.path.basename(fname)[:24], case, value[0], sec, n_read,
+                    str(value == reference)))
+            shutil.rmtree(indexcache, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
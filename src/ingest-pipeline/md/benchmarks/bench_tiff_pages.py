@@ -0,0 +1,96 @@
+#! /usr/bin/env python
+
+"""
+Measure the memory held by parsed pages of a many-page TIFF file with the
+page cache off, unbounded (pagecache=True), unbounded with lightweight
+TiffFrames, and bounded to the --pagecache least recently used pages.
+
+Usage:
+  python bench_tiff_pages.py [--n_pages N] [--pagecache N] [--repeat N] [FILE]
+
+Without FILE, a --n_pages stack of 8 x 8 uint8 pages is built in a
+temporary directory.  Each case opens the file and visits every page in
+order.  The time is the best of --repeat runs without tracing; the memory
+is measured in a separate run with tracemalloc, both as the peak and as
+what is still allocated after the last page was visited, before closing.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+
+
+def visit_pages(fname, pagecache, useframes):
+    with tifffile.TiffFile(fname, pagecache=pagecache) as tf:
+        tf.pages.useframes = useframes
+        total = 0
+        n_pages = len(tf.pages)
+        for i in range(n_pages):
+            total += tf.pages[i].index
+        cached = sum(1 for page in tf.pages.pages
+                     if not isinstance(page, int))
+        held = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    return n_pages, cached, held
+
+
+def measure(fname, pagecache, useframes, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        visit_pages(fname, pagecache, useframes)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    n_pages, cached, held = visit_pages(fname, pagecache, useframes)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n_pages, cached, best, held, peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark memory held by cached TIFF pages')
+    parser.add_argument('file', nargs='?', default=None, help='TIFF file')
+    parser.add_argument('--n_pages', default=50000, type=int)
+    parser.add_argument('--pagecache', default=256, type=int,
+                        help='size of the bounded page cache')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.file is None:
+        tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(tmpdir, 'pages.tif')
+        tifffile.imwrite(fname, np.zeros((ns.n_pages, 8, 8), dtype='uint8'),
+                         photometric='minisblack', metadata=None)
+    else:
+        fname = ns.file
+    cases = [('no cache', None, False),
+             ('cache all', True, False),
+             ('cache frames', True, True),
+             ('lru {}'.format(ns.pagecache), ns.pagecache, False)]
+    try:
+        print('{:<14} {:>8} {:>8} {:>10} {:>14} {:>14} {:>10}'.format(
+            'case', 'pages', 'cached', 'best_sec', 'held_bytes', 'peak_bytes', 'per_page'))
+        for case, pagecache, useframes in cases:
+            n_pages, cached, sec, held, peak = measure(fname, pagecache, useframes, ns.repeat)
+            print('{:<14} {:>8} {:>8} {:>10.3f} {:>14d} {:>14d} {:>10.0f}'.format(
+                case, n_pages, cached, sec, held, peak, held / n_pages))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#! /usr/bin/env python
+
+"""
+Compare reading a region of a large TIFF page by decoding the whole page
+(TiffPage.asarray, then slicing) against tifffile.read_region, which only
+decodes the strips or tiles that intersect the region, and time a pass
+over the whole page with the TiffPage.segments chunk iterator.
+
+Usage:
+  python bench_tiff_region.py [--size PIXELS] [--tile PIXELS] [--region PIXELS]
+                              [--maxworkers N] [--repeat N] [FILE]
+
+Without FILE, a deflate compressed --size square uint16 page with --tile
+square tiles is built in a temporary directory.  The region is a
+--region square at the center of the first page.  Time is the best of
+--repeat runs; peak memory is measured separately with tracemalloc.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+
+
+def build_file(tmpdir, size, tile):
+    fname = os.path.join(tmpdir, 'large.tif')
+    yy, xx = np.mgrid[0:size, 0:size]
+    data = ((yy + xx) % 4096).astype('uint16')
+    tifffile.imwrite(fname, data, photometric='minisblack', tile=(tile, tile),
+                     compress=1, metadata=None)
+    return fname
+
+
+def measure(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    rslt = fun()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rslt, best, peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark TIFF region reads')
+    parser.add_argument('file', nargs='?', default=None, help='TIFF file')
+    parser.add_argument('--size', default=8192, type=int, help='page width and height')
+    parser.add_argument('--tile', default=512, type=int, help='tile width and height')
+    parser.add_argument('--region', default=1024, type=int, help='region width and height')
+    parser.add_argument('--maxworkers', default=None, type=int)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.file is None:
+        tmpdir = tempfile.mkdtemp()
+        fname = build_file(tmpdir, ns.size, ns.tile)
+    else:
+        fname = ns.file
+    try:
+        with tifffile.TiffFile(fname) as tf:
+            page = tf.pages[0]
+            height, width = page.imagelength, page.imagewidth
+            y0 = max((height - ns.region) // 2, 0)
+            x0 = max((width - ns.region) // 2, 0)
+            y1, x1 = y0 + ns.region, x0 + ns.region
+            if page.keyframe._shape[5] > 1:
+                key = (slice(y0, y1), slice(x0, x1))
+            else:
+                key = (Ellipsis, slice(y0, y1), slice(x0, x1))
+
+            def whole_page():
+                return page.asarray(maxworkers=ns.maxworkers)[key].copy()
+
+            def region():
+                return tifffile.read_region(page, y0, y1, x0, x1,
+                                            maxworkers=ns.maxworkers)
+
+            def chunks():
+                total = 0
+                for _, segment in page.segments(maxworkers=ns.maxworkers):
+                    total += int(segment.sum(dtype='uint64'))
+                return total
+
+            print('page {} x {}, region [{}:{}, {}:{}]'.format(height, width, y0, y1, x0, x1))
+            print('{:<14} {:>10} {:>14} {:>6}'.format('method', 'best_sec', 'peak_bytes', 'same'))
+            reference, sec, peak = measure(whole_page, ns.repeat)
+            print('{:<14} {:>10.4f} {:>14d}'.format('asarray+slice', sec, peak))
+            rslt, sec, peak = measure(region, ns.repeat)
+            print('{:<14} {:>10.4f} {:>14d} {:>6}'.format(
+                'read_region', sec, peak, str(np.array_equal(rslt, reference))))
+            _, sec, peak = measure(chunks, ns.repeat)
+            print('{:<14} {:>10.4f} {:>14d}'.format('segments', sec, peak))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#! /usr/bin/env python
+
+"""
+Compare the ways tifffile can fetch the strips or tiles of a page: one
+seek and read per segment (maxgap=-1), nearby segments coalesced into
+large reads (the default maxgap) and slices of a memory-map (usemmap).
+
+Usage:
+  python bench_tiff_segments.py [--size PIXELS] [--tile PIXELS] [--maxgap BYTES]
+                                [--repeat N] [FILE ...]
+
+Without FILE arguments, a strip-heavy file (one row per strip) and a
+tile-heavy file (--tile square tiles) of one --size square uint16 page
+are built in a temporary directory, both deflate compressed so that the
+segments are decoded rather than read as one contiguous array.  Decoding
+is single threaded.  For each file and mode the best time, the read
+system calls and the bytes read (where /proc reports them) are shown, and
+the data are checked against the per-segment reads.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+from scan_profile import thread_bytes_read
+
+
+def thread_read_calls():
+    """
+    Returns the number of read system calls made by the calling thread,
+    or None if the platform does not provide this.
+    """
+    try:
+        with open('/proc/thread-self/io', 'rb') as f:
+            for line in f:
+                if line.startswith(b'syscr:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def build_files(tmpdir, size, tile):
+    rng = np.random.RandomState(0)
+    data = rng.randint(0, 64, (size, size)).astype('uint16')
+    strips = os.path.join(tmpdir, 'strips.tif')
+    tifffile.imwrite(strips, data, photometric='minisblack', rowsperstrip=1,
+                     compress=1, metadata=None)
+    tiles = os.path.join(tmpdir, 'tiles.tif')
+    tifffile.imwrite(tiles, data, photometric='minisblack', tile=(tile, tile),
+                     compress=1, metadata=None)
+    return [strips, tiles]
+
+
+def read_page(fname, kwargs):
+    with tifffile.TiffFile(fname, **kwargs) as tf:
+        return tf.pages[0].asarray(maxworkers=1)
+
+
+def measure(fname, kwargs, repeat):
+    best = None
+    for _ in range(repeat):
+        calls0, read0 = thread_read_calls(), thread_bytes_read()
+        t0 = time.perf_counter()
+        value = read_page(fname, kwargs)
+        elapsed = time.perf_counter() - t0
+        calls1, read1 = thread_read_calls(), thread_bytes_read()
+        best = elapsed if best is None else min(best, elapsed)
+    n_calls = None if calls0 is None else calls1 - calls0
+    n_read = None if read0 is None else read1 - read0
+    return value, best, n_calls, n_read
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark TIFF strip and tile reads')
+    parser.add_argument('files', nargs='*', help='TIFF files to read')
+    parser.add_argument('--size', default=2048, type=int, help='page width and height')
+    parser.add_argument('--tile', default=16, type=int, help='tile width and height')
+    parser.add_argument('--maxgap', default=tifffile.FileHandle.MAXGAP, type=int)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = None
+    if ns.files:
+        fnames = ns.files
+    else:
+        tmpdir = tempfile.mkdtemp()
+        fnames = build_files(tmpdir, ns.size, ns.tile)
+    modes = [('separate', {'maxgap': -1}),
+             ('coalesced', {'maxgap': ns.maxgap}),
+             ('mmap', {'usemmap': True})]
+    try:
+        print('{:<20} {:<10} {:>8} {:>10} {:>10} {:>12} {:>6}'.format(
+            'file', 'mode', 'segments', 'best_sec', 'read_calls', 'bytes_read', 'same'))
+        for fname in fnames:
+            with tifffile.TiffFile(fname) as tf:
+                n_segments = len(tf.pages[0].dataoffsets)
+            reference = None
+            for mode, kwargs in modes:
+                value, sec, n_calls, n_read = measure(fname, kwargs, ns.repeat)
+                if reference is None:
+                    reference = value
+                print('{:<20} {:<10} {:>8} {:>10.4f} {:>10} {:>12} {:>6}'.format(
+                    os.path.basename(fname)[:20], mode, n_segments, sec, n_calls, n_read,
+                    str(np.array_equal(value, reference))))
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
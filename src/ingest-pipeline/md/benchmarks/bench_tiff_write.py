@@ -0,0 +1,112 @@
+#! /usr/bin/env python
+
+"""
+Time compressed tiled writes with TiffWriter.save using one thread against
+a thread pool (maxworkers), and time writing a pyramid with
+TiffWriter.save_pyramid from a tile iterator, with its peak memory.
+
+Usage:
+  python bench_tiff_write.py [--size PIXELS] [--tile PIXELS] [--level N]
+                             [--maxworkers N] [--repeat N]
+
+The image is a --size square uint16 gradient plus noise, written deflate
+compressed (--level) in --tile square tiles to a temporary directory.
+Parallel writes are checked to produce the same file as serial ones.
+The pyramid is written from tiles made on the fly, so its peak memory
+(measured with tracemalloc) is to be compared with the image size.
+"""
+
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+
+
+def make_tile(y, x, tile, size):
+    # noise depends on the pixel position only, so tiles match the image
+    yy, xx = np.mgrid[y:min(y + tile, size), x:min(x + tile, size)].astype('int64')
+    noise = ((yy * 2654435761 + xx * 40503) >> 7) % 16
+    return ((yy * 7 + xx * 3 + noise) % 65536).astype('uint16')
+
+
+def iter_tiles(size, tile):
+    for y in range(0, size, tile):
+        for x in range(0, size, tile):
+            yield make_tile(y, x, tile, size)
+
+
+def best_of(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark TIFF compressed and pyramid writes')
+    parser.add_argument('--size', default=8192, type=int, help='image width and height')
+    parser.add_argument('--tile', default=256, type=int, help='tile width and height')
+    parser.add_argument('--level', default=6, type=int, help='deflate compression level')
+    parser.add_argument('--maxworkers', default=None, type=int)
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        data = make_tile(0, 0, ns.size, ns.size)
+        shape, dtype = data.shape, data.dtype
+        tile = (ns.tile, ns.tile)
+        serial = os.path.join(tmpdir, 'serial.tif')
+        threaded = os.path.join(tmpdir, 'threaded.tif')
+        pyramid = os.path.join(tmpdir, 'pyramid.tif')
+
+        def write(fname, maxworkers):
+            tifffile.imwrite(fname, data, tile=tile, compress=ns.level,
+                             metadata=None, maxworkers=maxworkers)
+
+        def write_pyramid():
+            with tifffile.TiffWriter(pyramid, bigtiff=True) as tif:
+                tif.save_pyramid(iter_tiles(ns.size, ns.tile), shape=shape,
+                                 dtype=dtype, tile=tile, compress=ns.level,
+                                 maxworkers=ns.maxworkers)
+
+        print('image {0} x {0} uint16, {1} bytes'.format(ns.size, data.nbytes))
+        print('{:<16} {:>10} {:>14} {:>6}'.format('method', 'best_sec', 'peak_bytes', 'same'))
+        sec = best_of(lambda: write(serial, 1), ns.repeat)
+        print('{:<16} {:>10.4f}'.format('save serial', sec))
+        sec = best_of(lambda: write(threaded, ns.maxworkers), ns.repeat)
+        with open(serial, 'rb') as f1, open(threaded, 'rb') as f2:
+            same = f1.read() == f2.read()
+        print('{:<16} {:>10.4f} {:>14} {:>6}'.format('save threaded', sec, '', str(same)))
+        del data
+        sec = best_of(write_pyramid, ns.repeat)
+        tracemalloc.start()
+        write_pyramid()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        with tifffile.TiffFile(pyramid) as tf:
+            levels = tf.series[0].levels
+            same = np.array_equal(levels[0].asarray(), make_tile(0, 0, ns.size, ns.size))
+            shapes = [level.shape for level in levels]
+        print('{:<16} {:>10.4f} {:>14d} {:>6}'.format('save_pyramid', sec, peak, str(same)))
+        print('pyramid levels: {}'.format(shapes))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#! /usr/bin/env python
+
+"""
+Compare xmltodict.parse against the streaming xml_to_dict.parse, with and
+without pruning, on an OME-XML document with per-plane elements.
+
+Usage:
+  python bench_xml_to_dict.py [--n_channels N] [--n_planes N] [--repeat N] [FILE]
+
+FILE may be an XML file or an OME-TIFF; otherwise an OME-XML document
+with --n_channels channels of --n_planes planes each is generated.  Time
+is the best of --repeat runs; peak memory is measured separately with
+tracemalloc and includes the result dict.
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import tracemalloc
+
+import xmltodict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xml_to_dict
+from thirdparty import tiff_header
+from synthetic_lz import ome_xml
+from data_file_types.ome_tiff_metadata_file import OMETiffMetadataFile
+
+
+def measure(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    rslt = fun()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rslt, best, peak
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Benchmark XML to dict conversion')
+    parser.add_argument('file', nargs='?', default=None, help='XML file or OME-TIFF')
+    parser.add_argument('--n_channels', default=60, type=int)
+    parser.add_argument('--n_planes', default=500, type=int, help='planes per channel')
+    parser.add_argument('--repeat', default=3, type=int)
+    ns = parser.parse_args(myargv[1:])
+
+    if ns.file is None:
+        xml = ome_xml(ns.n_channels, 1024, 1024, ns.n_planes)
+    elif ns.file.endswith(('.tif', '.tiff')):
+        xml = tiff_header.read_description(ns.file)
+    else:
+        with open(ns.file) as f:
+            xml = f.read()
+    print('XML document of {} characters'.format(len(xml)))
+    print('{:<24} {:>10} {:>14}'.format('method', 'best_sec', 'peak_bytes'))
+    reference = None
+    for name, fun in [
+            ('xmltodict', lambda: xmltodict.parse(xml)),
+            ('xml_to_dict', lambda: xml_to_dict.parse(xml)),
+            ('xml_to_dict pruned', lambda: xml_to_dict.parse(
+                xml, exclude=OMETiffMetadataFile.exclude_paths))]:
+        rslt, best, peak = measure(fun, ns.repeat)
+        same = ''
+        if reference is None:
+            reference = json.dumps(rslt)
+        elif name == 'xml_to_dict':
+            same = 'identical' if json.dumps(rslt) == reference else 'DIFFERENT'
+        print('{:<24} {:>10.4f} {:>14d}  {}'.format(name, best, peak, same))
+
+
+if __name__ == '__main__':
+    main()
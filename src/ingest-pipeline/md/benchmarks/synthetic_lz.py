@@ -0,0 +1,647 @@
+#! /usr/bin/env python
+
+"""
+Fabricate synthetic landing-zone directory trees for each of the data
+collection types in md/data_collection_types, for benchmarking and testing
+metadata_extract without real HuBMAP data.
+
+The files are small but structurally realistic: OME-TIFF and SCN-TIFF
+files carry proper XML ImageDescriptions, CZI files have a header,
+metadata and subblock directory segments, imzML files have a spectrum
+list pointing into a matching .ibd file, and FASTQ files are gzipped
+reads.  File counts and sizes are set through per-type parameters.
+
+Usage:
+  python synthetic_lz.py --type IMS --out DIR [--param name=value ...]
+  python synthetic_lz.py --list
+"""
+
+import sys
+import os
+import io
+import gzip
+import json
+import uuid
+import struct
+import random
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thirdparty import tifffile
+
+
+#
+# Individual file writers
+#
+
+def write_metadata_tsv(path, assay_type, extra=None):
+    row = {'assay_type': assay_type,
+           'tissue_id': 'SYN-0001',
+           'execution_datetime': '2020-01-01 12:00',
+           'resolution_x_value': '0.5',
+           'resolution_y_value': '0.5',
+           'resolution_z_value': '1.5',
+           'number_of_cycles': '4',
+           'number_of_antibodies': '8',
+           'data_path': '.'}
+    row.update(extra or {})
+    with open(path, 'w') as f:
+        f.write('\t'.join(row) + '\n')
+        f.write('\t'.join(str(v) for v in row.values()) + '\n')
+
+
+def write_json(path, dct):
+    with open(path, 'w') as f:
+        json.dump(dct, f, indent=2)
+
+
+def ome_xml(n_channels, height, width, n_planes_per_channel=1, dtype='uint16',
+            plane_elements=True):
+    """
+    An OME-XML document for a CYX image.  If plane_elements is set, one
+    <Plane> and one <TiffData> element is written per plane, as MxIF
+    instruments do.
+    """
+    n_planes = n_channels * n_planes_per_channel
+    channels = ''.join('<Channel ID="Channel:0:{0}" Name="Marker{0}" SamplesPerPixel="1"/>'
+                       .format(idx) for idx in range(n_channels))
+    if plane_elements:
+        planes = ''.join('<TiffData FirstC="{0}" FirstT="0" FirstZ="{1}" IFD="{2}"'
+                         ' PlaneCount="1"/>'
+                         .format(idx // n_planes_per_channel, idx % n_planes_per_channel, idx)
+                         for idx in range(n_planes))
+        planes += ''.join('<Plane TheC="{0}" TheT="0" TheZ="{1}" DeltaT="{2:.3f}"'
+                          ' ExposureTime="100.0" PositionX="0.0" PositionY="0.0"/>'
+                          .format(idx // n_planes_per_channel, idx % n_planes_per_channel,
+                                  0.1 * idx)
+                          for idx in range(n_planes))
+    else:
+        planes = '<TiffData/>'
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<OME xmlns="http://www.openmicroscopy.org/Schemas/OME/2016-06"'
+            ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+            ' Creator="synthetic_lz">'
+            '<Image ID="Image:0" Name="synthetic">'
+            '<Pixels ID="Pixels:0" DimensionOrder="XYZCT" Type="{dtype}"'
+            ' SizeX="{width}" SizeY="{height}" SizeZ="{nz}" SizeC="{nc}" SizeT="1"'
+            ' PhysicalSizeX="0.5" PhysicalSizeY="0.5">'
+            '{channels}{planes}'
+            '</Pixels></Image></OME>'
+            .format(dtype=dtype, width=width, height=height, nz=n_planes_per_channel,
+                    nc=n_channels, channels=channels, planes=planes))
+
+
+def write_ome_tiff(path, n_channels=3, height=256, width=256, tile=None, bigtiff=False,
+                   compress=0, seed=0):
+    """
+    Write an OME-TIFF with one page per channel
+    """
+    rng = np.random.RandomState(seed)
+    data = rng.randint(0, 4096, size=(n_channels, height, width)).astype('uint16')
+    kwargs = {'tile': tile} if tile else {}
+    tifffile.imwrite(path, data, bigtiff=bigtiff, photometric='minisblack',
+                     description=ome_xml(n_channels, height, width), metadata=None,
+                     compress=compress, **kwargs)
+
+
+def write_scn_tiff(path, height=256, width=256, seed=0):
+    """
+    Write a TIFF with a Leica SCN XML ImageDescription
+    """
+    rng = np.random.RandomState(seed)
+    data = rng.randint(0, 255, size=(height, width, 3)).astype('uint8')
+    xml = ('<?xml version="1.0" encoding="utf-8"?>'
+           '<scn xmlns="http://www.leica-microsystems.com/scn/2010/10/01">'
+           '<collection name="synthetic" uuid="{uuid}" sizeX="{w}" sizeY="{h}">'
+           '<barcode>SYN0001</barcode>'
+           '<image name="PAS" uuid="{uuid}">'
+           '<creationDate>2020-01-01T12:00:00.00Z</creationDate>'
+           '<device model="Leica SCN400" version="1.5"/>'
+           '<pixels sizeX="{w}" sizeY="{h}">'
+           '<dimension sizeX="{w}" sizeY="{h}" r="0" ifd="0"/>'
+           '</pixels>'
+           '<view sizeX="{w}" sizeY="{h}" offsetX="0" offsetY="0" spacingZ="0"/>'
+           '<scanSettings><objectiveSettings><objective>20</objective></objectiveSettings>'
+           '<illuminationSettings><illuminationSource>brightfield</illuminationSource>'
+           '</illuminationSettings></scanSettings>'
+           '</image></collection></scn>').format(uuid=uuid.UUID(int=seed), w=width, h=height)
+    tifffile.imwrite(path, data, photometric='rgb', description=xml, metadata=None)
+
+
+def czi_xml(n_channels, height, width):
+    channels = ''.join('<Channel Id="Channel:{0}" Name="Marker{0}"><Fluor>Dye{0}</Fluor>'
+                       '<ExposureTime>100000000</ExposureTime></Channel>'
+                       .format(idx) for idx in range(n_channels))
+    return ('<ImageDocument><Metadata>'
+            '<Information><Image>'
+            '<SizeX>{w}</SizeX><SizeY>{h}</SizeY><SizeC>{nc}</SizeC>'
+            '<PixelType>Gray16</PixelType>'
+            '<Dimensions><Channels>{channels}</Channels></Dimensions>'
+            '</Image></Information>'
+            '<Scaling><Items>'
+            '<Distance Id="X"><Value>6.5E-07</Value></Distance>'
+            '<Distance Id="Y"><Value>6.5E-07</Value></Distance>'
+            '</Items></Scaling>'
+            '</Metadata></ImageDocument>').format(w=width, h=height, nc=n_channels,
+                                                  channels=channels)
+
+
+def _czi_segment(seg_id, data, alloc_multiple=32):
+    used = len(data)
+    allocated = -(-used // alloc_multiple) * alloc_multiple
+    return (struct.pack('<16sqq', seg_id, allocated, used)
+            + data + b'\0' * (allocated - used))
+
+
+def _czi_dir_entry(file_position, dims, pixel_type=1):
+    """
+    A DirectoryEntryDV; dims is a list of (dimension, start, size)
+    """
+    rslt = struct.pack('<2siqiiB5si', b'DV', pixel_type, file_position, 0, 0, 0, b'\0' * 5,
+                       len(dims))
+    for dim, start, size in dims:
+        rslt += struct.pack('<4siifi', dim.encode(), start, size, float(start), size)
+    return rslt
+
+
+def write_czi(path, n_channels=3, height=256, width=256, tiles_per_side=2, seed=0):
+    """
+    Write a minimal Zeiss CZI file: a ZISRAWFILE header, a ZISRAWMETADATA
+    segment, one Gray16 ZISRAWSUBBLOCK per channel and tile, and a
+    ZISRAWDIRECTORY segment listing the subblocks.
+    """
+    rng = np.random.RandomState(seed)
+    tile_h = height // tiles_per_side
+    tile_w = width // tiles_per_side
+    xml = czi_xml(n_channels, height, width).encode('utf-8')
+    metadata_seg = _czi_segment(b'ZISRAWMETADATA',
+                                struct.pack('<ii248s', len(xml), 0, b'\0' * 248) + xml)
+    header_len = 32 + 512
+    metadata_pos = header_len
+    pos = metadata_pos + len(metadata_seg)
+    subblocks = []
+    entries = []
+    for c_idx in range(n_channels):
+        for m_idx in range(tiles_per_side * tiles_per_side):
+            y0 = (m_idx // tiles_per_side) * tile_h
+            x0 = (m_idx % tiles_per_side) * tile_w
+            dims = [('X', x0, tile_w), ('Y', y0, tile_h), ('C', c_idx, 1), ('M', m_idx, 1)]
+            entry = _czi_dir_entry(pos, dims)
+            pixels = rng.randint(0, 4096, size=(tile_h, tile_w)).astype('<u2').tobytes()
+            fixed = struct.pack('<iiq', 0, 0, len(pixels)) + entry
+            fixed += b'\0' * max(0, 256 - len(fixed))
+            seg = _czi_segment(b'ZISRAWSUBBLOCK', fixed + pixels)
+            subblocks.append(seg)
+            entries.append(entry)
+            pos += len(seg)
+    directory_pos = pos
+    directory_seg = _czi_segment(b'ZISRAWDIRECTORY',
+                                 struct.pack('<i124s', len(entries), b'\0' * 124)
+                                 + b''.join(entries))
+    guid = uuid.UUID(int=seed).bytes
+    header = struct.pack('<iiii16s16siqqiq', 1, 0, 0, 0, guid, guid, 0,
+                         directory_pos, metadata_pos, 0, 0)
+    header_seg = struct.pack('<16sqq', b'ZISRAWFILE', 512, len(header))
+    header_seg += header + b'\0' * (512 - len(header))
+    with open(path, 'wb') as f:
+        f.write(header_seg)
+        f.write(metadata_seg)
+        for seg in subblocks:
+            f.write(seg)
+        f.write(directory_seg)
+
+
+_IMZML_HEAD = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<mzML xmlns="http://psi.hupo.org/ms/mzml" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="1.1">
+  <cvList count="3">
+    <cv uri="http://psidev.cvs.sourceforge.net/*checkout*/psidev/psi/psi-ms/mzML/controlledVocabulary/psi-ms.obo" fullName="Proteomics Standards Initiative Mass Spectrometry Ontology" id="MS" version="3.65.0"/>
+    <cv uri="http://obo.cvs.sourceforge.net/*checkout*/obo/obo/ontology/phenotype/unit.obo" fullName="Unit Ontology" id="UO" version="12:10:2011"/>
+    <cv uri="https://raw.githubusercontent.com/imzML/imzML/master/imagingMS.obo" fullName="Imaging MS Ontology" id="IMS" version="0.9.1"/>
+  </cvList>
+  <fileDescription>
+    <fileContent>
+      <cvParam cvRef="MS" accession="MS:1000579" name="MS1 spectrum" value=""/>
+      <cvParam cvRef="MS" accession="{centroid_acc}" name="{centroid_name}" value=""/>
+      <cvParam cvRef="IMS" accession="{mode_acc}" name="{mode_name}" value=""/>
+      <cvParam cvRef="IMS" accession="IMS:1000080" name="universally unique identifier" value="{uuid}"/>
+    </fileContent>
+  </fileDescription>
+  <referenceableParamGroupList count="2">
+    <referenceableParamGroup id="mzArray">
+      <cvParam cvRef="MS" accession="MS:1000576" name="no compression" value=""/>
+      <cvParam cvRef="MS" accession="MS:1000514" name="m/z array" unitCvRef="MS" unitAccession="MS:1000040" unitName="m/z"/>
+      <cvParam cvRef="MS" accession="MS:1000523" name="64-bit float" value=""/>
+      <cvParam cvRef="IMS" accession="IMS:1000101" name="external data" value="true"/>
+    </referenceableParamGroup>
+    <referenceableParamGroup id="intensityArray">
+      <cvParam cvRef="MS" accession="MS:1000521" name="32-bit float" value=""/>
+      <cvParam cvRef="MS" accession="MS:1000515" name="intensity array" unitCvRef="MS" unitAccession="MS:1000131" unitName="number of detector counts"/>
+      <cvParam cvRef="MS" accession="MS:1000576" name="no compression" value=""/>
+      <cvParam cvRef="IMS" accession="IMS:1000101" name="external data" value="true"/>
+    </referenceableParamGroup>
+  </referenceableParamGroupList>
+  <softwareList count="1">
+    <software id="synthetic_lz" version="1.0">
+      <cvParam cvRef="MS" accession="MS:1000799" name="custom unreleased software tool" value="synthetic_lz"/>
+    </software>
+  </softwareList>
+  <scanSettingsList count="1">
+    <scanSettings id="scanSettings1">
+      <cvParam cvRef="IMS" accession="IMS:1000401" name="top down"/>
+      <cvParam cvRef="IMS" accession="IMS:1000042" name="max count of pixels x" value="{nx}"/>
+      <cvParam cvRef="IMS" accession="IMS:1000043" name="max count of pixels y" value="{ny}"/>
+      <cvParam cvRef="IMS" accession="IMS:1000044" name="max dimension x" value="{dim_x}" unitCvRef="UO" unitAccession="UO:0000017" unitName="micrometer"/>
+      <cvParam cvRef="IMS" accession="IMS:1000045" name="max dimension y" value="{dim_y}" unitCvRef="UO" unitAccession="UO:0000017" unitName="micrometer"/>
+      <cvParam cvRef="IMS" accession="IMS:1000046" name="pixel size (x)" value="10.0" unitCvRef="UO" unitAccession="UO:0000017" unitName="micrometer"/>
+      <cvParam cvRef="IMS" accession="IMS:1000047" name="pixel size y" value="10.0" unitCvRef="UO" unitAccession="UO:0000017" unitName="micrometer"/>
+    </scanSettings>
+  </scanSettingsList>
+  <instrumentConfigurationList count="1">
+    <instrumentConfiguration id="IC1">
+      <cvParam cvRef="MS" accession="MS:1000843" name="wavelength" value="355.0"/>
+    </instrumentConfiguration>
+  </instrumentConfigurationList>
+  <dataProcessingList count="1">
+    <dataProcessing id="synthetic">
+      <processingMethod order="0" softwareRef="synthetic_lz">
+        <cvParam cvRef="MS" accession="MS:1000530" name="file format conversion" value="Output to imzML"/>
+      </processingMethod>
+    </dataProcessing>
+  </dataProcessingList>
+  <run defaultInstrumentConfigurationRef="IC1" id="synthetic">
+    <spectrumList count="{n_spectra}" defaultDataProcessingRef="synthetic">
+"""
+
+_IMZML_SPECTRUM = """      <spectrum defaultArrayLength="0" id="spectrum={idx}" index="{idx}">
+        <cvParam cvRef="MS" accession="MS:1000511" name="ms level" value="1"/>
+        <cvParam cvRef="MS" accession="MS:1000285" name="total ion current" value="{tic}"/>
+        <scanList count="1">
+          <cvParam cvRef="MS" accession="MS:1000795" name="no combination"/>
+          <scan instrumentConfigurationRef="IC1">
+            <cvParam cvRef="IMS" accession="IMS:1000050" name="position x" value="{x}"/>
+            <cvParam cvRef="IMS" accession="IMS:1000051" name="position y" value="{y}"/>
+          </scan>
+        </scanList>
+        <binaryDataArrayList count="2">
+          <binaryDataArray encodedLength="0">
+            <referenceableParamGroupRef ref="mzArray"/>
+            <cvParam cvRef="IMS" accession="IMS:1000103" name="external array length" value="{mz_len}"/>
+            <cvParam cvRef="IMS" accession="IMS:1000104" name="external encoded length" value="{mz_enc}"/>
+            <cvParam cvRef="IMS" accession="IMS:1000102" name="external offset" value="{mz_off}"/>
+            <binary/>
+          </binaryDataArray>
+          <binaryDataArray encodedLength="0">
+            <referenceableParamGroupRef ref="intensityArray"/>
+            <cvParam cvRef="IMS" accession="IMS:1000103" name="external array length" value="{int_len}"/>
+            <cvParam cvRef="IMS" accession="IMS:1000104" name="external encoded length" value="{int_enc}"/>
+            <cvParam cvRef="IMS" accession="IMS:1000102" name="external offset" value="{int_off}"/>
+            <binary/>
+          </binaryDataArray>
+        </binaryDataArrayList>
+      </spectrum>
+"""
+
+_IMZML_TAIL = """    </spectrumList>
+  </run>
+</mzML>
+"""
+
+
+def write_imzml(imzml_path, ibd_path, n_x=10, n_y=10, n_peaks=100, continuous=True,
+                seed=0):
+    """
+    Write an imzML file and its .ibd binary.  In continuous mode all spectra
+    share one float64 m/z array; in processed mode each spectrum has its own
+    m/z array of varying length.  Intensities are float32.
+    """
+    rng = np.random.RandomState(seed)
+    file_uuid = uuid.UUID(int=seed)
+    with open(ibd_path, 'wb') as ibd, open(imzml_path, 'w') as f:
+        ibd.write(file_uuid.bytes)
+        offset = 16
+        f.write(_IMZML_HEAD.format(
+            centroid_acc='MS:1000128' if continuous else 'MS:1000127',
+            centroid_name='profile spectrum' if continuous else 'centroid spectrum',
+            mode_acc='IMS:1000030' if continuous else 'IMS:1000031',
+            mode_name='continuous' if continuous else 'processed',
+            uuid='{' + str(file_uuid).upper() + '}',
+            nx=n_x, ny=n_y, dim_x=10 * n_x, dim_y=10 * n_y, n_spectra=n_x * n_y))
+        if continuous:
+            mzs = np.linspace(100.0, 1000.0, n_peaks)
+            ibd.write(mzs.astype('<f8').tobytes())
+            mz_off, mz_len = offset, n_peaks
+            offset += 8 * n_peaks
+        idx = 0
+        for y in range(1, n_y + 1):
+            for x in range(1, n_x + 1):
+                idx += 1
+                if not continuous:
+                    mz_len = max(1, n_peaks - rng.randint(0, max(1, n_peaks // 2)))
+                    mzs = np.sort(rng.uniform(100.0, 1000.0, mz_len))
+                    ibd.write(mzs.astype('<f8').tobytes())
+                    mz_off = offset
+                    offset += 8 * mz_len
+                ints = rng.exponential(100.0, mz_len).astype('<f4')
+                ibd.write(ints.tobytes())
+                int_off = offset
+                offset += 4 * mz_len
+                f.write(_IMZML_SPECTRUM.format(idx=idx, x=x, y=y, tic=float(ints.sum()),
+                                               mz_len=mz_len, mz_enc=8 * mz_len,
+                                               mz_off=mz_off, int_len=mz_len,
+                                               int_enc=4 * mz_len, int_off=int_off))
+        f.write(_IMZML_TAIL)
+
+
+def write_txt_tform(path, n_params=6):
+    params = ' '.join('{:.6f}'.format(1.0 if idx in (0, 3) else 0.01 * idx)
+                      for idx in range(n_params))
+    with open(path, 'w') as f:
+        f.write('(Transform "AffineTransform")\n')
+        f.write('(NumberOfParameters {})\n'.format(n_params))
+        f.write('(TransformParameters {})\n'.format(params))
+        f.write('(InitialTransformParametersFileName "NoInitialTransform")\n')
+        f.write('(HowToCombineTransforms "Compose")\n')
+        f.write('(FixedImageDimension 2)\n')
+        f.write('(Size 1024 1024)\n')
+        f.write('(Spacing 1.0000000000 1.0000000000)\n')
+        f.write('(UseDirectionCosines "true")\n')
+
+
+def write_mtx_tform(path):
+    with open(path, 'w') as f:
+        for row in [[1.0, 0.0, 0.0, 12.5], [0.0, 1.0, 0.0, -3.25],
+                    [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]:
+            f.write(' '.join(str(v) for v in row) + '\n')
+
+
+def write_csv(path, n_rows=100, n_cols=8, seed=0):
+    rng = np.random.RandomState(seed)
+    with open(path, 'w') as f:
+        f.write(','.join(['mz'] + ['col_{}'.format(idx) for idx in range(1, n_cols)]) + '\n')
+        for row in rng.uniform(0.0, 1000.0, size=(n_rows, n_cols)):
+            f.write(','.join('{:.4f}'.format(v) for v in row) + '\n')
+
+
+def write_fastq_gz(path, n_reads=1000, read_len=100, seed=0):
+    rnd = random.Random(seed)
+    buf = io.StringIO()
+    for idx in range(n_reads):
+        seq = ''.join(rnd.choice('ACGT') for _ in range(read_len))
+        qual = ''.join(chr(33 + rnd.randint(20, 40)) for _ in range(read_len))
+        buf.write('@SYN:1:FC0001:1:{}:{}:{} 1:N:0:ACGTACGT\n{}\n+\n{}\n'
+                  .format(1101 + idx // 10000, idx % 10000, idx, seq, qual))
+    with gzip.open(path, 'wb', compresslevel=1) as f:
+        f.write(buf.getvalue().encode('ascii'))
+
+
+def write_filler(path, n_bytes, seed=0):
+    with open(path, 'wb') as f:
+        f.write(np.random.RandomState(seed).bytes(n_bytes))
+
+
+#
+# Whole landing zones
+#
+
+IMS_DEFAULTS = {'n_channels': 3, 'height': 256, 'width': 256, 'n_individual_tiffs': 4,
+                'imzml_x': 10, 'imzml_y': 10, 'n_peaks': 100, 'continuous': 1,
+                'n_columnar_csv': 2, 'csv_rows': 100}
+
+
+def make_ims_lz(topdir, n_channels=3, height=256, width=256, n_individual_tiffs=4,
+                imzml_x=10, imzml_y=10, n_peaks=100, continuous=1, n_columnar_csv=2,
+                csv_rows=100):
+    stem = 'VAN0001-RK-1-21'
+
+    def sub(*parts):
+        path = os.path.join(topdir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    write_json(sub(stem + '-spatial_meta.txt'),
+               {'ccf_x': 1.0, 'ccf_y': 2.0, 'ccf_z': 3.0, 'organ': 'kidney'})
+    write_czi(sub('raw_microscopy', stem + '-AF_raw.czi'), n_channels, height, width)
+    write_czi(sub('raw_microscopy', stem + '-MxIF_raw.czi'), n_channels, height, width,
+              seed=1)
+    write_scn_tiff(sub('raw_microscopy', stem + '-PAS_raw.scn'), height, width)
+    tform_dir = ('raw_microscopy', 'transformix_transformation_files')
+    for idx in (1, 2, 3):
+        write_txt_tform(sub(*tform_dir, 'MxIF_transformsToIMS',
+                            '{}-MxIF_toIMS_tform{}.txt'.format(stem, idx)))
+    write_txt_tform(sub(*tform_dir, 'PAS_transformsToIMS', stem + '-PAS_toIMS_tform.txt'))
+    write_txt_tform(sub(*tform_dir, 'preAF_transformsToIMS',
+                        stem + '-IMS_preAF_toIMS_tform.txt'))
+    for suffix in ['-mxIF_toIMS.ome.tiff', '-AF_pAF_toIMS.ome.tiff', '-pas_toIMS.ome.tiff']:
+        write_ome_tiff(sub('processed_microscopy', stem + suffix), n_channels, height, width)
+    with open(sub('IMS', stem + '-instrument_metadata.yml'), 'w') as f:
+        f.write('instrument: timsTOF fleX\nmode: positive\npixel_size_um: 10\n')
+    write_csv(sub('IMS', stem + '-peak_metadata.csv'), n_rows=n_peaks)
+    write_mtx_tform(sub('IMS', stem + '-tform_to_microscopy_metadata.txt'))
+    for idx in range(n_columnar_csv):
+        write_csv(sub('IMS', 'columnar', '{}-{}.csv'.format(stem, idx)), n_rows=csv_rows,
+                  seed=idx)
+    write_imzml(sub('IMS', 'imzml', stem + '.imzML'), sub('IMS', 'imzml', stem + '.ibd'),
+                imzml_x, imzml_y, n_peaks, continuous=bool(continuous))
+    write_ome_tiff(sub('IMS', 'tif', stem + '.ome.tiff'), n_channels, imzml_y, imzml_x)
+    for idx in range(n_individual_tiffs):
+        write_ome_tiff(sub('IMS', 'tif', 'individual_final', '{}-mz{}.tiff'.format(stem, idx)),
+                       1, imzml_y, imzml_x, seed=idx)
+
+
+def _codex_channel_names(n_cycles, n_channels):
+    names = []
+    for cyc in range(n_cycles):
+        names.append('DAPI-{:02d}'.format(cyc + 1))
+        names.extend('Marker{}'.format(cyc * (n_channels - 1) + idx)
+                     for idx in range(n_channels - 1))
+    return names
+
+
+def _write_codex_cycles(datadir, n_cycles, n_regions, n_tiles, tile_bytes):
+    for cyc in range(n_cycles):
+        for reg in range(n_regions):
+            cycdir = os.path.join(datadir, 'cyc{:03d}_reg{:03d}'.format(cyc + 1, reg + 1))
+            os.makedirs(cycdir, exist_ok=True)
+            for tile in range(n_tiles):
+                write_filler(os.path.join(cycdir, '1_{:05d}_Z001_CH1.tif'.format(tile + 1)),
+                             tile_bytes, seed=tile)
+
+
+AKOYA_CODEX_DEFAULTS = {'n_cycles': 4, 'n_channels': 4, 'n_regions': 1, 'n_tiles': 9,
+                        'tile_bytes': 1024}
+
+
+def make_akoya_codex_lz(topdir, n_cycles=4, n_channels=4, n_regions=1, n_tiles=9,
+                        tile_bytes=1024):
+    os.makedirs(topdir, exist_ok=True)
+    channel_names = _codex_channel_names(n_cycles, n_channels)
+    write_metadata_tsv(os.path.join(topdir, 'synthetic-metadata.tsv'), 'CODEX',
+                       {'number_of_cycles': str(n_cycles),
+                        'number_of_antibodies': str(n_cycles * (n_channels - 1))})
+    with open(os.path.join(topdir, 'exposure_times.txt'), 'w') as f:
+        f.write('Cycle,CH1,CH2,CH3,CH4\n')
+        for cyc in range(n_cycles):
+            f.write('{},10,100,100,100\n'.format(cyc + 1))
+    datadir = os.path.join(topdir, 'src_CX_19-001_synthetic')
+    os.makedirs(datadir)
+    write_json(os.path.join(datadir, 'experiment.json'),
+               {'version': '1.5.0', 'xyResolution': 377.44, 'zPitch': 1500.0,
+                'cycle_upper_limit': n_cycles, 'dateProcessed': '2020-01-01 12:00:00.000',
+                'numRegions': n_regions, 'numTiles': n_tiles,
+                'channelNames': {'channelNamesArray': channel_names}})
+    write_json(os.path.join(datadir, 'segmentation.json'),
+               {'nuclearStainChannel': 1, 'nuclearStainCycle': 1, 'radius': 7})
+    _write_codex_cycles(datadir, n_cycles, n_regions, n_tiles, tile_bytes)
+
+
+STANFORD_CODEX_DEFAULTS = {'n_cycles': 4, 'n_channels': 4, 'n_regions': 1, 'n_tiles': 9,
+                           'tile_bytes': 1024, 'n_hande': 1}
+
+
+def make_stanford_codex_lz(topdir, n_cycles=4, n_channels=4, n_regions=1, n_tiles=9,
+                           tile_bytes=1024, n_hande=1):
+    os.makedirs(topdir, exist_ok=True)
+    channel_names = _codex_channel_names(n_cycles, n_channels)
+    write_metadata_tsv(os.path.join(topdir, 'synthetic-metadata.tsv'), 'CODEX',
+                       {'number_of_cycles': str(n_cycles),
+                        'number_of_antibodies': str(n_cycles * (n_channels - 1))})
+    datadir = os.path.join(topdir, 'synthetic_stanford')
+    os.makedirs(datadir)
+    write_json(os.path.join(datadir, 'processingOptions.json'),
+               {'deconvolution': 'Microvolution', 'useBlindDeconv': False})
+    write_json(os.path.join(datadir, 'Experiment.json'),
+               {'codex_instrument': 'CODEX', 'per_pixel_XY_resolution': 377.44,
+                'z_pitch': 1500.0, 'cycle_upper_limit': n_cycles,
+                'date': '2020-01-01 12:00:00.000', 'num_z_planes': 1})
+    with open(os.path.join(datadir, 'channelNames.txt'), 'w') as f:
+        f.write('\n'.join(channel_names) + '\n')
+    for idx in range(n_hande):
+        os.makedirs(os.path.join(datadir, 'HandE_{}'.format(idx + 1)))
+    _write_codex_cycles(datadir, n_cycles, n_regions, n_tiles, tile_bytes)
+
+
+RNASEQ_10X_DEFAULTS = {'n_samples': 2, 'n_lanes': 4, 'n_reads': 200, 'read_len': 100}
+
+
+def make_rnaseq_10x_lz(topdir, n_samples=2, n_lanes=4, n_reads=200, read_len=100):
+    os.makedirs(topdir, exist_ok=True)
+    write_metadata_tsv(os.path.join(topdir, 'synthetic-metadata.tsv'),
+                       'scRNAseq-10xGenomics')
+    datadir = os.path.join(topdir, 'raw_data')
+    os.makedirs(datadir)
+    with open(os.path.join(datadir, 'README.csv'), 'w') as f:
+        f.write('10x_Genomics_Index_well_ID,UUID Identifier,Sample_Name\n')
+        for idx in range(n_samples):
+            f.write('SI-GA-A{},SYN-0001,sample{}\n'.format(idx + 1, idx + 1))
+    seed = 0
+    for s_idx in range(n_samples):
+        sampledir = os.path.join(datadir, 'sample{}'.format(s_idx + 1))
+        os.makedirs(sampledir)
+        for lane in range(n_lanes):
+            for read in ['I1', 'R1', 'R2']:
+                fname = 'sample{}_S{}_L{:03d}_{}_001.fastq.gz'.format(s_idx + 1, s_idx + 1,
+                                                                     lane + 1, read)
+                write_fastq_gz(os.path.join(sampledir, fname), n_reads,
+                               8 if read == 'I1' else read_len, seed=seed)
+                seed += 1
+
+
+DEVTEST_DEFAULTS = {'n_extra_files': 2, 'extra_bytes': 1024}
+
+
+def make_devtest_lz(topdir, n_extra_files=2, extra_bytes=1024):
+    os.makedirs(topdir, exist_ok=True)
+    with open(os.path.join(topdir, 'test.yml'), 'w') as f:
+        f.write('{collectiontype: devtest, delay_sec: 1,\n'
+                ' metadata_to_return: {mymessage: "hello world"}}\n')
+    for idx in range(n_extra_files):
+        write_filler(os.path.join(topdir, 'file_{:03d}.doubles'.format(idx)), extra_bytes,
+                     seed=idx)
+
+
+GENERIC_METADATATSV_DEFAULTS = {'n_dirs': 4, 'n_files': 10, 'file_bytes': 1024}
+
+
+def make_generic_metadatatsv_lz(topdir, n_dirs=4, n_files=10, file_bytes=1024):
+    os.makedirs(topdir, exist_ok=True)
+    write_metadata_tsv(os.path.join(topdir, 'synthetic-metadata.tsv'), 'AF')
+    for d_idx in range(n_dirs):
+        subdir = os.path.join(topdir, 'data_{:03d}'.format(d_idx))
+        os.makedirs(subdir)
+        for f_idx in range(n_files):
+            write_filler(os.path.join(subdir, 'file_{:04d}.dat'.format(f_idx)), file_bytes,
+                         seed=f_idx)
+
+
+# collection type category_name -> (generator, default parameters)
+GENERATORS = {
+    'IMS': (make_ims_lz, IMS_DEFAULTS),
+    'AKOYA_CODEX': (make_akoya_codex_lz, AKOYA_CODEX_DEFAULTS),
+    'STANFORD_CODEX': (make_stanford_codex_lz, STANFORD_CODEX_DEFAULTS),
+    'RNASEQ10X': (make_rnaseq_10x_lz, RNASEQ_10X_DEFAULTS),
+    'DEVTEST': (make_devtest_lz, DEVTEST_DEFAULTS),
+    'GENERICMETADATATSV': (make_generic_metadatatsv_lz, GENERIC_METADATATSV_DEFAULTS),
+}
+
+
+def make_lz(category_name, topdir, **params):
+    """
+    Build a synthetic landing zone of the given collection type at topdir.
+    Unspecified parameters take their defaults.
+    """
+    fun, defaults = GENERATORS[category_name]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise KeyError('unknown parameters for {}: {}'.format(category_name,
+                                                               ', '.join(sorted(unknown))))
+    kwargs = defaults.copy()
+    kwargs.update(params)
+    fun(topdir, **kwargs)
+    return kwargs
+
+
+def parse_params(param_strs):
+    """
+    Parse a list of name=value strings, converting values to int or float
+    where possible
+    """
+    rslt = {}
+    for param_str in param_strs:
+        name, value = param_str.split('=', 1)
+        for tp in (int, float):
+            try:
+                value = tp(value)
+                break
+            except ValueError:
+                pass
+        rslt[name] = value
+    return rslt
+
+
+def main(myargv=None):
+    if myargv is None:
+        myargv = sys.argv
+    parser = argparse.ArgumentParser(description='Build a synthetic landing zone')
+    parser.add_argument('--type', choices=sorted(GENERATORS), default=None,
+                        help='collection type to fabricate')
+    parser.add_argument('--out', default=None, help='directory to create')
+    parser.add_argument('--param', action='append', default=[],
+                        help='generator parameter as name=value; may be repeated')
+    parser.add_argument('--list', action='store_true',
+                        help='list the collection types and their parameters')
+    ns = parser.parse_args(myargv[1:])
+    if ns.list:
+        for name in sorted(GENERATORS):
+            print('{}: {}'.format(name, GENERATORS[name][1]))
+        return
+    if ns.type is None or ns.out is None:
+        parser.error('--type and --out are required')
+    params = make_lz(ns.type, ns.out, **parse_params(ns.param))
+    print('built {} landing zone at {} with {}'.format(ns.type, ns.out, params))
+
+
+if __name__ == '__main__':
+    main()
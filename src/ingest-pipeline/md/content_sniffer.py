@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+
+"""
+Identify the kind of content in a file from its first few KB, so that a
+parser chosen by file name is never started on the wrong content.
+
+Binary formats are recognized by their magic bytes (TIFF and BigTIFF,
+CZI, gzip).  Anything with NUL bytes or mostly control characters is
+'binary'.  Text is 'xml' if it starts with a tag, 'json' if it starts
+with '{' or '[' (and, when the whole file fits in the sample, parses as
+JSON), 'yaml' if it starts with a document marker, a list item or a
+'key: value' line, and otherwise 'text'.  An empty file is 'empty'.
+
+MetadataFile subclasses list the kinds they can parse in content_kinds.
+The kind of each file is cached by path, size, modification time and
+inode for the life of the process.
+"""
+
+import os
+import re
+import json
+
+from type_base import MetadataError
+
+SNIFF_BYTES = 4096
+
+MAGIC = [
+    (b'II*\0', 'tiff'),
+    (b'MM\0*', 'tiff'),
+    (b'II+\0', 'bigtiff'),
+    (b'MM\0+', 'bigtiff'),
+    (b'ZISRAWFILE', 'czi'),
+    (b'\x1f\x8b', 'gzip'),
+]
+
+# Control characters other than tab, newline, carriage return, form feed,
+# backspace and escape mark a file as binary
+CONTROLS = bytes(c for c in range(32) if c not in b'\t\n\r\f\b\x1b')
+MAX_CONTROL_FRACTION = 0.1
+
+UTF8_BOM = b'\xef\xbb\xbf'
+YAML_LINE = re.compile(br'(---|\.\.\.|- |[^\s#:][^:\n]*:(\s|$))')
+XML_START = re.compile(br'<[?!A-Za-z_]')
+
+_SNIFF_CACHE = {}
+
+
+def sniff_bytes(head, complete):
+    """
+    Returns the kind of content of a file starting with the bytes head.
+    complete says whether head is the whole file.
+    """
+    if not head:
+        return 'empty'
+    for magic, kind in MAGIC:
+        if head.startswith(magic):
+            return kind
+    if b'\0' in head:
+        return 'binary'
+    n_control = len(head) - len(head.translate(None, CONTROLS))
+    if n_control > MAX_CONTROL_FRACTION * len(head):
+        return 'binary'
+    if head.startswith(UTF8_BOM):
+        head = head[len(UTF8_BOM):]
+    text = head.lstrip()
+    if XML_START.match(text):
+        return 'xml'
+    if text[:1] in (b'{', b'['):
+        if not complete:
+            return 'json'
+        try:
+            json.loads(text.decode('utf-8'))
+            return 'json'
+        except ValueError:
+            pass
+    for line in text.splitlines():
+        if line.strip() and not line.startswith(b'#'):
+            return 'yaml' if YAML_LINE.match(line) else 'text'
+    return 'text'
+
+
+def sniff(fpath):
+    """
+    Returns the kind of content of the file at fpath, or None if it cannot
+    be read
+    """
+    try:
+        st = os.stat(fpath)
+    except OSError:
+        return None
+    key = (os.path.realpath(fpath), st.st_size, st.st_mtime_ns, st.st_ino)
+    kind = _SNIFF_CACHE.get(key)
+    if kind is None:
+        try:
+            with open(fpath, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None
+        kind = sniff_bytes(head, len(head) >= st.st_size)
+        _SNIFF_CACHE[key] = kind
+    return kind
+
+
+def check_content(md_class, fpath):
+    """
+    Raises MetadataError if the content of fpath is not of a kind that the
+    MetadataFile subclass md_class parses
+    """
+    if md_class.content_kinds is None:
+        return
+    kind = sniff(fpath)
+    if kind is not None and kind not in md_class.content_kinds:
+        raise MetadataError('{} contains {} content, not the {} expected by {}'.format(
+            fpath, kind, '/'.join(md_class.content_kinds), md_class.__name__))
@@ -2,43 +2,120 @@
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from metadata_file import MetadataFile
-import data_file_types
+from dir_snapshot import DirSnapshot
+from content_sniffer import check_content
+from parser_sandbox import ParserSandbox
+from data_file_types import LazyTypeTable
+from scan_profile import profiled_parse
 
 
-_MD_TYPE_TBL = None  # lazy initialization
+_MD_TYPE_TBL = LazyTypeTable()  # parser modules are imported on first use
+
+
+def _parse_file(md_class, fpath, profile=False, trace_memory=False):
+    """
+    Worker for DataCollection.collect_file_metadata.  Returns (metadata, stats),
+    where stats is None unless profile is set.
+    """
+    print('collect from path %s' % fpath)
+    if profile:
+        return profiled_parse(md_class, fpath, trace_memory=trace_memory)
+    else:
+        return md_class(fpath).collect_metadata(), None
+
+
+def _class_settings(md_class):
+    """
+    The plain-valued class attributes of md_class, such as sample_reads,
+    which a scan may have changed at run time
+    """
+    return {k: v for k, v in vars(md_class).items()
+            if not k.startswith('_') and isinstance(v, (bool, int, float, str, type(None)))}
+
+
+def _parse_file_with_settings(md_class, settings, fpath, profile=False, trace_memory=False):
+    """
+    _parse_file for a ParserSandbox worker, which is not forked from the
+    scanning process and so must be given the class settings explicitly
+    """
+    for k, v in settings.items():
+        setattr(md_class, k, v)
+    return _parse_file(md_class, fpath, profile, trace_memory)
 
 
 class DataCollection(object):
     category_name = 'Base'
     match_priority = -1.0 # normally >= 0.0, higher is better
+    parse_threads = 1  # files are parsed serially unless this is > 1
+    parse_processes = 0  # if > 0, cpu_bound file types are parsed in worker processes
+    # If either is set, every file is parsed in a ParserSandbox worker process
+    # limited to this many bytes of address space and seconds per file
+    parse_memory_limit = None
+    parse_timeout = None
+    md_cache = None  # optionally a MetadataCache of parsed file metadata
+    profile = None  # optionally a ScanProfile recording the cost of each parse
+    profile_memory = False  # if profiling, also trace peak memory (slow)
+    # Globs from expected_files and optional_files naming the files which
+    # filter_metadata actually uses; None means all of them.  Only these
+    # files are parsed unless collect_all is set.
+    filter_inputs = None
+    collect_all = False  # for debugging, parse every file even if it is not used
+    # Check the first bytes of each file against the content its parser
+    # expects before any parsing starts
+    sniff_content = True
     
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
-        containing data of this collection type?
+        containing data of this collection type?  scan() only calls this
+        if every expected_files pattern found a file, so subclasses may add
+        checks but must not match without their expected files.
         """
         return False
 
+    @classmethod
+    def get_snapshot(cls, path, snapshot=None):
+        """
+        Returns the given DirSnapshot, or a new one of path if none was given.
+        A new snapshot reads only path itself up front; subdirectories are
+        listed as the probes reach them.
+        """
+        return DirSnapshot(path, max_depth=0) if snapshot is None else snapshot
+
+    @classmethod
+    def get_file_patterns(cls, path, snapshot=None):
+        """
+        Returns a list of (glob relative to path, filetype key, is_expected)
+        tuples for this collection type's expected_files and optional_files,
+        with any {offsetdir} resolved, or None if this collection type has
+        a top directory and it cannot be found.
+        """
+        if hasattr(cls, 'find_top'):
+            offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex,
+                                     cls.get_snapshot(path, snapshot))
+            if offsetdir is None:
+                return None
+        else:
+            offsetdir = '.'
+        rslt = [(match.format(offsetdir=offsetdir), md_type, True)
+                for match, md_type in getattr(cls, 'expected_files', [])]
+        rslt += [(match.format(offsetdir=offsetdir), md_type, False)
+                 for match, md_type in getattr(cls, 'optional_files', [])]
+        return rslt
+
     def get_md_type_tbl(self):
-        global _MD_TYPE_TBL
-
-        if _MD_TYPE_TBL is None:
-            tbl = {}
-            for nm in dir(data_file_types):
-                elt = getattr(data_file_types, nm)
-                if isinstance(elt, type) and issubclass(elt, MetadataFile):
-                    tbl[elt.category_name.upper()] = elt
-            _MD_TYPE_TBL = tbl
         return _MD_TYPE_TBL
 
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
         self.topdir = path
+        self.snapshot = self.get_snapshot(path, snapshot)
     
     def __str__(self):
         return '<%s DataCollectionCategory>' % self.category_name
@@ -48,6 +125,123 @@ class DataCollection(object):
 
     def collect_metadata(self):
         return {}
+
+    def collect_patterns(self):
+        """
+        Returns the (glob, filetype key) pairs from expected_files and
+        optional_files whose files need to be parsed by collect_metadata.
+        """
+        pairs = getattr(self, 'expected_files', []) + getattr(self, 'optional_files', [])
+        if self.collect_all or self.filter_inputs is None:
+            return pairs
+        else:
+            return [(match, md_type) for match, md_type in pairs
+                    if match in self.filter_inputs]
+
+    def collect_file_metadata(self, targets):
+        """
+        Parse each of the (path, filetype key) pairs in targets, returning a
+        list of (path, metadata) pairs in the same order.  Files are parsed
+        concurrently in a thread pool if parse_threads > 1.  If
+        parse_processes > 0, file types marked cpu_bound are instead parsed
+        in a pool of that many worker processes.  If md_cache is set, cached
+        results are used where possible and new results are stored.  If
+        sniff_content is set, a MetadataError is raised before any file is
+        parsed if one does not contain what its parser expects.
+        """
+        md_type_tbl = self.get_md_type_tbl()
+        jobs = [(fpath, md_type_tbl[md_type]) for fpath, md_type in targets]
+        rslt = [None] * len(jobs)
+        todo = []
+        cache_keys = {}
+        for idx, (fpath, md_class) in enumerate(jobs):
+            if self.md_cache is not None:
+                key = self.md_cache.file_key(fpath, md_class)
+                if key is not None:
+                    found, md = self.md_cache.get(key)
+                    if found:
+                        print('using cached metadata for %s' % fpath)
+                        rslt[idx] = (fpath, md)
+                        if self.profile is not None:
+                            self.profile.record_cached_file(fpath, md_class)
+                        continue
+                    cache_keys[idx] = key
+            todo.append(idx)
+        if self.sniff_content:
+            for idx in todo:
+                fpath, md_class = jobs[idx]
+                check_content(md_class, fpath)
+        for idx, (md, stats) in zip(todo, self._parse_jobs([jobs[idx] for idx in todo])):
+            rslt[idx] = (jobs[idx][0], md)
+            if stats is not None:
+                self.profile.record_file(stats)
+            if idx in cache_keys:
+                self.md_cache.put(cache_keys[idx], md)
+        return rslt
+
+    def _parse_jobs(self, jobs):
+        """
+        Generator yielding (metadata, profiling stats or None) for each
+        (path, MetadataFile subclass) pair in jobs, in order.
+        """
+        profile = self.profile is not None
+        trace = profile and self.profile_memory
+        if self.parse_memory_limit is not None or self.parse_timeout is not None:
+            yield from self._parse_jobs_sandboxed(jobs, profile, trace)
+            return
+        if self.parse_threads <= 1 and self.parse_processes <= 0:
+            for fpath, md_class in jobs:
+                yield _parse_file(md_class, fpath, profile, trace_memory=trace)
+            return
+
+        thread_pool = ThreadPoolExecutor(max_workers=max(self.parse_threads, 1))
+        process_pool = (ProcessPoolExecutor(max_workers=self.parse_processes)
+                        if self.parse_processes > 0 else None)
+        futures = []
+        try:
+            for fpath, md_class in jobs:
+                if process_pool is not None and md_class.cpu_bound:
+                    # Each worker process parses one file at a time
+                    futures.append(process_pool.submit(_parse_file, md_class, fpath,
+                                                       profile, trace))
+                else:
+                    # Peak memory cannot be separated between concurrent threads
+                    futures.append(thread_pool.submit(_parse_file, md_class, fpath, profile,
+                                                      trace and self.parse_threads <= 1))
+            # Results are gathered in submission order, so the first failure
+            # in that order is the one reported, as when parsing serially
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            thread_pool.shutdown()
+            if process_pool is not None:
+                process_pool.shutdown()
     
+    def _parse_jobs_sandboxed(self, jobs, profile, trace):
+        """
+        As _parse_jobs, but with every file parsed in a ParserSandbox worker
+        process, using as many workers as the larger of parse_threads and
+        parse_processes
+        """
+        if not jobs:
+            return
+        n_workers = max(self.parse_threads, self.parse_processes, 1)
+        with ParserSandbox(max_workers=min(n_workers, len(jobs)),
+                           memory_limit=self.parse_memory_limit,
+                           timeout=self.parse_timeout) as sandbox:
+            futures = [sandbox.submit(_parse_file_with_settings, md_class,
+                                      _class_settings(md_class), fpath, profile,
+                                      trace and n_workers <= 1,
+                                      label='{} parsing {}'.format(md_class.__name__, fpath))
+                       for fpath, md_class in jobs]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
     def filter_metadata(self, metadata):
         return metadata.copy()
@@ -80,68 +80,75 @@ class AkoyaCODEXDataCollection(DataCollection):
     
     optional_files = [('exposure_times.txt', 'CSV')]
 
+    # filter_metadata uses only these; segmentation.json and exposure times are not parsed
+    filter_inputs = ['*-metadata.tsv', '{offsetdir}/experiment.json']
+
     @classmethod
-    def find_top(cls, path, target, dir_regex=None):
+    def find_top(cls, path, target, dir_regex=None, snapshot=None):
         """
         In some cases, all or most of the needed files are in a subdirectory.  If it
         exists, find it.
         """
-        if target in os.listdir(path):
+        snapshot = cls.get_snapshot(path, snapshot)
+        if target in snapshot.listdir(path):
             return '.'
         else:
             if dir_regex is None:
-                candidates = [nm for nm in os.listdir(path)
-                              if os.path.isdir(os.path.join(path, nm))]
+                candidates = [nm for nm in snapshot.listdir(path)
+                              if snapshot.isdir(os.path.join(path, nm))]
             else:
-                candidates = [nm for nm in os.listdir(path)
-                              if os.path.isdir(os.path.join(path, nm)) and dir_regex.match(nm)]
+                candidates = [nm for nm in snapshot.listdir(path)
+                              if snapshot.isdir(os.path.join(path, nm)) and dir_regex.match(nm)]
             for cand in candidates:
-                if target in os.listdir(os.path.join(path, cand)):
+                if target in snapshot.listdir(os.path.join(path, cand)):
                     return cand
             else:
                 return None
 
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
         containing data of this collection type?
         """
-        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex)
+        snapshot = cls.get_snapshot(path, snapshot)
+        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex, snapshot)
         if offsetdir is None:
             return False
         for match, _ in cls.expected_files:
             print('testing %s' % match.format(offsetdir=offsetdir))
-            if not any(glob.iglob(os.path.join(path,match.format(offsetdir=offsetdir)))):
+            if not any(snapshot.iglob(os.path.join(path,match.format(offsetdir=offsetdir)))):
                 print('not found!')
                 return False
         return True
     
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
-        super().__init__(path)
-        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex)
+        super().__init__(path, snapshot)
+        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex,
+                                       self.snapshot)
         assert self.offsetdir is not None, 'Wrong dataset type?'
             
     
     def collect_metadata(self):
         rslt = {}
-        md_type_tbl = self.get_md_type_tbl()
         cl = []
-        for match, md_type in self.expected_files + self.optional_files:
+        targets = []
+        for match, md_type in self.collect_patterns():
             print('collect match %s' % match.format(offsetdir=self.offsetdir))
-            for fpath in glob.iglob(os.path.join(self.topdir,
-                                                 match.format(offsetdir=self.offsetdir))):
-                print('collect from path %s' % fpath)
-                this_md = md_type_tbl[md_type](fpath).collect_metadata()
-                if this_md is not None:
-                    rslt[os.path.relpath(fpath, self.topdir)] = this_md
-                    fname = os.path.basename(fpath)
-                    if 'metadata' in fname and fname.endswith('.tsv'):
-                        assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
-                        cl.extend(this_md)
+            for fpath in self.snapshot.iglob(os.path.join(self.topdir,
+                                                          match.format(offsetdir=self.offsetdir))):
+                targets.append((fpath, md_type))
+        for fpath, this_md in self.collect_file_metadata(targets):
+            if this_md is not None:
+                rslt[os.path.relpath(fpath, self.topdir)] = this_md
+                fname = os.path.basename(fpath)
+                if 'metadata' in fname and fname.endswith('.tsv'):
+                    assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
+                    cl.extend(this_md)
         rslt['components'] = cl
         rslt['collectiontype'] = 'codex'
         return rslt
@@ -3,8 +3,6 @@
 import os
 import json
 import glob
-import pandas as pd
-import numpy as np
 import types
 import yaml
 from pprint import pprint
@@ -22,14 +20,15 @@ class DEVTESTDataCollection(DataCollection):
     optional_files = []
     
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
         containing data of this collection type?
         """
+        snapshot = cls.get_snapshot(path, snapshot)
         for match, _ in cls.expected_files:
             print('testing %s' % match)
-            if not any(glob.iglob(os.path.join(path, match))):
+            if not any(snapshot.iglob(os.path.join(path, match))):
                 print('not found!')
                 return False
         assert 'test.yml' in [a for a, b in cls.expected_files], 'name of my info file has changed?'
@@ -40,25 +39,26 @@ class DEVTESTDataCollection(DataCollection):
         
         return True
     
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
-        super().__init__(path)
+        super().__init__(path, snapshot)
     
 
     def collect_metadata(self):
         rslt = {}
-        md_type_tbl = self.get_md_type_tbl()
-        for match, md_type in self.expected_files + self.optional_files:
+        targets = []
+        for match, md_type in self.collect_patterns():
             print('collect match %s' % match)
-            for fpath in glob.iglob(os.path.join(self.topdir, match)):
-                print('collect from path %s' % fpath)
-                this_md = md_type_tbl[md_type](fpath).collect_metadata()
-                if this_md is not None:
-                    rslt[os.path.relpath(fpath, self.topdir)] = this_md
+            for fpath in self.snapshot.iglob(os.path.join(self.topdir, match)):
+                targets.append((fpath, md_type))
+        for fpath, this_md in self.collect_file_metadata(targets):
+            if this_md is not None:
+                rslt[os.path.relpath(fpath, self.topdir)] = this_md
         cl = []
-        for fname in os.listdir(self.topdir):
+        for fname in self.snapshot.listdir(self.topdir):
             fullname = os.path.join(self.topdir, fname)
             if fname.endswith('.yml'):
                 cl.append(fname)
@@ -27,7 +27,7 @@ class GenericMetadataTSVDataCollection(DataCollection):
 
 
     @classmethod
-    def find_top(cls, path, target, dir_regex=None):
+    def find_top(cls, path, target, dir_regex=None, snapshot=None):
         """
         For this data collection, there is expected to be only a single directory
         containing the metadata.tsv file.
@@ -36,17 +36,18 @@ class GenericMetadataTSVDataCollection(DataCollection):
 
 
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
         containing data of this collection type?
         """
-        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex)
+        snapshot = cls.get_snapshot(path, snapshot)
+        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex, snapshot)
         print('Checking for lone metadata.tsv at top level')
         if offsetdir is None:
             return False
         mf_glob = cls.expected_files[0][0].format(offsetdir=offsetdir)
-        hits = [elt for elt in glob.iglob(os.path.join(path, offsetdir, mf_glob))]
+        hits = [elt for elt in snapshot.iglob(os.path.join(path, offsetdir, mf_glob))]
         if hits:
             if len(hits) == 1:
                 return True
@@ -57,31 +58,33 @@ class GenericMetadataTSVDataCollection(DataCollection):
             return False
             
     
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
-        super().__init__(path)
-        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex)
+        super().__init__(path, snapshot)
+        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex,
+                                       self.snapshot)
         assert self.offsetdir is not None, 'Wrong dataset type?'
 
     
     def collect_metadata(self):
-        md_type_tbl = self.get_md_type_tbl()
         rslt = {}
         cl = []
-        for match, md_type in self.expected_files + self.optional_files:
+        targets = []
+        for match, md_type in self.collect_patterns():
             print('collect match %s' % match.format(offsetdir=self.offsetdir))
-            for fpath in glob.iglob(os.path.join(self.topdir,
-                                                 match.format(offsetdir=self.offsetdir))):
-                print('collect from path %s' % fpath)
-                this_md = md_type_tbl[md_type](fpath).collect_metadata()
-                if this_md is not None:
-                    rslt[os.path.relpath(fpath, self.topdir)] = this_md
-                    fname = os.path.basename(fpath)
-                    if 'metadata' in fname and fname.endswith('.tsv'):
-                        assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
-                        cl.extend(this_md)
+            for fpath in self.snapshot.iglob(os.path.join(self.topdir,
+                                                          match.format(offsetdir=self.offsetdir))):
+                targets.append((fpath, md_type))
+        for fpath, this_md in self.collect_file_metadata(targets):
+            if this_md is not None:
+                rslt[os.path.relpath(fpath, self.topdir)] = this_md
+                fname = os.path.basename(fpath)
+                if 'metadata' in fname and fname.endswith('.tsv'):
+                    assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
+                    cl.extend(this_md)
 
         rslt['components'] = cl
         rslt['collectiontype'] = 'single_metadatatsv'
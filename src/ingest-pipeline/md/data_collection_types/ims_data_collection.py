@@ -4,6 +4,7 @@ import os
 import json
 import glob
 
+from type_base import MetadataError
 from data_collection import DataCollection
 
 class IMSDataCollection(DataCollection):
@@ -44,7 +45,7 @@ class IMSDataCollection(DataCollection):
                       ('IMS/columnar/*.csv',
                        "IGNORE"),
                       ('IMS/imzml/*.ibd',
-                       "IGNORE"),
+                       "IBD"),
                       ('IMS/imzml/*.imzML',
                        "IMZML"),
                       ('IMS/tif/*.ome.tiff',
@@ -54,36 +55,41 @@ class IMSDataCollection(DataCollection):
                       ]
     
     optional_files = []
+
+    # filter_metadata uses the spatial metadata and the .ibd summaries
+    filter_inputs = ['*-spatial_meta.txt', 'IMS/imzml/*.ibd']
     
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
         containing data of this collection type?
         """
+        snapshot = cls.get_snapshot(path, snapshot)
         for match, _ in cls.expected_files:
             print('testing %s' % match)
-            if not any(glob.iglob(os.path.join(path,match))):
+            if not any(snapshot.iglob(os.path.join(path,match))):
                 print('not found!')
                 return False
         return True
     
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
-        super().__init__(path)
+        super().__init__(path, snapshot)
     
     def collect_metadata(self):
         rslt = {}
-        md_type_tbl = self.get_md_type_tbl()
-        for match, md_type in self.expected_files + self.optional_files:
+        targets = []
+        for match, md_type in self.collect_patterns():
             #print('collect match %s' % match)
-            for fpath in glob.iglob(os.path.join(self.topdir, match)):
-                #print('collect from path %s' % fpath)
-                this_md = md_type_tbl[md_type](fpath).collect_metadata()
-                if this_md is not None:
-                    rslt[os.path.relpath(fpath, self.topdir)] = this_md
+            for fpath in self.snapshot.iglob(os.path.join(self.topdir, match)):
+                targets.append((fpath, md_type))
+        for fpath, this_md in self.collect_file_metadata(targets):
+            if this_md is not None:
+                rslt[os.path.relpath(fpath, self.topdir)] = this_md
         return rslt
     
     def filter_metadata(self, metadata):
@@ -98,10 +104,14 @@ class IMSDataCollection(DataCollection):
             if not os.path.dirname(elt) and elt.endswith('spatial_meta.txt'):
                 spatial_meta = metadata[elt]
                 break
-            else:
-                raise MetadataError('The spatial metadata is unexpectedly missing')
+        else:
+            raise MetadataError('The spatial metadata is unexpectedly missing')
 
         rslt['ccf_spatial'] = {k : v for k, v in spatial_meta.items()}
+
+        ibd_summary = {elt: metadata[elt] for elt in metadata if elt.endswith('.ibd')}
+        if ibd_summary:
+            rslt['ibd_summary'] = ibd_summary
         
         #rslt['other_meta'] = metadata.copy()  # for debugging
         return rslt
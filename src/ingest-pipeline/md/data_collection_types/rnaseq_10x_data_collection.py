@@ -24,34 +24,42 @@ class RNASEQ10XDataCollection(DataCollection):
     
     optional_files = []
 
+    # The fastq files are parsed too: their statistics and gzip checks go
+    # into fastq_summary, and a damaged fastq fails the scan.  Pass
+    # fastq_sample and parse_processes to keep this off the critical path.
+    filter_inputs = ['*-metadata.tsv', '{offsetdir}/README.csv',
+                     '{offsetdir}/*/*_I1_*.fastq.gz', '{offsetdir}/*/*_R1_*.fastq.gz']
+
     @classmethod
-    def find_top(cls, path, target, dir_regex=None):
+    def find_top(cls, path, target, dir_regex=None, snapshot=None):
         """
         In some cases, all or most of the needed files are in a subdirectory.  If it
         exists, find it.
         """
-        if target in os.listdir(path):
+        snapshot = cls.get_snapshot(path, snapshot)
+        if target in snapshot.listdir(path):
             return '.'
         else:
             if dir_regex is None:
-                candidates = [nm for nm in os.listdir(path)
-                              if os.path.isdir(os.path.join(path, nm))]
+                candidates = [nm for nm in snapshot.listdir(path)
+                              if snapshot.isdir(os.path.join(path, nm))]
             else:
-                candidates = [nm for nm in os.listdir(path)
-                              if os.path.isdir(os.path.join(path, nm)) and dir_regex.match(nm)]
+                candidates = [nm for nm in snapshot.listdir(path)
+                              if snapshot.isdir(os.path.join(path, nm)) and dir_regex.match(nm)]
             for cand in candidates:
-                if target in os.listdir(os.path.join(path, cand)):
+                if target in snapshot.listdir(os.path.join(path, cand)):
                     return cand
             else:
                 return None
 
     @classmethod
-    def test_match(cls, path):
+    def test_match(cls, path, snapshot=None):
         """
         Does the given path point to the top directory of a directory tree
         containing data of this collection type?
         """
-        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex)
+        snapshot = cls.get_snapshot(path, snapshot)
+        offsetdir = cls.find_top(path, cls.top_target, cls.dir_regex, snapshot)
         if offsetdir is None:
             return False
         with open(os.path.join(path, offsetdir, cls.top_target)) as f:
@@ -61,36 +69,41 @@ class RNASEQ10XDataCollection(DataCollection):
                 return False
         for match, _ in cls.expected_files:
             print('testing %s' % match.format(offsetdir=offsetdir))
-            if not any(glob.iglob(os.path.join(path,match.format(offsetdir=offsetdir)))):
+            if not any(snapshot.iglob(os.path.join(path,match.format(offsetdir=offsetdir)))):
                 print('not found!')
                 return False
         return True
             
     
-    def __init__(self, path):
+    def __init__(self, path, snapshot=None):
         """
-        path is the top level directory of the collection
+        path is the top level directory of the collection; snapshot is an
+        optional DirSnapshot of it
         """
-        super().__init__(path)
-        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex)
+        super().__init__(path, snapshot)
+        self.offsetdir = self.find_top(self.topdir, self.top_target, self.dir_regex,
+                                       self.snapshot)
         assert self.offsetdir is not None, 'Wrong dataset type?'
     
     def collect_metadata(self):
-        md_type_tbl = self.get_md_type_tbl()
         rslt = {}
         cl = []
-        for match, md_type in self.expected_files + self.optional_files:
+        targets = []
+        seen = set()
+        for match, md_type in self.collect_patterns():
             print('collect match %s' % match.format(offsetdir=self.offsetdir))
-            for fpath in glob.iglob(os.path.join(self.topdir,
-                                                 match.format(offsetdir=self.offsetdir))):
-                print('collect from path %s' % fpath)
-                this_md = md_type_tbl[md_type](fpath).collect_metadata()
-                if this_md is not None:
-                    rslt[os.path.relpath(fpath, self.topdir)] = this_md
-                    fname = os.path.basename(fpath)
-                    if 'metadata' in fname and fname.endswith('.tsv'):
-                        assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
-                        cl.extend(this_md)
+            for fpath in self.snapshot.iglob(os.path.join(self.topdir,
+                                                          match.format(offsetdir=self.offsetdir))):
+                if fpath not in seen:  # the R1 pattern is listed twice
+                    seen.add(fpath)
+                    targets.append((fpath, md_type))
+        for fpath, this_md in self.collect_file_metadata(targets):
+            if this_md is not None:
+                rslt[os.path.relpath(fpath, self.topdir)] = this_md
+                fname = os.path.basename(fpath)
+                if 'metadata' in fname and fname.endswith('.tsv'):
+                    assert isinstance(this_md, list), 'metadata...tsv did not produce a list'
+                    cl.extend(this_md)
 
         rslt['components'] = cl
         rslt['collectiontype'] = 'rnaseq_10x'
@@ -123,6 +136,21 @@ class RNASEQ10XDataCollection(DataCollection):
         if rslt['tissue_id'] != readme_md['UUID Identifier']:
             raise MetadataError('tissue_id does not match UUID Identifier')
 
+    def check_fastq_gzip(self, fastq_summary):
+        """
+        Raise MetadataError if any fastq.gz file is empty, not gzip, truncated
+        or fails a CRC32 or ISIZE check
+        """
+        bad = []
+        for fname, fastq_md in sorted(fastq_summary.items()):
+            gzip_status = fastq_md.get('gzip')
+            if gzip_status is None:
+                bad.append('{}: not a gzip file'.format(fname))
+            elif gzip_status['ok'] is False:
+                bad.append('{}: {}'.format(fname, gzip_status['error']))
+        if bad:
+            raise MetadataError('Invalid fastq.gz files: {}'.format('; '.join(bad)))
+
     def filter_metadata(self, raw_metadata):
         """
         This extracts the metadata which is actually desired downstream from the bulk of the
@@ -144,6 +172,11 @@ class RNASEQ10XDataCollection(DataCollection):
         #self.internal_consistency_checks(rslt, readme_md)
 
         rslt['other_metadata'] = readme_md
+
+        fastq_summary = {k: raw_metadata[k] for k in raw_metadata if k.endswith('.fastq.gz')}
+        if fastq_summary:
+            self.check_fastq_gzip(fastq_summary)
+            rslt['fastq_summary'] = fastq_summary
             
         return rslt
             
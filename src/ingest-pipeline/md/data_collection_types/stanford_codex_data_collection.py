@@ -24,14 +24,17 @@ class StanfordCODEXDataCollection(AkoyaCODEXDataCollection):
                       ]
     
     optional_files = []
+
+    filter_inputs = ['*-metadata.tsv', '{offsetdir}/Experiment.json',
+                     '{offsetdir}/channelNames.txt']
     
 
     def collect_metadata(self):
         rslt = super(StanfordCODEXDataCollection, self).collect_metadata()
         hande_cl = []
-        for fname in os.listdir(os.path.join(self.topdir, self.offsetdir)):
+        for fname in self.snapshot.listdir(os.path.join(self.topdir, self.offsetdir)):
             fullname = os.path.join(self.topdir, self.offsetdir, fname)
-            if os.path.isdir(fullname) and fname.startswith('HandE_'):
+            if self.snapshot.isdir(fullname) and fname.startswith('HandE_'):
                 hande_cl.append(fname)
         rslt['hande_components'] = hande_cl
         rslt['collectiontype'] = 'codex'
@@ -1,19 +1,64 @@
-from .ignore_metadata_file import IgnoreMetadataFile
-from .yaml_metadata_file import YamlMetadataFile
-from .json_metadata_file import JSONMetadataFile
-from .false_json_metadata_file import FalseJSONMetadataFile
-from .txt_tform_metadata_file import TxtTformMetadataFile
-from .txt_wordlist_metadata_file import TxtWordListMetadataFile
-from .mtx_tform_metadata_file import MtxTformMetadataFile
-from .czi_metadata_file import CZIMetadataFile
-from .ome_tiff_metadata_file import OMETiffMetadataFile
-from .scn_tiff_metadata_file import ScnTiffMetadataFile
-from .imzml_metadata_file import ImzMLMetadataFile
-from .fastq_metadata_file import FASTQMetadataFile
-from .csv_metadata_file import CSVMetadataFile
-from .metadatatsv_metadata_file import MetadataTSVMetadataFile
-__all__ = ["IgnoreMetadataFile", "YamlMetadataFile", "JSONMetadataFile",
-           "TxtTformMetadataFile", "MtxTformMetadataFile", "CZIMetadataFile",
-           "OMETiffMetadataFile", "ScnTiffMetadataFile", "ImzMLMetadataFile",
-           "FASTQMetadataFile", "FalseJSONMetadataFile", "TxtWordListMetadataFile",
-           "CSVMetadataFile", "MetadataTSVMetadataFile"]
+"""
+Registry of the known metadata file types.
+
+The parser modules pull in heavy dependencies (lxml, numpy, the
+ingest-validation-tools submodule), so each is imported only when a file
+of its type is actually parsed.
+"""
+
+from importlib import import_module
+from collections.abc import Mapping
+
+# Filetype key (the parser's category_name in upper case) ->
+#   (module, class name, {'requires': third-party modules the parser imports})
+FILE_TYPE_REGISTRY = {
+    'IGNORE': ('.ignore_metadata_file', 'IgnoreMetadataFile', {'requires': []}),
+    'YAML': ('.yaml_metadata_file', 'YamlMetadataFile', {'requires': ['yaml']}),
+    'JSON': ('.json_metadata_file', 'JSONMetadataFile', {'requires': []}),
+    'FALSE_JSON': ('.false_json_metadata_file', 'FalseJSONMetadataFile', {'requires': []}),
+    'TXTTFORM': ('.txt_tform_metadata_file', 'TxtTformMetadataFile', {'requires': []}),
+    'TXTWORDLIST': ('.txt_wordlist_metadata_file', 'TxtWordListMetadataFile',
+                    {'requires': []}),
+    'MTXTFORM': ('.mtx_tform_metadata_file', 'MtxTformMetadataFile', {'requires': []}),
+    'CZI': ('.czi_metadata_file', 'CZIMetadataFile',
+            {'requires': ['xmltodict', 'lxml']}),
+    'OME_TIFF': ('.ome_tiff_metadata_file', 'OMETiffMetadataFile',
+                 {'requires': ['xmltodict', 'lxml']}),
+    'SCN_TIFF': ('.scn_tiff_metadata_file', 'ScnTiffMetadataFile',
+                 {'requires': ['xmltodict']}),
+    'IMZML': ('.imzml_metadata_file', 'ImzMLMetadataFile', {'requires': ['lxml']}),
+    'IBD': ('.ibd_metadata_file', 'IBDMetadataFile', {'requires': ['numpy', 'lxml']}),
+    'FASTQ': ('.fastq_metadata_file', 'FASTQMetadataFile', {'requires': ['numpy']}),
+    'CSV': ('.csv_metadata_file', 'CSVMetadataFile', {'requires': []}),
+    'TABULAR': ('.tabular_metadata_file', 'TabularMetadataFile', {'requires': []}),
+    'METADATATSV': ('.metadatatsv_metadata_file', 'MetadataTSVMetadataFile', {'requires': []}),
+}
+
+
+def get_metadata_file_class(key):
+    """
+    Returns the MetadataFile subclass for the given filetype key, importing
+    its module if necessary.
+    """
+    module_name, class_name, _ = FILE_TYPE_REGISTRY[key.upper()]
+    return getattr(import_module(module_name, __name__), class_name)
+
+
+class LazyTypeTable(Mapping):
+    """
+    A read-only mapping from filetype key to MetadataFile subclass which
+    imports each parser module on first lookup.
+    """
+    def __getitem__(self, key):
+        if key.upper() not in FILE_TYPE_REGISTRY:
+            raise KeyError(key)
+        return get_metadata_file_class(key)
+
+    def __iter__(self):
+        return iter(FILE_TYPE_REGISTRY)
+
+    def __len__(self):
+        return len(FILE_TYPE_REGISTRY)
+
+
+__all__ = ["FILE_TYPE_REGISTRY", "get_metadata_file_class", "LazyTypeTable"]
@@ -1,18 +1,22 @@
 #! /usr/bin/env python
 
-import pylibczi
-import xmltodict
-from lxml import etree
+import xml_to_dict
 from metadata_file import MetadataFile
+from thirdparty import czi_header
 
 class CZIMetadataFile(MetadataFile):
     """A metadata file type for CZI (Zeiss) files"""
     category_name = 'CZI';
+    content_kinds = ('czi',)
+    cpu_bound = True  # dominated by XML parsing
+    parser_version = 2
+    exclude_paths = None
 
     def collect_metadata(self):
         print('parsing czi from %s' % self.path)
-        czi_file = pylibczi.CziFile(self.path, verbose=True)
-        czi_file.read_meta()
-        metadata = xmltodict.parse(etree.tostring(czi_file.meta_root))
+        # Only the header, metadata and subblock directory segments are read
+        xml, summary = czi_header.read_czi_header(self.path)
+        metadata = xml_to_dict.parse(xml, exclude=self.exclude_paths) if xml else {}
+        metadata['czi_summary'] = summary
         return metadata
     
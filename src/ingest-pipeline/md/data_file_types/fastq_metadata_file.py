@@ -1,10 +1,207 @@
 #! /usr/bin/env python
 
+import zlib
+from collections import Counter
+
+import numpy as np
+
 from metadata_file import MetadataFile
 
+GZIP_MAGIC = b'\x1f\x8b'
+BUFFER_SIZE = 1024 * 1024  # bytes read, and at most decompressed, per step
+QUALITY_OFFSET = 33  # Phred+33 quality encoding
+
+
+def _gzip_chunks(f, status):
+    """
+    Yields the decompressed contents of the gzip stream f in chunks of at
+    most BUFFER_SIZE bytes, checking the CRC32 and ISIZE trailer of every
+    member (BGZF and concatenated files have many).  Instead of raising, a
+    corrupt or truncated stream ends the iteration and is recorded in
+    status, a dict with the keys 'members', 'ok' and 'error'.
+    """
+    decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    in_member = False
+    buf = f.read(BUFFER_SIZE)
+    while buf:
+        in_member = True
+        try:
+            out = decomp.decompress(buf, BUFFER_SIZE)
+        except zlib.error as e:
+            status['ok'] = False
+            status['error'] = 'member {}: {}'.format(status['members'] + 1, e)
+            return
+        if out:
+            yield out
+        if decomp.eof:
+            # zlib has checked the trailer; anything after it is another member
+            status['members'] += 1
+            in_member = False
+            buf = decomp.unused_data or f.read(BUFFER_SIZE)
+            if buf and not buf.strip(b'\0'):
+                # Zero padding after the last member
+                while buf and not buf.strip(b'\0'):
+                    buf = f.read(BUFFER_SIZE)
+                if buf:
+                    status['ok'] = False
+                    status['error'] = 'data after zero padding'
+                    return
+            decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif decomp.unconsumed_tail:
+            buf = decomp.unconsumed_tail
+        else:
+            buf = f.read(BUFFER_SIZE)
+    if in_member:
+        status['ok'] = False
+        status['error'] = 'member {}: truncated'.format(status['members'] + 1)
+    else:
+        status['ok'] = status['members'] > 0
+        if not status['ok']:
+            status['error'] = 'empty file'
+
+
+def _plain_chunks(f):
+    buf = f.read(BUFFER_SIZE)
+    while buf:
+        yield buf
+        buf = f.read(BUFFER_SIZE)
+
+
+class FASTQStats(object):
+    """
+    Running statistics over FASTQ records, updated a batch of records at a
+    time so that the per-cycle quality sums are computed by numpy.
+    """
+    def __init__(self):
+        self.n_reads = 0
+        self.n_bases = 0
+        self.n_malformed = 0
+        self.lengths = Counter()
+        self.quality_sums = np.zeros(0, dtype=np.int64)
+
+    def _add_quality(self, quals, length):
+        if length == 0:
+            return
+        if len(self.quality_sums) < length:
+            grown = np.zeros(length, dtype=np.int64)
+            grown[:len(self.quality_sums)] = self.quality_sums
+            self.quality_sums = grown
+        arr = np.frombuffer(b''.join(quals), dtype=np.uint8).reshape(len(quals), length)
+        self.quality_sums[:length] += arr.sum(axis=0, dtype=np.int64)
+        self.quality_sums[:length] -= QUALITY_OFFSET * len(quals)
+
+    def add(self, heads, seqs, plus, quals):
+        """
+        Add the records whose four lines are given by the parallel lists
+        """
+        good = [idx for idx in range(len(seqs))
+                if heads[idx][:1] == b'@' and plus[idx][:1] == b'+'
+                and len(seqs[idx]) == len(quals[idx])]
+        if len(good) < len(seqs):
+            self.n_malformed += len(seqs) - len(good)
+            seqs = [seqs[idx] for idx in good]
+            quals = [quals[idx] for idx in good]
+        lengths = [len(s) for s in seqs]
+        if not lengths:
+            return
+        self.n_reads += len(lengths)
+        self.n_bases += sum(lengths)
+        counts = Counter(lengths)
+        self.lengths.update(counts)
+        if len(counts) == 1:
+            self._add_quality(quals, lengths[0])
+        else:
+            for length in counts:
+                self._add_quality([q for q, l in zip(quals, lengths) if l == length], length)
+
+    def summary(self):
+        rslt = {'n_reads': self.n_reads,
+                'n_bases': self.n_bases,
+                'n_malformed_records': self.n_malformed,
+                'read_length_histogram': {str(l): n for l, n in sorted(self.lengths.items())}}
+        if self.n_reads:
+            # Reads covering each cycle: those at least that long
+            covering = np.zeros(len(self.quality_sums) + 1, dtype=np.int64)
+            for length, n in self.lengths.items():
+                covering[length] += n
+            covering = np.cumsum(covering[::-1])[::-1][1:]
+            rslt['mean_quality_per_cycle'] = [round(float(v), 2) for v in
+                                              self.quality_sums / np.maximum(covering, 1)]
+            rslt['mean_quality'] = (round(float(self.quality_sums.sum()) / self.n_bases, 2)
+                                    if self.n_bases else None)
+        return rslt
+
+
 class FASTQMetadataFile(MetadataFile):
-    """A metadata file type for fastq.gz files"""
+    """
+    A metadata file type for fastq.gz files.  The file is decompressed and
+    parsed in constant memory, collecting read counts, the read length
+    histogram, mean quality per cycle and a check of the gzip trailers.
+    With sample_reads set, only the statistics are sampled: the rest of a
+    gzip file is still decompressed, without parsing, to check every trailer.
+    """
     category_name = 'FASTQ';
+    content_kinds = ('gzip', 'text', 'empty')
+    cpu_bound = True
+    parser_version = 4
+    sample_reads = None  # if set, collect statistics from only this many reads
+
+    @classmethod
+    def cache_version(cls):
+        if cls.sample_reads is None:
+            return str(cls.parser_version)
+        return '{}:sample={}'.format(cls.parser_version, cls.sample_reads)
 
     def collect_metadata(self):
-        return {}
+        print('parsing fastq from %s' % self.path)
+        stats = FASTQStats()
+        gzip_status = None
+        sampled = False
+        pending = b''
+        carry = []
+        with open(self.path, 'rb') as f:
+            magic = f.read(2)
+            if magic == GZIP_MAGIC:
+                gzip_status = {'members': 0, 'ok': None, 'error': None}
+                f.seek(0)
+                chunks = _gzip_chunks(f, gzip_status)
+            elif self.path.endswith('.gz'):
+                # Named as gzip but is not; report it rather than parse it
+                gzip_status = {'members': 0, 'ok': False,
+                               'error': 'empty file' if not magic else 'not a gzip file'}
+                chunks = ()
+            else:
+                f.seek(0)
+                chunks = _plain_chunks(f)
+            for chunk in chunks:
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                if carry:
+                    lines = carry + lines
+                n_lines = len(lines) - len(lines) % 4
+                carry = lines[n_lines:]
+                if self.sample_reads is not None:
+                    n_lines = min(n_lines, 4 * (self.sample_reads - stats.n_reads))
+                if n_lines:
+                    stats.add(lines[0:n_lines:4], lines[1:n_lines:4],
+                              lines[2:n_lines:4], lines[3:n_lines:4])
+                if self.sample_reads is not None and stats.n_reads >= self.sample_reads:
+                    sampled = True
+                    break
+            if sampled and gzip_status is not None:
+                for _ in chunks:  # check the remaining gzip trailers
+                    pass
+        if not sampled:
+            # A final record need not end with a newline
+            if pending:
+                carry.append(pending)
+            if len(carry) == 4:
+                stats.add(*[[line] for line in carry])
+                carry = []
+        rslt = stats.summary()
+        rslt['sampled'] = sampled
+        if not sampled:
+            rslt['incomplete_last_record'] = bool(carry)
+        if gzip_status is not None:
+            rslt['gzip'] = gzip_status
+        return rslt
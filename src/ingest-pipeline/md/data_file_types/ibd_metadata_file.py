@@ -0,0 +1,188 @@
+#! /usr/bin/env python
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from imzml_header import read_spectrum_index
+from metadata_file import MetadataFile
+from type_base import MetadataError
+
+TIC_PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def _chunks(offsets, lengths, itemsize, chunk_bytes):
+    """
+    Yields slices of the spectrum arrays covering at most chunk_bytes of
+    binary data each (but at least one spectrum)
+    """
+    start = 0
+    nbytes = 0
+    for idx, length in enumerate(lengths):
+        nbytes += int(length) * itemsize
+        if nbytes > chunk_bytes and idx > start:
+            yield slice(start, idx)
+            start, nbytes = idx, int(length) * itemsize
+    if start < len(lengths):
+        yield slice(start, len(lengths))
+
+
+def _gather(mm, dtype, offsets, lengths):
+    """
+    Returns the concatenated values of the given arrays, all of which must
+    lie within mm, and the start index of each array in the result
+    """
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    total = int(lengths.sum())
+    itemsize = dtype.itemsize
+    base = int(offsets.min())
+    if ((offsets - base) % itemsize).any():
+        # Misaligned relative to each other; read array by array
+        values = np.empty(total, dtype=dtype)
+        for start, offset, length in zip(starts, offsets, lengths):
+            values[start:start + length] = np.frombuffer(mm, dtype=dtype, count=int(length),
+                                                         offset=int(offset))
+        return values, starts
+    end = int((offsets + lengths * itemsize).max())
+    view = np.frombuffer(mm, dtype=dtype, count=(end - base) // itemsize, offset=base)
+    idx = np.repeat((offsets - base) // itemsize - starts, lengths)
+    idx += np.arange(total, dtype=np.int64)
+    return view[idx], starts
+
+
+class IBDMetadataFile(MetadataFile):
+    """
+    A metadata file type for the binary half (.ibd) of an imzML pair.  The
+    spectrum locations come from the .imzML file next to it; the binary data
+    is memory-mapped and summarized a chunk of spectra at a time.
+    """
+    category_name = 'IBD';
+    cpu_bound = True
+    chunk_bytes = 64 * 1024 * 1024  # binary data summarized per chunk
+    stat_threads = 1  # threads summarizing chunks concurrently
+
+    @staticmethod
+    def find_imzml(path):
+        """
+        Returns the path of the .imzML file paired with the .ibd file at
+        path, or None if there is none
+        """
+        stem = os.path.splitext(path)[0]
+        for ext in ['.imzML', '.imzml', '.IMZML']:
+            if os.path.isfile(stem + ext):
+                return stem + ext
+        return None
+
+    @classmethod
+    def cache_dependencies(cls, path):
+        imzml = cls.find_imzml(path)
+        return [] if imzml is None else [imzml]
+
+    def imzml_path(self):
+        imzml = self.find_imzml(self.path)
+        if imzml is None:
+            raise MetadataError('No imzML file found for {}'.format(self.path))
+        return imzml
+
+    def _map_chunks(self, fun, chunks):
+        if self.stat_threads > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.stat_threads) as executor:
+                return list(executor.map(fun, chunks))
+        return [fun(chunk) for chunk in chunks]
+
+    def collect_metadata(self):
+        print('parsing ibd from %s' % self.path)
+        imzml_path = self.imzml_path()
+        index = read_spectrum_index(imzml_path)
+        ibd_size = os.path.getsize(self.path)
+        rslt = {'imzml_file': os.path.basename(imzml_path),
+                'mode': index['mode'],
+                'ibd_bytes': ibd_size,
+                'n_spectra': len(index['x'])}
+        with open(self.path, 'rb') as f:
+            head = f.read(16)
+        rslt['uuid_matches'] = (None if index['uuid'] is None
+                                else head.hex() == index['uuid'])
+
+        coords = np.stack([np.frombuffer(index[key], dtype=np.int64)
+                           for key in ['x', 'y', 'z']], axis=1)
+        if len(coords):
+            _, per_pixel = np.unique(coords, axis=0, return_counts=True)
+        else:
+            per_pixel = np.zeros(0, dtype=np.int64)
+        rslt['n_pixels'] = len(per_pixel)
+        counts, n_pixels = np.unique(per_pixel, return_counts=True)
+        rslt['spectra_per_pixel'] = {str(int(c)): int(n) for c, n in zip(counts, n_pixels)}
+
+        if not len(coords) or index['intensity_type'] is None:
+            return rslt
+        mm = np.memmap(self.path, dtype=np.uint8, mode='r') if ibd_size else b''
+        try:
+            rslt.update(self._intensity_stats(mm, ibd_size, index))
+            if index['mz_type'] is not None:
+                rslt['mz_range'] = self._mz_range(mm, ibd_size, index)
+        finally:
+            del mm
+        return rslt
+
+    def _valid(self, ibd_size, offsets, lengths, itemsize):
+        """
+        A mask of the arrays lying entirely within the file
+        """
+        return (offsets >= 0) & (offsets + lengths * itemsize <= ibd_size)
+
+    def _intensity_stats(self, mm, ibd_size, index):
+        dtype = np.dtype('<' + index['intensity_type'])
+        offsets = np.frombuffer(index['intensity_offsets'], dtype=np.int64)
+        lengths = np.frombuffer(index['intensity_lengths'], dtype=np.int64)
+        valid = self._valid(ibd_size, offsets, lengths, dtype.itemsize)
+        nonempty = valid & (lengths > 0)
+        tic = np.zeros(len(offsets), dtype=np.float64)
+        sel = np.flatnonzero(nonempty)
+
+        def chunk_tic(chunk):
+            these = sel[chunk]
+            values, starts = _gather(mm, dtype, offsets[these], lengths[these])
+            return these, np.add.reduceat(values.astype(np.float64), starts)
+
+        chunks = list(_chunks(offsets[sel], lengths[sel], dtype.itemsize, self.chunk_bytes))
+        for these, sums in self._map_chunks(chunk_tic, chunks):
+            tic[these] = sums
+        tic = tic[valid]
+        rslt = {'n_empty_spectra': int((valid & (lengths == 0)).sum()),
+                'n_truncated_spectra': int((~valid).sum()),
+                'peaks_per_spectrum': {'min': int(lengths.min()),
+                                       'max': int(lengths.max()),
+                                       'mean': float(lengths.mean())}}
+        if len(tic):
+            rslt['tic'] = {'min': float(tic.min()),
+                           'max': float(tic.max()),
+                           'mean': float(tic.mean()),
+                           'std': float(tic.std()),
+                           'percentiles': {str(p): float(v) for p, v in
+                                           zip(TIC_PERCENTILES,
+                                               np.percentile(tic, TIC_PERCENTILES))}}
+        return rslt
+
+    def _mz_range(self, mm, ibd_size, index):
+        dtype = np.dtype('<' + index['mz_type'])
+        offsets = np.frombuffer(index['mz_offsets'], dtype=np.int64)
+        lengths = np.frombuffer(index['mz_lengths'], dtype=np.int64)
+        keep = self._valid(ibd_size, offsets, lengths, dtype.itemsize) & (lengths > 0)
+        offsets, lengths = offsets[keep], lengths[keep]
+        if not len(offsets):
+            return None
+        # In continuous mode every spectrum shares one m/z array
+        pairs = np.unique(np.stack([offsets, lengths], axis=1), axis=0)
+        offsets, lengths = pairs[:, 0].copy(), pairs[:, 1].copy()
+
+        def chunk_range(chunk):
+            values, _ = _gather(mm, dtype, offsets[chunk], lengths[chunk])
+            return float(np.nanmin(values)), float(np.nanmax(values))
+
+        ranges = self._map_chunks(chunk_range,
+                                  list(_chunks(offsets, lengths, dtype.itemsize,
+                                               self.chunk_bytes)))
+        return [min(lo for lo, _ in ranges), max(hi for _, hi in ranges)]
@@ -1,18 +1,19 @@
 #! /usr/bin/env python
 
-import numpy as np
-from pyimzml.ImzMLParser import ImzMLParser
+from imzml_header import read_imzml_header
 from metadata_file import MetadataFile
 
 class ImzMLMetadataFile(MetadataFile):
     """A metadata file type for imzML files"""
     category_name = 'imzML';
+    content_kinds = ('xml',)
+    count_spectra = False  # if True, add 'spectrum count' from the spectrumList
 
     def collect_metadata(self):
         print('parsing imzML from %s' % self.path)
-        with ImzMLParser(self.path) as parser:
-            md = parser.imzmldict
-        md = {k : (int(v) if type(v) == np.int64 else v) for k, v in md.items()}
+        # The same values as pyimzml's ImzMLParser(self.path).imzmldict, but
+        # without reading the spectrum list
+        md = read_imzml_header(self.path, count_spectra=self.count_spectra)
 #         for k, v in md.items():
 #             print(k, v, type(v))
         return md
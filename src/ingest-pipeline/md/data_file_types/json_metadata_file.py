@@ -6,6 +6,7 @@ import json
 class JSONMetadataFile(MetadataFile):
     """A metadata file type for JSON files"""
     category_name = 'JSON';
+    content_kinds = ('json',)
 
     def collect_metadata(self):
         print('parsing json from %s' % self.path)
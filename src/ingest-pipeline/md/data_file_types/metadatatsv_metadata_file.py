@@ -1,19 +1,22 @@
 #! /usr/bin/env python
 
-import csv
 import os
 from pathlib import Path
 from metadata_file import MetadataFile
+from tabular_reader import read_table
 from type_base import MetadataError
-from submodules import ingest_validation_tools_submission, ingest_validation_tools_error_report
 
 class MetadataTSVMetadataFile(MetadataFile):
     """
     A metadata file type for the specialized metadata.tsv files used to store submission info
     """
     category_name = 'METADATATSV';
+    content_kinds = ('text', 'yaml', 'json', 'empty')
 
     def collect_metadata(self):
+#         # imported here because importing the submodule is slow
+#         from submodules import (ingest_validation_tools_submission,
+#                                 ingest_validation_tools_error_report)
 #         print('validating {} as metadata.tsv'.format(self.path))
 #         dirpath = Path(os.path.dirname(self.path))
 #         submission = ingest_validation_tools_submission.Submission(directory_path=dirpath,
@@ -25,13 +28,7 @@ class MetadataTSVMetadataFile(MetadataFile):
 #                 f.write(report.as_text())
 #             raise MetadataError('{} failed ingest validation test'.format(self.path))
         print('parsing metadatatsv from {}'.format(self.path))
-        md = []
-        with open(self.path, 'rU', newline='') as f:
-            dialect = csv.Sniffer().sniff(f.read(256))
-            f.seek(0)
-            reader = csv.DictReader(f, dialect=dialect)
-            for row in reader:
-                dct = {k : v for k, v in row.items()}
-                dct['_from_metadatatsv'] = True
-                md.append(dct)
+        md = read_table(self.path, typed=False).records()
+        for dct in md:
+            dct['_from_metadatatsv'] = True
         return md
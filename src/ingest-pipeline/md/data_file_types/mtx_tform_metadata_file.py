@@ -6,6 +6,7 @@ from type_base import MetadataError
 class MtxTformMetadataFile(MetadataFile):
     """A metadata file type for files containing geometrical transforms as 4x4 matrices"""
     category_name = 'MtxTform';
+    content_kinds = ('text', 'yaml', 'json', 'empty')
 
     def collect_metadata(self):
         print('parsing transformation text from %s' % self.path)
@@ -1,16 +1,23 @@
 #! /usr/bin/env python
 
-import xmltodict
+import xml_to_dict
 from metadata_file import MetadataFile
-from thirdparty import tifffile
+from thirdparty import tiff_header
 
 class OMETiffMetadataFile(MetadataFile):
     """A metadata file type for OME-Tiff files"""
     category_name = 'OME_TIFF';
+    content_kinds = ('tiff', 'bigtiff')
+    cpu_bound = True  # dominated by XML parsing
+    parser_version = 2
+    # MxIF images carry one Plane and one TiffData element per image plane,
+    # which can run to tens of MB of XML and add nothing we use
+    exclude_paths = ['*OME/*Image/*Pixels/*Plane', '*OME/*Image/*Pixels/*TiffData']
 
     def collect_metadata(self):
         print('parsing OME_TIFF from %s' % self.path)
-        with tifffile.TiffFile(self.path) as tf:
-            metadata = xmltodict.parse(tf.ome_metadata)
+        # Only the first IFD is read, not the page chain
+        metadata = xml_to_dict.parse(tiff_header.read_ome_metadata(self.path),
+                                     exclude=self.exclude_paths)
         return metadata
     
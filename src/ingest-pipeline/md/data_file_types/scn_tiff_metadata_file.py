@@ -2,16 +2,18 @@
 
 import xmltodict
 from metadata_file import MetadataFile
-from thirdparty import tifffile
+from thirdparty import tiff_header
 
 class ScnTiffMetadataFile(MetadataFile):
     """A metadata file type for Scn-Tiff files"""
     category_name = 'Scn_TIFF';
+    content_kinds = ('tiff', 'bigtiff')
+    cpu_bound = True  # dominated by XML parsing
 
     def collect_metadata(self):
         print('parsing Scn_TIFF from %s' % self.path)
-        with tifffile.TiffFile(self.path) as tf:
-            # tifffile.TiffFile.scn_metadata seems to be missing
-            metadata = xmltodict.parse(tf.pages[0].description) if tf.is_scn else None
+        # tifffile.TiffFile.scn_metadata seems to be missing
+        scn_xml = tiff_header.read_scn_metadata(self.path)
+        metadata = xmltodict.parse(scn_xml) if scn_xml is not None else None
         return metadata
     
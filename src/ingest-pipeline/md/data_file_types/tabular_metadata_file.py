@@ -0,0 +1,31 @@
+#! /usr/bin/env python
+
+from metadata_file import MetadataFile
+from tabular_reader import read_table
+
+class TabularMetadataFile(MetadataFile):
+    """
+    A metadata file type for large csv or tsv data tables, such as the IMS
+    columnar and peak files.  Rather than the rows, the result describes the
+    table: its header and column types and, unless schema_only is set, the
+    row count and the range of each numeric column.
+    """
+    category_name = 'Tabular';
+    content_kinds = ('text', 'yaml', 'json', 'empty')
+    schema_only = True
+    max_rows = None  # rows read when not schema_only; None reads them all
+
+    def collect_metadata(self):
+        print('parsing table from %s' % self.path)
+        table = read_table(self.path, max_rows=self.max_rows, schema_only=self.schema_only)
+        rslt = table.schema()
+        if not self.schema_only:
+            rslt['n_rows'] = table.n_rows
+            rslt['truncated'] = table.truncated
+            ranges = {}
+            for name, tp, col in zip(table.header, table.types, table.columns):
+                values = [v for v in col if v is not None]
+                if tp in ('int', 'float') and values:
+                    ranges[name] = [min(values), max(values)]
+            rslt['ranges'] = ranges
+        return rslt
@@ -5,6 +5,7 @@ from metadata_file import MetadataFile
 class TxtTformMetadataFile(MetadataFile):
     """A metadata file type for files containing geometrical transforms as text"""
     category_name = 'TxtTform';
+    content_kinds = ('text', 'yaml', 'json', 'empty')
 
     def collect_metadata(self):
         print('parsing transformation text from %s' % self.path)
@@ -5,6 +5,7 @@ from metadata_file import MetadataFile
 class TxtWordListMetadataFile(MetadataFile):
     """A metadata file type containing text to be returned as a list of words"""
     category_name = 'TxtWordList';
+    content_kinds = ('text', 'yaml', 'json', 'empty')
 
     def collect_metadata(self):
         print('collecting words from %s' % self.path)
@@ -6,6 +6,7 @@ import yaml
 class YamlMetadataFile(MetadataFile):
     """A metadata file type for yaml files"""
     category_name = 'Yaml';
+    content_kinds = ('yaml', 'json', 'text', 'empty')
 
     def collect_metadata(self):
         print('parsing yaml from %s' % self.path)
@@ -0,0 +1,169 @@
+#! /usr/bin/env python
+
+"""
+An in-memory snapshot of a directory tree, so that the many glob, listdir
+and isdir probes made by the DataCollection types can be answered without
+going back to the (possibly network) filesystem.
+"""
+
+import os
+import glob
+import fnmatch
+
+
+class DirSnapshot(object):
+    """
+    A snapshot of the directory tree below topdir, built with os.scandir.
+
+    If max_depth is given, only directories up to that many levels below
+    topdir are read when the snapshot is built; deeper directories are read
+    (once) the first time they are queried.  Symlinked directories are
+    likewise only read on demand, so link cycles cannot cause runaway scans.
+    Paths passed to the query methods are full paths, as would be passed to
+    the os and glob functions they replace.  Paths outside topdir are passed
+    through to the real filesystem.
+    """
+
+    def __init__(self, topdir, max_depth=None):
+        self.topdir = topdir
+        self.max_depth = max_depth
+        self._listings = {}  # relative dir path -> {name: is_dir}, or None if not a dir
+        self._glob_cache = {}  # normalized relative pattern -> list of relative paths
+        self._scan('.', 0)
+
+    def __repr__(self):
+        return '<%s(%s)>' % (type(self).__name__, self.topdir)
+
+    def _scan(self, reldir, depth):
+        listing = {}
+        prefetch = []
+        try:
+            with os.scandir(os.path.join(self.topdir, reldir)) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                        if is_dir and not entry.is_symlink():
+                            prefetch.append(entry.name)
+                    except OSError:
+                        is_dir = False
+                    listing[entry.name] = is_dir
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            listing = None
+        self._listings[reldir] = listing
+        if depth is not None and (self.max_depth is None or depth < self.max_depth):
+            for name in prefetch:
+                self._scan(self.join_rel(reldir, name), depth + 1)
+        return listing
+
+    @staticmethod
+    def join_rel(reldir, name):
+        """
+        Join a name onto a directory path relative to topdir
+        """
+        return name if reldir == '.' else os.path.join(reldir, name)
+
+    def get_listing(self, reldir):
+        """
+        Returns a dict mapping entry name to True for directories and False
+        otherwise for the directory reldir (relative to topdir), or None if
+        reldir is not a directory.
+        """
+        if reldir in self._listings:
+            return self._listings[reldir]
+        else:
+            return self._scan(reldir, None)
+
+    def _relkey(self, path):
+        """
+        Returns the normalized path relative to topdir, or None if the path
+        is not inside the snapshot.
+        """
+        rel = os.path.relpath(path, self.topdir)
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel
+
+    def _lookup(self, path):
+        """
+        Returns (found, is_dir) for the given path, or None if the path is
+        not inside the snapshot.
+        """
+        rel = self._relkey(path)
+        if rel is None:
+            return None
+        if rel == '.':
+            return (self.get_listing('.') is not None, True)
+        parent, name = os.path.split(rel)
+        listing = self.get_listing(parent or '.')
+        if listing is None or name not in listing:
+            return (False, False)
+        return (True, listing[name])
+
+    def listdir(self, path):
+        rel = self._relkey(path)
+        if rel is None:
+            return os.listdir(path)
+        listing = self.get_listing(rel)
+        if listing is None:
+            raise FileNotFoundError('No such directory: {}'.format(path))
+        return list(listing)
+
+    def exists(self, path):
+        found = self._lookup(path)
+        return os.path.exists(path) if found is None else found[0]
+
+    def isdir(self, path):
+        found = self._lookup(path)
+        return os.path.isdir(path) if found is None else (found[0] and found[1])
+
+    def isfile(self, path):
+        found = self._lookup(path)
+        return os.path.isfile(path) if found is None else (found[0] and not found[1])
+
+    def iglob(self, pattern):
+        """
+        Equivalent to glob.iglob(pattern) for non-recursive patterns
+        """
+        rel = self._relkey(pattern)
+        if rel is None:
+            yield from glob.iglob(pattern)
+            return
+        if rel in self._glob_cache:
+            relpaths = self._glob_cache[rel]
+        else:
+            segments = [] if rel == '.' else rel.split(os.sep)
+            relpaths = self._iglob_segments('.', segments)
+        for relpath in relpaths:
+            yield os.path.join(self.topdir, relpath)
+
+    def glob(self, pattern):
+        return list(self.iglob(pattern))
+
+    def add_glob_result(self, pattern, relpaths):
+        """
+        Record the result of evaluating a glob pattern (relative to topdir)
+        by other means, e.g. a MultiGlobMatcher, so later iglob calls for the
+        same pattern are answered directly.
+        """
+        self._glob_cache[os.path.normpath(pattern)] = list(relpaths)
+
+    def _iglob_segments(self, reldir, segments):
+        if not segments:
+            yield reldir
+            return
+        seg, rest = segments[0], segments[1:]
+        listing = self.get_listing(reldir)
+        if listing is None:
+            return
+        if glob.has_magic(seg):
+            names = [nm for nm in listing
+                     if (seg.startswith('.') or not nm.startswith('.'))
+                     and fnmatch.fnmatch(nm, seg)]
+        else:
+            names = [seg] if seg in listing else []
+        for nm in names:
+            if rest:
+                if listing[nm]:
+                    yield from self._iglob_segments(self.join_rel(reldir, nm), rest)
+            else:
+                yield self.join_rel(reldir, nm)
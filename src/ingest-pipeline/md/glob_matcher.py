@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+
+"""
+Evaluate many glob patterns against a directory tree in a single walk.
+
+The patterns are compiled into a trie keyed on path segments, so a
+directory is visited once no matter how many collection types have
+patterns that reach into it.
+"""
+
+import os
+import re
+import glob
+import fnmatch
+
+from dir_snapshot import DirSnapshot
+
+
+class _TrieNode(object):
+    def __init__(self):
+        self.literal = {}  # segment -> _TrieNode
+        self.wild = []  # (segment, compiled regex, _TrieNode)
+        self.keys = []  # keys of patterns which end at this node
+
+    def child(self, seg):
+        if glob.has_magic(seg):
+            for wseg, _, node in self.wild:
+                if wseg == seg:
+                    return node
+            node = _TrieNode()
+            self.wild.append((seg, re.compile(fnmatch.translate(seg)), node))
+            return node
+        else:
+            return self.literal.setdefault(seg, _TrieNode())
+
+    def advance(self, name):
+        """
+        Returns the child nodes reached by the directory entry name
+        """
+        rslt = []
+        if name in self.literal:
+            rslt.append(self.literal[name])
+        hidden = name.startswith('.')
+        for seg, regex, node in self.wild:
+            if (seg.startswith('.') or not hidden) and regex.match(name):
+                rslt.append(node)
+        return rslt
+
+    def has_children(self):
+        return bool(self.literal or self.wild)
+
+
+class MultiGlobMatcher(object):
+    """
+    A set of glob patterns, relative to the top of a directory tree, each
+    with an associated key.  Patterns follow glob.glob rules except that
+    recursive '**' is not supported.
+    """
+
+    def __init__(self, patterns=None):
+        self.root = _TrieNode()
+        self.patterns = {}  # key -> normalized pattern
+        for key, pattern in (patterns or []):
+            self.add(key, pattern)
+
+    def add(self, key, pattern):
+        pattern = os.path.normpath(pattern)
+        assert not os.path.isabs(pattern), 'patterns must be relative'
+        self.patterns[key] = pattern
+        node = self.root
+        for seg in pattern.split(os.sep):
+            node = node.child(seg)
+        node.keys.append(key)
+
+    def match(self, snapshot):
+        """
+        Walk the DirSnapshot once, returning a dict mapping each key to the
+        list of matching paths relative to the top of the snapshot, in the
+        order glob.iglob would produce them.
+        """
+        rslt = {key: [] for key in self.patterns}
+        self._walk(snapshot, '.', [self.root], rslt)
+        return rslt
+
+    def _walk(self, snapshot, reldir, nodes, rslt):
+        listing = snapshot.get_listing(reldir)
+        if not listing:
+            return
+        for name, is_dir in listing.items():
+            relpath = snapshot.join_rel(reldir, name)
+            next_nodes = []
+            for node in nodes:
+                next_nodes.extend(node.advance(name))
+            for node in next_nodes:
+                for key in node.keys:
+                    rslt[key].append(relpath)
+            if is_dir:
+                deeper = [node for node in next_nodes if node.has_children()]
+                if deeper:
+                    self._walk(snapshot, relpath, deeper, rslt)
+
+    def prime(self, snapshot):
+        """
+        Match against the snapshot and store the results in its glob cache,
+        so that later snapshot.iglob() calls with these patterns are free.
+        Returns the match results.
+        """
+        rslt = self.match(snapshot)
+        for key, pattern in self.patterns.items():
+            snapshot.add_glob_result(pattern, rslt[key])
+        return rslt
+
+
+def match_collection_types(path, collection_types, snapshot=None):
+    """
+    Evaluate the expected_files and optional_files of all the given
+    DataCollection types against the tree at path in one walk.  Returns a
+    dict mapping each type to a dict with elements 'match' (True if every
+    expected pattern found at least one file) and 'files' (a list of
+    (relative path, filetype key) pairs in collection order).  Types whose
+    top directory cannot be found map to {'match': False, 'files': []}.
+    Collection-type-specific checks in test_match are not applied here.
+    The snapshot's glob cache is primed as a side effect.
+    """
+    snapshot = DirSnapshot(path, max_depth=0) if snapshot is None else snapshot
+    matcher = MultiGlobMatcher()
+    type_patterns = {}
+    for collection_type in collection_types:
+        patterns = collection_type.get_file_patterns(path, snapshot)
+        type_patterns[collection_type] = patterns
+        if patterns is not None:
+            for idx, (pattern, _, _) in enumerate(patterns):
+                matcher.add((collection_type, idx), pattern)
+    hits = matcher.prime(snapshot)
+    rslt = {}
+    for collection_type, patterns in type_patterns.items():
+        if patterns is None:
+            rslt[collection_type] = {'match': False, 'files': []}
+            continue
+        files = []
+        match = True
+        for idx, (_, md_type, expected) in enumerate(patterns):
+            these_hits = hits[(collection_type, idx)]
+            if expected and not these_hits:
+                match = False
+            files.extend((relpath, md_type) for relpath in these_hits)
+        rslt[collection_type] = {'match': match, 'files': files}
+    return rslt
@@ -0,0 +1,210 @@
+#! /usr/bin/env python
+
+"""
+Extract the basic imzML metadata that pyimzml.ImzMLParser puts in its
+imzmldict, without building a parser.
+
+ImzMLParser reads every <spectrum> element to build its coordinate and
+offset arrays before imzmldict is available, which for a large IMS run
+means millions of elements.  The values in imzmldict all come from the
+<scanSettingsList> and <instrumentConfigurationList> elements, which
+precede <run>, so this reader stops at the first spectrum.  The one
+exception is 'max count of pixels z', the largest spectrum z position: if
+the first spectrum has no z position (as in every 2D image) it is 1, and
+only otherwise are the remaining spectra read for it.
+
+read_spectrum_index reads the whole spectrum list, keeping only the
+positions and binary data locations, for readers of the .ibd file.
+"""
+
+from array import array
+from warnings import warn
+
+from lxml import etree
+
+MZML_NS = '{http://psi.hupo.org/ms/mzml}'
+
+# (imzmldict key, accession, type), in pyimzml's order
+SCAN_SETTINGS_PARAMS = [
+    ('max count of pixels x', 'IMS:1000042', int),
+    ('max count of pixels y', 'IMS:1000043', int),
+    ('max dimension x', 'IMS:1000044', int),
+    ('max dimension y', 'IMS:1000045', int),
+    ('pixel size x', 'IMS:1000046', float),
+    ('pixel size y', 'IMS:1000047', float),
+    ('matrix solution concentration', 'MS:1000835', float),
+]
+INSTRUMENT_CONFIG_PARAMS = [
+    ('wavelength', 'MS:1000843', float),
+    ('focus diameter x', 'MS:1000844', float),
+    ('focus diameter y', 'MS:1000845', float),
+    ('pulse energy', 'MS:1000846', float),
+    ('pulse duration', 'MS:1000847', float),
+    ('attenuation', 'MS:1000848', float),
+]
+POSITION_Z = 'IMS:1000052'
+
+
+def _get_params(elt, params, dct):
+    """
+    Add the first value found below elt for each of params to dct
+    """
+    if elt is None:
+        return
+    values = {}
+    for node in elt.iter(MZML_NS + 'cvParam'):
+        values.setdefault(node.get('accession'), node.get('value'))
+    for name, accession, tp in params:
+        if accession in values:
+            try:
+                dct[name] = tp(values[accession])
+            except (TypeError, ValueError):
+                warn(Warning('Wrong data type in XML file. Skipped attribute "%s"' % name))
+
+
+def _position_z(spectrum):
+    for node in spectrum.iter(MZML_NS + 'cvParam'):
+        if node.get('accession') == POSITION_Z:
+            return int(node.get('value'))
+    return None
+
+
+def read_imzml_header(path, count_spectra=False):
+    """
+    Returns a dict with the same keys and values as the imzmldict of
+    pyimzml.ImzMLParser(path), with plain Python ints rather than numpy
+    ints.  If count_spectra is set, 'spectrum count' is added, taken from
+    the count attribute of <spectrumList> (or, if that is missing, by
+    counting the spectra).
+    """
+    rslt = {}
+    scan_settings = instrument_config = spectrum_list = None
+    count = None
+    need_z = True
+    need_count = False
+    n_counted = 0
+    max_z = None
+    for event, elt in etree.iterparse(path, events=('start', 'end'), huge_tree=True):
+        tag = elt.tag
+        if spectrum_list is None:
+            if event == 'start':
+                if tag == MZML_NS + 'spectrumList':
+                    spectrum_list = elt
+                    count = elt.get('count')
+                    need_count = count_spectra and count is None
+            elif tag == MZML_NS + 'scanSettingsList':
+                scan_settings = elt
+            elif tag == MZML_NS + 'instrumentConfigurationList':
+                instrument_config = elt
+        elif event == 'end' and tag == MZML_NS + 'spectrum':
+            n_counted += 1
+            if need_z:
+                z = _position_z(elt)
+                if max_z is None and z is None:
+                    max_z = 1  # a 2D image
+                    need_z = False
+                else:
+                    # As in pyimzml, a spectrum without a z position has z = 1
+                    max_z = max(max_z or 1, z or 1)
+            spectrum_list.remove(elt)
+            if not (need_z or need_count):
+                break
+        elif event == 'end' and tag == MZML_NS + 'spectrumList':
+            break
+    _get_params(scan_settings, SCAN_SETTINGS_PARAMS, rslt)
+    _get_params(instrument_config, INSTRUMENT_CONFIG_PARAMS, rslt)
+    rslt['max count of pixels z'] = max_z
+    if count_spectra:
+        rslt['spectrum count'] = int(count) if count is not None else n_counted
+    return rslt
+
+
+# Binary data type accessions -> array typecode (imzML binaries are little-endian)
+BINARY_TYPES = {'MS:1000521': 'f', 'MS:1000523': 'd', 'IMS:1000141': 'i', 'IMS:1000142': 'q'}
+MZ_ARRAY = 'MS:1000514'
+INTENSITY_ARRAY = 'MS:1000515'
+CONTINUOUS = 'IMS:1000030'
+PROCESSED = 'IMS:1000031'
+UUID = 'IMS:1000080'
+POSITION_X = 'IMS:1000050'
+POSITION_Y = 'IMS:1000051'
+EXTERNAL_OFFSET = 'IMS:1000102'
+EXTERNAL_ARRAY_LENGTH = 'IMS:1000103'
+
+
+def _cv_params(elt, groups):
+    """
+    Returns {accession: value} for the cvParams directly inside elt and in
+    the referenceable param groups it refers to
+    """
+    rslt = {}
+    for child in elt:
+        if child.tag == MZML_NS + 'cvParam':
+            rslt[child.get('accession')] = child.get('value')
+        elif child.tag == MZML_NS + 'referenceableParamGroupRef':
+            for key, value in groups.get(child.get('ref'), {}).items():
+                rslt.setdefault(key, value)
+    return rslt
+
+
+def read_spectrum_index(path):
+    """
+    Read the location of every spectrum's binary data from an imzML file,
+    discarding each <spectrum> element once it is read.  Returns a dict with
+    the keys
+      'mode': 'continuous', 'processed' or None
+      'uuid': the UUID recorded for the .ibd file, as 32 hex digits, or None
+      'mz_type', 'intensity_type': array module typecodes
+      'x', 'y', 'z': array('q') of spectrum positions (z is 1 if absent)
+      'mz_offsets', 'mz_lengths', 'intensity_offsets', 'intensity_lengths':
+        array('q') of byte offsets and element counts
+    """
+    rslt = {'mode': None, 'uuid': None, 'mz_type': None, 'intensity_type': None}
+    for key in ['x', 'y', 'z', 'mz_offsets', 'mz_lengths', 'intensity_offsets',
+                'intensity_lengths']:
+        rslt[key] = array('q')
+    groups = {}
+    for _, elt in etree.iterparse(path, events=('end',), huge_tree=True):
+        tag = elt.tag
+        if tag == MZML_NS + 'spectrum':
+            scan_params = {}
+            for scan in elt.iter(MZML_NS + 'scan'):
+                scan_params = _cv_params(scan, groups)
+                break
+            rslt['x'].append(int(scan_params.get(POSITION_X, 0)))
+            rslt['y'].append(int(scan_params.get(POSITION_Y, 0)))
+            rslt['z'].append(int(scan_params.get(POSITION_Z) or 1))
+            for bda in elt.iter(MZML_NS + 'binaryDataArray'):
+                params = _cv_params(bda, groups)
+                if MZ_ARRAY in params:
+                    kind, type_key = 'mz', 'mz_type'
+                elif INTENSITY_ARRAY in params:
+                    kind, type_key = 'intensity', 'intensity_type'
+                else:
+                    continue
+                typecodes = [BINARY_TYPES[acc] for acc in params if acc in BINARY_TYPES]
+                if typecodes:
+                    if rslt[type_key] is None:
+                        rslt[type_key] = typecodes[0]
+                    elif rslt[type_key] != typecodes[0]:
+                        raise ValueError('{}: spectra have mixed {} data types'.format(path,
+                                                                                     kind))
+                rslt[kind + '_offsets'].append(int(params.get(EXTERNAL_OFFSET, -1)))
+                rslt[kind + '_lengths'].append(int(params.get(EXTERNAL_ARRAY_LENGTH, 0)))
+            elt.clear()
+            parent = elt.getparent()
+            if parent is not None:
+                parent.remove(elt)
+        elif tag == MZML_NS + 'referenceableParamGroup':
+            groups[elt.get('id')] = {node.get('accession'): node.get('value')
+                                     for node in elt.iter(MZML_NS + 'cvParam')}
+        elif tag == MZML_NS + 'fileContent':
+            params = _cv_params(elt, groups)
+            if CONTINUOUS in params:
+                rslt['mode'] = 'continuous'
+            elif PROCESSED in params:
+                rslt['mode'] = 'processed'
+            if params.get(UUID):
+                rslt['uuid'] = ''.join(c for c in params[UUID].lower()
+                                       if c in '0123456789abcdef')
+    return rslt
@@ -0,0 +1,173 @@
+#! /usr/bin/env python
+
+"""
+A persistent cache of MetadataFile.collect_metadata results, so that
+re-scanning a mostly unchanged submission does not re-parse every file.
+"""
+
+import os
+import time
+import zlib
+import json
+import sqlite3
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+SCHEMA_VERSION = 2  # bump to discard caches written in an older format
+
+
+class MetadataCache(object):
+    """
+    An SQLite-backed cache of parsed file metadata.
+
+    Entries are keyed by file identity (real path, size, mtime_ns, inode)
+    and by parser identity (MetadataFile subclass and its cache_version()),
+    so a changed file or an updated parser is simply a cache miss.  Values
+    are stored as compressed JSON, so only results that survive a JSON round
+    trip unchanged are cached.  The total size of the stored values is kept
+    up to date by triggers; when it exceeds max_bytes, the least recently
+    used entries are evicted.
+
+    Use it as a context manager, or call close() when done.
+    """
+
+    def __init__(self, db_path, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path, timeout=60.0)
+        try:
+            self._init_schema()
+        except Exception:
+            self.conn.close()
+            raise
+
+    def _init_schema(self):
+        with self.conn:
+            if self.conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                self.conn.execute('DROP TABLE IF EXISTS md_cache')
+                self.conn.execute('DROP TABLE IF EXISTS md_cache_total')
+                self.conn.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+            self.conn.execute('CREATE TABLE IF NOT EXISTS md_cache ('
+                              ' path TEXT NOT NULL,'
+                              ' parser TEXT NOT NULL,'
+                              ' size INTEGER NOT NULL,'
+                              ' mtime_ns INTEGER NOT NULL,'
+                              ' inode INTEGER NOT NULL,'
+                              ' version TEXT NOT NULL,'
+                              ' value BLOB NOT NULL,'
+                              ' nbytes INTEGER NOT NULL,'
+                              ' last_used REAL NOT NULL,'
+                              ' PRIMARY KEY (path, parser))')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS md_cache_last_used'
+                              ' ON md_cache (last_used)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS md_cache_total ('
+                              ' id INTEGER PRIMARY KEY CHECK (id = 0),'
+                              ' nbytes INTEGER NOT NULL)')
+            self.conn.execute('INSERT OR IGNORE INTO md_cache_total VALUES (0, 0)')
+            self.conn.execute('CREATE TRIGGER IF NOT EXISTS md_cache_add'
+                              ' AFTER INSERT ON md_cache BEGIN'
+                              ' UPDATE md_cache_total SET nbytes = nbytes + NEW.nbytes;'
+                              ' END')
+            self.conn.execute('CREATE TRIGGER IF NOT EXISTS md_cache_remove'
+                              ' AFTER DELETE ON md_cache BEGIN'
+                              ' UPDATE md_cache_total SET nbytes = nbytes - OLD.nbytes;'
+                              ' END')
+
+    def __repr__(self):
+        return '<%s(%s)>' % (type(self).__name__, self.db_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def file_key(fpath, md_class):
+        """
+        Returns the cache key for parsing fpath with the MetadataFile subclass
+        md_class, or None if the file or one of its cache_dependencies cannot
+        be stat'ed.  The identities of the dependencies are folded into the
+        version element.
+        """
+        version = md_class.cache_version()
+        try:
+            st = os.stat(fpath)
+            for dep in md_class.cache_dependencies(fpath):
+                dep_st = os.stat(dep)
+                version += ';{}:{}:{}:{}'.format(os.path.realpath(dep), dep_st.st_size,
+                                                 dep_st.st_mtime_ns, dep_st.st_ino)
+        except OSError:
+            return None
+        return (os.path.realpath(fpath),
+                '{}.{}'.format(md_class.__module__, md_class.__name__),
+                st.st_size, st.st_mtime_ns, st.st_ino,
+                version)
+
+    def get(self, key):
+        """
+        Returns (True, metadata) on a cache hit and (False, None) otherwise
+        """
+        path, parser, size, mtime_ns, inode, version = key
+        row = self.conn.execute('SELECT value FROM md_cache WHERE path = ? AND parser = ?'
+                                ' AND size = ? AND mtime_ns = ? AND inode = ? AND version = ?',
+                                key).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        with self.conn:
+            self.conn.execute('UPDATE md_cache SET last_used = ? WHERE path = ? AND parser = ?',
+                              (time.time(), path, parser))
+        self.hits += 1
+        return True, json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def put(self, key, metadata):
+        try:
+            text = json.dumps(metadata, allow_nan=False)
+        except (TypeError, ValueError):
+            return  # not cacheable
+        if json.loads(text) != metadata:
+            return  # e.g. tuples or non-string keys, which JSON would change
+        value = zlib.compress(text.encode('utf-8'), 1)
+        if len(value) > self.max_bytes:
+            return
+        path, parser = key[:2]
+        with self.conn:
+            # DELETE then INSERT rather than INSERT OR REPLACE, so that the
+            # triggers keeping md_cache_total see the replaced row
+            self.conn.execute('DELETE FROM md_cache WHERE path = ? AND parser = ?',
+                              (path, parser))
+            self.conn.execute('INSERT INTO md_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                              tuple(key) + (value, len(value), time.time()))
+            self._evict()
+
+    def total_bytes(self):
+        """
+        Returns the total size of the stored values
+        """
+        return self.conn.execute('SELECT nbytes FROM md_cache_total').fetchone()[0]
+
+    def _evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for path, parser, nbytes in self.conn.execute('SELECT path, parser, nbytes FROM md_cache'
+                                                      ' ORDER BY last_used'):
+            if total <= self.max_bytes:
+                break
+            doomed.append((path, parser))
+            total -= nbytes
+        self.conn.executemany('DELETE FROM md_cache WHERE path = ? AND parser = ?', doomed)
+
+    def purge(self):
+        """
+        Remove all entries
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM md_cache')
+        self.conn.execute('VACUUM')
@@ -5,10 +5,19 @@ import os
 import argparse
 import json
 import yaml
+import time
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from type_base import MetadataError
 from data_collection import DataCollection
+from dir_snapshot import DirSnapshot
+from glob_matcher import match_collection_types
+from metadata_cache import MetadataCache, DEFAULT_MAX_BYTES
+from scan_profile import ScanProfile
 import data_collection_types
+from data_file_types import get_metadata_file_class
 from hubmap_commons.schema_tools import assert_json_matches_schema, set_schema_base_path
 
 _KNOWN_DATA_COLLECTION_TYPES = None
@@ -20,7 +29,11 @@ SCHEMA_BASE_URI = 'http://schemata.hubmapconsortium.org/'
 set_schema_base_path(SCHEMA_BASE_PATH, SCHEMA_BASE_URI)
 
 
-def scan(target_dir, out_fname, schema_fname, yaml_flag=False):
+def get_known_data_collection_types():
+    """
+    Returns the list of known DataCollection subclasses, sorted by decreasing
+    match_priority.  The list is built once per process.
+    """
     global _KNOWN_DATA_COLLECTION_TYPES
 
     if _KNOWN_DATA_COLLECTION_TYPES is None:
@@ -32,26 +45,230 @@ def scan(target_dir, out_fname, schema_fname, yaml_flag=False):
         lst.sort(reverse=True)
         lst = [c for a, b, c in lst]
         _KNOWN_DATA_COLLECTION_TYPES = lst
+    return _KNOWN_DATA_COLLECTION_TYPES
 
-    for collection_type in _KNOWN_DATA_COLLECTION_TYPES:
-        if collection_type.test_match(target_dir):
+
+def scan(target_dir, out_fname, schema_fname, yaml_flag=False, snapshot_depth=0,
+         parse_threads=1, parse_processes=0, cache_path=None,
+         cache_max_bytes=DEFAULT_MAX_BYTES, collect_all=False, profile_fname=None,
+         fastq_sample=None, parse_memory_limit=None, parse_timeout=None,
+         profile_memory=False):
+    """
+    Identify the data collection type of target_dir, extract its metadata,
+    check it against the schema and write it to out_fname (or stdout).  If
+    profile_fname is given, a timing and I/O profile of the scan is written
+    there, even if the scan fails; with profile_memory, it also has the peak
+    memory of each parse, traced with tracemalloc (which slows parsing).  If fastq_sample is given, FASTQ
+    statistics come from only that many reads of each file in this scan
+    (gzip trailers are still checked to the end).  If
+    parse_memory_limit (bytes) or parse_timeout (seconds) is given, each
+    file is parsed in a worker process subject to those limits.
+    """
+    fastq_class = get_metadata_file_class('FASTQ')
+    saved_sample_reads = fastq_class.sample_reads
+    if fastq_sample is not None:
+        fastq_class.sample_reads = fastq_sample
+    profile = ScanProfile(target_dir)
+    try:
+        _scan(target_dir, out_fname, schema_fname, yaml_flag, snapshot_depth,
+              parse_threads, parse_processes, cache_path, cache_max_bytes, collect_all,
+              profile, profile_fname is not None, profile_memory, parse_memory_limit,
+              parse_timeout)
+    finally:
+        # sample_reads is a class attribute; do not let it leak into later
+        # scans in this process
+        fastq_class.sample_reads = saved_sample_reads
+        profile.finish()
+        if profile_fname is not None:
+            profile.write(profile_fname)
+
+
+def _scan(target_dir, out_fname, schema_fname, yaml_flag, snapshot_depth,
+          parse_threads, parse_processes, cache_path, cache_max_bytes, collect_all,
+          profile, profile_files, profile_memory, parse_memory_limit, parse_timeout):
+    md_cache = None if cache_path is None else MetadataCache(cache_path, cache_max_bytes)
+    try:
+        metadata = _collect(target_dir, snapshot_depth, parse_threads, parse_processes,
+                            md_cache, collect_all, profile, profile_files,
+                            profile_memory, parse_memory_limit, parse_timeout)
+    finally:
+        if md_cache is not None:
+            print('metadata cache: {} hits, {} misses'.format(md_cache.hits, md_cache.misses))
+            md_cache.close()
+    with profile.phase('schema_validation'):
+        assert_json_matches_schema(metadata, schema_fname)
+    with profile.phase('serialization'):
+        if yaml_flag:
+            with sys.stdout if out_fname is None else open(out_fname, 'w') as f:
+                yaml.dump(metadata, f)
+        else:
+            with sys.stdout if out_fname is None else open(out_fname, 'w') as f:
+                json.dump(metadata, f)
+
+
+def _collect(target_dir, snapshot_depth, parse_threads, parse_processes, md_cache,
+             collect_all, profile, profile_files, profile_memory, parse_memory_limit,
+             parse_timeout):
+    """
+    Find the data collection type matching target_dir and return its
+    filtered metadata
+    """
+    with profile.phase('snapshot'):
+        snapshot = DirSnapshot(target_dir, max_depth=snapshot_depth)
+        # Evaluate every type's file patterns in one walk.  A type missing
+        # any of its expected files cannot match, so test_match, which adds
+        # each type's own checks, only runs for the others.  It and
+        # collect_metadata get their glob results from the snapshot.
+        candidates = match_collection_types(target_dir, get_known_data_collection_types(),
+                                            snapshot)
+    for collection_type in get_known_data_collection_types():
+        if not candidates[collection_type]['match']:
+            profile.record_probe(collection_type.category_name, 0.0, False)
+            continue
+        t0 = time.perf_counter()
+        matched = collection_type.test_match(target_dir, snapshot)
+        profile.record_probe(collection_type.category_name, time.perf_counter() - t0, matched)
+        if matched:
             #print('collector match: ', collection_type.category_name)
-            collector = collection_type(target_dir)
-            metadata = collector.filter_metadata(collector.collect_metadata())
+            profile.collection_type = collection_type.category_name
+            collector = collection_type(target_dir, snapshot)
+            collector.parse_threads = parse_threads
+            collector.parse_processes = parse_processes
+            collector.parse_memory_limit = parse_memory_limit
+            collector.parse_timeout = parse_timeout
+            collector.md_cache = md_cache
+            collector.collect_all = collect_all
+            if profile_files:
+                collector.profile = profile
+                collector.profile_memory = profile_memory
+            with profile.phase('collect'):
+                raw_metadata = collector.collect_metadata()
+            with profile.phase('filter'):
+                metadata = collector.filter_metadata(raw_metadata)
             #print('collector: ', repr(collector))
             #print('metadata: %s' % metadata)
             break
     else:
         raise MetadataError('%s does not match any known data collection type'
                             % target_dir)
-    assert_json_matches_schema(metadata, schema_fname)
-    if yaml_flag:
-        with sys.stdout if out_fname is None else open(out_fname, 'w') as f:
-            yaml.dump(metadata, f)
-    else:
-        with sys.stdout if out_fname is None else open(out_fname, 'w') as f:
-            json.dump(metadata, f)
-        
+    return metadata
+
+
+def read_manifest(manifest_fname):
+    """
+    Read a list of directories to scan from a manifest file.  The file contains
+    one path per line; blank lines and lines starting with '#' are ignored.
+    """
+    rslt = []
+    with open(manifest_fname, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                rslt.append(line)
+    return rslt
+
+
+def _batch_out_fnames(target_dirs, out_dir, yaml_flag):
+    """
+    Assign a distinct output filename in out_dir to each target directory
+    """
+    ext = '.yml' if yaml_flag else '.json'
+    used = set()
+    rslt = []
+    for idx, target_dir in enumerate(target_dirs):
+        base = os.path.basename(os.path.normpath(target_dir)) or 'root'
+        if base in used:
+            base = '{}_{}'.format(base, idx)
+        used.add(base)
+        rslt.append(os.path.join(out_dir, base + ext))
+    return rslt
+
+
+def _unique_dirs(target_dirs):
+    """
+    Returns target_dirs without repeats, comparing normalized paths and
+    keeping the first occurrence of each
+    """
+    seen = set()
+    rslt = []
+    for target_dir in target_dirs:
+        key = os.path.normpath(target_dir)
+        if key in seen:
+            print('{}: listed more than once; scanning it once'.format(target_dir))
+        else:
+            seen.add(key)
+            rslt.append(target_dir)
+    return rslt
+
+
+def _scan_one(target_dir, out_fname, schema_fname, yaml_flag, scan_kwargs):
+    """
+    Worker for scan_batch.  Output from the scan goes to a log file beside
+    out_fname, and any exception is caught and reported in the returned dict
+    so that one bad directory does not affect the others.
+    """
+    log_fname = os.path.splitext(out_fname)[0] + '.log'
+    rslt = {'dir': target_dir, 'out': out_fname, 'log': log_fname}
+    if scan_kwargs.get('profile_fname') is not None:
+        scan_kwargs = scan_kwargs.copy()
+        scan_kwargs['profile_fname'] = os.path.splitext(out_fname)[0] + '.profile.json'
+        rslt['profile'] = scan_kwargs['profile_fname']
+    with open(log_fname, 'w') as log_f:
+        with contextlib.redirect_stdout(log_f), contextlib.redirect_stderr(log_f):
+            try:
+                scan(target_dir=target_dir, out_fname=out_fname,
+                     schema_fname=schema_fname, yaml_flag=yaml_flag, **scan_kwargs)
+                rslt['status'] = 'success'
+            except Exception as e:
+                traceback.print_exc()
+                rslt['status'] = 'failure'
+                rslt['error'] = '{}: {}'.format(type(e).__name__, e)
+    return rslt
+
+
+def scan_batch(target_dirs, out_dir, schema_fname, yaml_flag=False, max_workers=None,
+               report_fname=None, **scan_kwargs):
+    """
+    Scan many directories, fanning them out over a pool of worker processes.
+    One result file and one log file are written to out_dir for each target
+    directory, plus an aggregated report.  Returns the report as a dict.
+    A directory listed more than once is scanned once, at its first
+    position.  Additional keyword arguments are passed on to scan().
+    """
+    target_dirs = _unique_dirs(target_dirs)
+    os.makedirs(out_dir, exist_ok=True)
+    get_known_data_collection_types()  # so forked workers inherit the list
+    out_fnames = _batch_out_fnames(target_dirs, out_dir, yaml_flag)
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_scan_one, target_dir, out_fname,
+                                   schema_fname, yaml_flag,
+                                   scan_kwargs): (target_dir, out_fname)
+                   for target_dir, out_fname in zip(target_dirs, out_fnames)}
+        for future in as_completed(futures):
+            target_dir, out_fname = futures[future]
+            try:
+                rslt = future.result()
+            except Exception as e:
+                # The worker itself died, e.g. killed for running out of memory
+                rslt = {'dir': target_dir, 'out': out_fname, 'status': 'failure',
+                        'error': '{}: {}'.format(type(e).__name__, e)}
+            print('{}: {}'.format(target_dir, rslt['status']))
+            results[target_dir] = rslt
+    ordered = [results[target_dir] for target_dir in target_dirs]
+    report = {'n_success': sum(1 for r in ordered if r['status'] == 'success'),
+              'n_failure': sum(1 for r in ordered if r['status'] != 'success'),
+              'results': ordered}
+    if report_fname is None:
+        report_fname = os.path.join(out_dir,
+                                    'batch_report' + ('.yml' if yaml_flag else '.json'))
+    with open(report_fname, 'w') as f:
+        if yaml_flag:
+            yaml.dump(report, f)
+        else:
+            json.dump(report, f)
+    return report
+
 
 def main(myargv=None):
     if myargv is None:
@@ -63,20 +280,100 @@ def main(myargv=None):
     parser = argparse.ArgumentParser(description='Scan a directory tree of data'
                                      ' files and extract metadata');
     parser.add_argument('--out', default=None,
-                        help='Full pathname of output JSON (defaults to stdout)')
+                        help=('Full pathname of output JSON (defaults to stdout).  In batch'
+                              ' mode, the pathname of the batch report'))
     parser.add_argument('--schema', default=None, nargs=1,
                         help=('Schema against which the output will be checked'
                               ' (default %s)' % default_schema_path))
-    parser.add_argument('dir', default=None, nargs='?',
-                        help='directory to scan (defaults to CWD)')
+    parser.add_argument('dir', default=None, nargs='*',
+                        help=('directory to scan (defaults to CWD).  If more than one'
+                              ' is given, they are scanned in batch mode'))
     parser.add_argument('--yaml', default=False, action='store_true')
+    parser.add_argument('--manifest', default=None,
+                        help=('File listing directories to scan in batch mode,'
+                              ' one per line'))
+    parser.add_argument('--out_dir', default=None,
+                        help=('Directory for per-directory results and the batch'
+                              ' report in batch mode (defaults to CWD)'))
+    parser.add_argument('--workers', default=None, type=int,
+                        help=('Number of worker processes in batch mode'
+                              ' (defaults to the number of CPUs)'))
+    parser.add_argument('--snapshot_depth', default=0, type=int,
+                        help=('Number of directory levels to read in advance when'
+                              ' snapshotting the directory tree (default 0; deeper'
+                              ' directories are read as the file patterns need them)'))
+    parser.add_argument('--parse_threads', default=1, type=int,
+                        help=('Number of threads used to parse the files of a'
+                              ' collection (default 1, parse serially)'))
+    parser.add_argument('--parse_processes', default=0, type=int,
+                        help=('Number of worker processes used to parse CPU-heavy'
+                              ' file types (default 0, use the parse threads)'))
+    parser.add_argument('--parse_memory_mb', default=None, type=int,
+                        help=('Parse each file in a worker process limited to this many'
+                              ' MB of address space (default: no limit)'))
+    parser.add_argument('--parse_timeout', default=None, type=float,
+                        help=('Parse each file in a worker process, failing if it takes'
+                              ' more than this many seconds (default: no limit)'))
+    parser.add_argument('--cache', default=None,
+                        help=('SQLite file in which to cache parsed file metadata'
+                              ' between scans (default: no caching).  It should be'
+                              ' writable only by the user running the scan.  On shared'
+                              ' storage, SQLite relies on the filesystem\'s locking'))
+    parser.add_argument('--cache_mode', default='use', choices=['use', 'off', 'purge'],
+                        help=('use the cache, ignore it, or empty it before scanning'
+                              ' (default use)'))
+    parser.add_argument('--cache_max_mb', default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        type=int,
+                        help='Maximum size of cached metadata in MB before eviction')
+    parser.add_argument('--collect_all', default=False, action='store_true',
+                        help=('Parse every expected file, even those not used in the'
+                              ' final metadata (for debugging)'))
+    parser.add_argument('--profile', default=None,
+                        help=('Full pathname of a JSON timing and I/O profile of the'
+                              ' scan.  In batch mode, any value causes a profile to be'
+                              ' written beside each result'))
+    parser.add_argument('--profile_memory', default=False, action='store_true',
+                        help=('Also record the peak memory of each parse in the profile,'
+                              ' using tracemalloc (slows parsing considerably)'))
+    parser.add_argument('--fastq_sample', default=None, type=int,
+                        help=('Collect statistics from only the first N reads of each'
+                              ' FASTQ file; gzip trailers are still checked to the end'
+                              ' (default: parse every read)'))
     ns = parser.parse_args(myargv[1:])
 
     schema_fname = default_schema_path if ns.schema is None else ns.schema
-    out_fname = ns.out
-    target_dir = (os.getcwd() if ns.dir is None else ns.dir)
     yaml_flag = ns.yaml
-    scan(target_dir=target_dir, out_fname=out_fname, schema_fname=schema_fname, yaml_flag=yaml_flag)
+    cache_path = None if ns.cache_mode == 'off' else ns.cache
+    if cache_path is not None and ns.cache_mode == 'purge':
+        with MetadataCache(cache_path) as md_cache:
+            md_cache.purge()
+    scan_kwargs = {'snapshot_depth': ns.snapshot_depth,
+                   'parse_threads': ns.parse_threads,
+                   'parse_processes': ns.parse_processes,
+                   'cache_path': cache_path,
+                   'cache_max_bytes': ns.cache_max_mb * 1024 * 1024,
+                   'collect_all': ns.collect_all,
+                   'profile_fname': ns.profile,
+                   'profile_memory': ns.profile_memory,
+                   'fastq_sample': ns.fastq_sample,
+                   'parse_memory_limit': (None if ns.parse_memory_mb is None
+                                          else ns.parse_memory_mb * 1024 * 1024),
+                   'parse_timeout': ns.parse_timeout}
+    target_dirs = list(ns.dir)
+    if ns.manifest is not None:
+        target_dirs.extend(read_manifest(ns.manifest))
+    if ns.manifest is not None or len(target_dirs) > 1:
+        out_dir = os.getcwd() if ns.out_dir is None else ns.out_dir
+        report = scan_batch(target_dirs, out_dir, schema_fname=schema_fname,
+                            yaml_flag=yaml_flag, max_workers=ns.workers,
+                            report_fname=ns.out, **scan_kwargs)
+        if report['n_failure']:
+            sys.exit(1)
+    else:
+        out_fname = ns.out
+        target_dir = (os.getcwd() if not target_dirs else target_dirs[0])
+        scan(target_dir=target_dir, out_fname=out_fname, schema_fname=schema_fname,
+             yaml_flag=yaml_flag, **scan_kwargs)
     
 
 if __name__ == '__main__':
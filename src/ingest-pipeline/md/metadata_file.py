@@ -3,6 +3,9 @@
 class MetadataFile(object):
     """A tool for extracting metadata from a specific file type"""
     category_name = 'Base';
+    cpu_bound = False  # True if parsing is dominated by computation rather than I/O
+    parser_version = 1  # increment when collect_metadata output changes, to invalidate caches
+    content_kinds = None  # content_sniffer kinds this type can parse; None accepts any
 
     def __init__(self, path):
         """
@@ -10,6 +13,23 @@ class MetadataFile(object):
         """
         self.path = path
     
+    @classmethod
+    def cache_version(cls):
+        """
+        The parser identity recorded in the metadata cache.  Subclasses whose
+        output also depends on class settings include them here.
+        """
+        return str(cls.parser_version)
+
+    @classmethod
+    def cache_dependencies(cls, path):
+        """
+        Other files whose contents collect_metadata reads when parsing path.
+        Their identity is part of the metadata cache key, so changing one
+        invalidates the cached result for path.
+        """
+        return []
+
     def __str__(self):
         return '<%s MetadataFile>' % self.category_name
 
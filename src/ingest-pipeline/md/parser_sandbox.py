@@ -0,0 +1,203 @@
+#! /usr/bin/env python
+
+"""
+Run parsers in reusable worker processes with an address space limit
+(RLIMIT_AS) and a wall-clock timeout, so that a malformed file which makes
+a parser allocate without bound or hang costs one worker process rather
+than the whole scan and whatever else shares its host.
+
+A job is a module-level function and its arguments, which are pickled to
+the worker; the result or exception is pickled back.  Workers are started
+by a fork server (or spawned where there is none) rather than forked from
+the caller, whose other threads may hold locks at the moment of a fork, so
+they do not see class or module state the caller has changed at run time;
+such state has to travel with the job's arguments.  A worker which runs
+out of memory, overruns the timeout or dies is replaced, and the job's
+future gets a MetadataError naming the job and the limit hit.  Any other
+exception raised by the function is passed through unchanged.
+"""
+
+import os
+import errno
+import signal
+import threading
+import resource
+import traceback
+import multiprocessing
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+
+from type_base import MetadataError
+
+# Seconds allowed for a worker to exit after being asked to stop
+STOP_SECONDS = 5
+
+_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class _RemoteTraceback(Exception):
+    """
+    Carries the worker's traceback as the cause of a re-raised exception,
+    as concurrent.futures.ProcessPoolExecutor does
+    """
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
+def _worker_main(conn, memory_limit):
+    if memory_limit is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            memory_limit = min(memory_limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        fn, args = job
+        try:
+            rslt = ('ok', fn(*args))
+        except MemoryError:
+            rslt = ('memory', None)
+        except OSError as e:
+            if e.errno == errno.ENOMEM:  # as from a failed mmap
+                rslt = ('memory', None)
+            else:
+                rslt = ('error', e, traceback.format_exc())
+        except Exception as e:
+            rslt = ('error', e, traceback.format_exc())
+        try:
+            conn.send(rslt)
+        except Exception:
+            # The result or exception could not be pickled
+            conn.send(('error', None, traceback.format_exc()))
+        if rslt[0] == 'memory':
+            break  # the heap may be left in a poor state
+
+
+class _Worker(object):
+    def __init__(self, memory_limit):
+        self.conn, child_conn = _MP_CONTEXT.Pipe()
+        self.process = _MP_CONTEXT.Process(target=_worker_main,
+                                           args=(child_conn, memory_limit),
+                                           daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(STOP_SECONDS)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(STOP_SECONDS)
+        if self.process.is_alive():
+            os.kill(self.process.pid, signal.SIGKILL)
+            self.process.join()
+        self.conn.close()
+
+
+class ParserSandbox(object):
+    """
+    A pool of max_workers worker processes, each limited to memory_limit
+    bytes of address space and timeout seconds per job (None for no
+    limit).  Use as a context manager, or call shutdown().
+    """
+
+    def __init__(self, max_workers=1, memory_limit=None, timeout=None):
+        self.max_workers = max_workers
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        self._idle = Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        for _ in range(max_workers):
+            self._add_worker()
+        self._dispatch = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def _add_worker(self):
+        worker = _Worker(self.memory_limit)
+        self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker):
+        worker.stop(kill=True)
+        with self._lock:
+            self._workers.remove(worker)
+            self._add_worker()
+
+    def _describe_exit(self, worker):
+        worker.process.join(STOP_SECONDS)
+        exitcode = worker.process.exitcode
+        if exitcode is None:
+            how = 'worker process stopped responding'
+        elif exitcode < 0:
+            how = 'worker process was killed by signal {}'.format(-exitcode)
+        else:
+            how = 'worker process exited with status {}'.format(exitcode)
+        if self.memory_limit is not None:
+            how += ' (memory limit {} bytes)'.format(self.memory_limit)
+        return how
+
+    def _run(self, label, fn, args):
+        worker = self._idle.get()
+        failure = None
+        try:
+            worker.conn.send((fn, args))
+        except (OSError, EOFError):
+            failure = self._describe_exit(worker)
+        except Exception:
+            self._idle.put(worker)  # the job could not be pickled
+            raise
+        if failure is None:
+            try:
+                if worker.conn.poll(self.timeout):
+                    rslt = worker.conn.recv()
+                    if rslt[0] == 'memory':
+                        failure = 'exceeded the memory limit of {} bytes'.format(
+                            self.memory_limit)
+                else:
+                    failure = 'exceeded the time limit of {} seconds'.format(self.timeout)
+            except (OSError, EOFError):
+                failure = self._describe_exit(worker)
+        if failure is not None:
+            self._replace(worker)
+            raise MetadataError('{}: {}'.format(label, failure))
+        self._idle.put(worker)
+        if rslt[0] == 'ok':
+            return rslt[1]
+        _, exc, tb = rslt
+        if exc is None:
+            raise MetadataError('{}: the result could not be returned\n{}'.format(label, tb))
+        raise exc from _RemoteTraceback(tb)
+
+    def submit(self, fn, *args, label=None):
+        """
+        Run fn(*args) in a worker, returning a concurrent.futures.Future.
+        label names the job in error messages.
+        """
+        if label is None:
+            label = getattr(fn, '__name__', repr(fn))
+        return self._dispatch.submit(self._run, label, fn, args)
+
+    def shutdown(self):
+        self._dispatch.shutdown()
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+
+"""
+Timing and memory profiling of a metadata scan, written as a
+machine-readable report alongside the scan results.
+"""
+
+import os
+import time
+import json
+import tracemalloc
+from contextlib import contextmanager
+
+
+def thread_bytes_read():
+    """
+    Returns the number of bytes the calling thread has read via system
+    calls, or None if the platform does not provide this.
+    """
+    try:
+        with open('/proc/thread-self/io', 'rb') as f:
+            for line in f:
+                if line.startswith(b'rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def profiled_parse(md_class, fpath, trace_memory=False):
+    """
+    Run md_class(fpath).collect_metadata(), returning (metadata, stats).
+    Peak memory is measured with tracemalloc if trace_memory is set; this
+    is only meaningful if no other thread is parsing at the same time.
+    """
+    stats = {'path': fpath,
+             'parser': md_class.__name__,
+             'bytes_on_disk': os.path.getsize(fpath) if os.path.isfile(fpath) else None}
+    started_tracing = False
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    read0 = thread_bytes_read()
+    t0 = time.perf_counter()
+    try:
+        md = md_class(fpath).collect_metadata()
+    finally:
+        stats['seconds'] = time.perf_counter() - t0
+        read1 = thread_bytes_read()
+        stats['bytes_read'] = None if read0 is None or read1 is None else read1 - read0
+        stats['peak_memory'] = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if started_tracing:
+            tracemalloc.stop()
+    return md, stats
+
+
+class ScanProfile(object):
+    """
+    Accumulates the costs of one scan: named phases, test_match probes and
+    per-file parses.
+    """
+
+    def __init__(self, target_dir):
+        self.target_dir = target_dir
+        self.t_start = time.perf_counter()
+        self.total_seconds = None
+        self.phases = {}
+        self.probes = []
+        self.files = []
+        self.collection_type = None
+        self.cache_hits = 0
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+
+    def record_probe(self, category_name, seconds, matched):
+        self.probes.append({'collection_type': category_name, 'seconds': seconds,
+                            'matched': matched})
+
+    def record_file(self, stats):
+        self.files.append(stats)
+
+    def record_cached_file(self, fpath, md_class):
+        self.cache_hits += 1
+        self.files.append({'path': fpath, 'parser': md_class.__name__, 'cached': True,
+                           'bytes_on_disk': None, 'bytes_read': 0, 'seconds': 0.0,
+                           'peak_memory': None})
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self.t_start
+
+    def summary(self):
+        """
+        A compact summary, suitable for passing through XCom
+        """
+        parsed = [elt for elt in self.files if not elt.get('cached')]
+        slowest = max(parsed, key=lambda elt: elt['seconds']) if parsed else None
+        peaks = [elt['peak_memory'] for elt in parsed if elt['peak_memory'] is not None]
+        return {'target_dir': self.target_dir,
+                'collection_type': self.collection_type,
+                'total_seconds': self.total_seconds,
+                'phases': dict(self.phases),
+                'probe_seconds': sum(elt['seconds'] for elt in self.probes),
+                'n_files': len(self.files),
+                'n_cached': self.cache_hits,
+                'parse_seconds': sum(elt['seconds'] for elt in parsed),
+                'bytes_on_disk': sum(elt['bytes_on_disk'] or 0 for elt in parsed),
+                'bytes_read': sum(elt['bytes_read'] or 0 for elt in parsed),
+                'max_peak_memory': max(peaks) if peaks else None,
+                'slowest_file': (None if slowest is None
+                                 else {k: slowest[k] for k in ['path', 'parser', 'seconds']})}
+
+    def as_dict(self):
+        return {'summary': self.summary(),
+                'probes': self.probes,
+                'files': self.files}
+
+    def write(self, fname):
+        with open(fname, 'w') as f:
+            json.dump(self.as_dict(), f, indent=1)
@@ -0,0 +1,177 @@
+#! /usr/bin/env python
+
+"""
+A column-oriented reader for the CSV and TSV files found in submissions.
+
+The dialect is sniffed from a sample of up to SNIFF_BYTES, cut back to the
+last complete line, with the candidate delimiters limited to those that
+actually occur in these files; csv.Sniffer given a short sample of free
+text will otherwise happily pick a letter or a space.  If sniffing fails
+the delimiter is chosen from the header line.
+
+The file is read in one pass with csv.reader.  Rows are transposed into
+columns, and each column is converted to int or float if every non-blank
+value allows it (blanks become None) and is otherwise left as str.  The
+row-per-dict form produced by csv.DictReader is available from
+Table.records() for the callers that want it.
+"""
+
+import re
+import csv
+from itertools import islice
+
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = ',\t;|'
+SCHEMA_ROWS = 1000  # rows used to infer column types in schema only mode
+# Plain decimal numbers only: int() and float() would also take '1_000',
+# ' 5', 'nan' and 'inf', which in these files are labels, not numbers
+NUMBER_PATTERNS = ((int, re.compile(r'[+-]?[0-9]+')),
+                   (float, re.compile(r'[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?')))
+
+
+class Table(object):
+    """
+    The header and columns of a tabular file.  columns[i] holds the values
+    of header[i] and types[i] is 'int', 'float', 'str' or 'empty' (all
+    blank).  Rows shorter than the header are padded with None; the extra
+    values of longer rows are kept in extras, keyed by row index.  If
+    truncated is set, the file has rows beyond those read.  In schema only
+    mode columns is None and n_rows counts only the rows sampled.
+
+    Untyped tables keep the rows as read and transpose them into columns
+    only when columns is first used, so records() costs no transposition.
+    """
+    def __init__(self, header, rows, columns, types, n_rows, extras, truncated, dialect):
+        self.header = header
+        self._rows = rows
+        self._columns = columns
+        self.types = types
+        self.n_rows = n_rows
+        self.extras = extras
+        self.truncated = truncated
+        self.dialect = dialect
+
+    @property
+    def columns(self):
+        if self._columns is None and self._rows is not None:
+            self._columns = _transpose(self._rows, len(self.header))
+        return self._columns
+
+    def column(self, name):
+        """
+        The values of the first column called name
+        """
+        return self.columns[self.header.index(name)]
+
+    def records(self):
+        """
+        The rows as a list of dicts, as csv.DictReader would produce them:
+        missing values are None and extra values are a list under the key
+        None.  Values are those held in columns, so call read_table with
+        typed=False to get the strings from the file.
+        """
+        header = self.header
+        rows = self._rows if self._rows is not None else zip(*self.columns)
+        rslt = [dict(zip(header, row)) for row in rows]
+        if not header:
+            rslt = [{} for _ in range(self.n_rows)]
+        for idx, extra in self.extras.items():
+            rslt[idx][None] = extra
+        return rslt
+
+    def schema(self):
+        return {'header': self.header,
+                'types': dict(zip(self.header, self.types)),
+                'delimiter': self.dialect.delimiter}
+
+
+def _transpose(rows, n_cols):
+    return [list(col) for col in zip(*rows)] if rows else [[] for _ in range(n_cols)]
+
+
+def sniff_dialect(f, sample_bytes=SNIFF_BYTES):
+    """
+    Returns a csv dialect for the text file f, which is left positioned at
+    the start
+    """
+    sample = f.read(sample_bytes)
+    f.seek(0)
+    if len(sample) == sample_bytes and '\n' in sample:
+        sample = sample[:sample.rindex('\n') + 1]
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS)
+    except csv.Error:
+        first_line = sample.split('\n', 1)[0]
+        delimiter = max(DELIMITERS, key=first_line.count)
+
+        class Dialect(csv.excel):
+            pass
+        Dialect.delimiter = delimiter if delimiter in first_line else ','
+        return Dialect
+
+
+def _typed(values):
+    """
+    Returns (type name, values converted to that type)
+    """
+    present = [v for v in values if v != ''] if '' in values else values
+    if not present:
+        return 'empty', [None] * len(values)
+    for tp, pattern in NUMBER_PATTERNS:
+        if not all(map(pattern.fullmatch, present)):
+            continue
+        converted = list(map(tp, present))
+        if present is not values:
+            it = iter(converted)
+            converted = [None if v == '' else next(it) for v in values]
+        return tp.__name__, converted
+    return 'str', list(values)
+
+
+def read_table(path, max_rows=None, schema_only=False, typed=True, dialect=None):
+    """
+    Read the tabular file at path, whose first row is the header.  At most
+    max_rows rows are read.  If schema_only is set, only enough rows to
+    infer the column types are read (max_rows, or SCHEMA_ROWS by default)
+    and no column values are kept.  Otherwise, if typed is False, every
+    column is left as str.  The dialect is sniffed unless given.
+    """
+    if schema_only and max_rows is None:
+        max_rows = SCHEMA_ROWS
+    with open(path, 'r', newline='') as f:
+        if dialect is None:
+            dialect = sniff_dialect(f)
+        reader = csv.reader(f, dialect=dialect)
+        header = next(reader, [])
+        rows = filter(None, reader)  # blank lines are skipped, as in DictReader
+        if max_rows is None:
+            rows = list(rows)
+            truncated = False
+        else:
+            rows_it = rows
+            rows = list(islice(rows_it, max_rows))
+            truncated = next(rows_it, None) is not None
+    n_cols = len(header)
+    extras = {}
+    if any(len(row) != n_cols for row in rows):
+        padded = []
+        for idx, row in enumerate(rows):
+            if len(row) > n_cols:
+                extras[idx] = row[n_cols:]
+                row = row[:n_cols]
+            elif len(row) < n_cols:
+                row = row + [None] * (n_cols - len(row))
+            padded.append(row)
+        rows = padded
+    if schema_only or typed:
+        columns = _transpose(rows, n_cols)
+        types = []
+        for idx, col in enumerate(columns):
+            if None in col:  # padding for short rows is treated as a blank
+                col = ['' if v is None else v for v in col]
+            tp, columns[idx] = _typed(col)
+            types.append(tp)
+        if schema_only:
+            return Table(header, None, None, types, len(rows), extras, truncated, dialect)
+        return Table(header, None, columns, types, len(rows), extras, truncated, dialect)
+    return Table(header, rows, None, ['str'] * n_cols, len(rows), extras, truncated, dialect)
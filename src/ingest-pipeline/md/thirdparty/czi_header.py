@@ -0,0 +1,201 @@
+#! /usr/bin/env python
+
+"""
+A minimal reader for the structure of Zeiss CZI files, for callers that
+need the metadata XML and an outline of the image but none of the pixels.
+
+A CZI file is a sequence of segments, each starting with a 32 byte header
+(a 16 byte ASCII id and the allocated and used sizes of the data that
+follow).  The ZISRAWFILE segment at offset 0 gives the positions of the
+ZISRAWMETADATA segment, which holds the XML, and of the ZISRAWDIRECTORY
+segment, which has one entry per image subblock.  The file is memory
+mapped and only those three segments are read; if the header does not
+give a position (as in a file whose writing was interrupted), the
+segments are found by walking the segment chain.
+"""
+
+import mmap
+import struct
+from collections import Counter
+
+SEGMENT_HEADER = struct.Struct('<16sqq')
+FILE_HEADER = struct.Struct('<iiii16s16siqqiq')
+METADATA_HEADER = struct.Struct('<ii')
+METADATA_DATA_OFFSET = 256  # the XML follows a fixed 256 byte header
+DIRECTORY_HEADER = struct.Struct('<i')
+DIRECTORY_DATA_OFFSET = 128
+DIRECTORY_ENTRY = struct.Struct('<2siqiiB5si')
+DIMENSION_ENTRY = struct.Struct('<4siifi')
+
+PIXEL_TYPES = {0: 'Gray8', 1: 'Gray16', 2: 'Gray32Float', 3: 'Bgr24', 4: 'Bgr48',
+               8: 'Bgr96Float', 9: 'Bgra32', 10: 'Gray64ComplexFloat',
+               11: 'Bgr192ComplexFloat', 12: 'Gray32', 13: 'Gray64'}
+COMPRESSIONS = {0: 'Uncompressed', 1: 'JpgFile', 2: 'LZW', 4: 'JpegXrFile', 5: 'Zstd0',
+                6: 'Zstd1'}
+# Dimensions whose values are indices rather than pixel coordinates
+INDEX_DIMENSIONS = 'ZCTRIHVBSM'
+
+
+class CziHeaderError(Exception):
+    pass
+
+
+class CziHeader(object):
+    """
+    The file header, metadata XML and subblock directory of a CZI file.
+    Use as a context manager, or call close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            self._fh.close()
+            raise CziHeaderError('{} is empty'.format(path))
+        try:
+            self._read_file_header()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def _segment_at(self, pos):
+        """
+        Returns (id, allocated size, used size) for the segment at pos
+        """
+        if pos < 0 or pos + SEGMENT_HEADER.size > len(self._mm):
+            raise CziHeaderError('segment position {} is outside the file'.format(pos))
+        seg_id, allocated, used = SEGMENT_HEADER.unpack_from(self._mm, pos)
+        return seg_id.rstrip(b'\0').decode('ascii', 'replace'), allocated, used
+
+    def _find_segment(self, want_id):
+        """
+        Walk the segment chain looking for the first segment with id want_id
+        """
+        pos = 0
+        while pos + SEGMENT_HEADER.size <= len(self._mm):
+            seg_id, allocated, _ = self._segment_at(pos)
+            if seg_id == want_id:
+                return pos
+            if allocated <= 0:
+                break
+            pos += SEGMENT_HEADER.size + allocated
+        return None
+
+    def _read_file_header(self):
+        seg_id, _, _ = self._segment_at(0)
+        if seg_id != 'ZISRAWFILE':
+            raise CziHeaderError('{} is not a CZI file'.format(self.path))
+        (self.major, self.minor, _, _, primary_guid, file_guid, self.file_part,
+         directory_pos, metadata_pos, update_pending,
+         _) = FILE_HEADER.unpack_from(self._mm, SEGMENT_HEADER.size)
+        self.primary_file_guid = primary_guid.hex()
+        self.file_guid = file_guid.hex()
+        self.update_pending = bool(update_pending)
+        self.metadata_pos = metadata_pos or self._find_segment('ZISRAWMETADATA')
+        self.directory_pos = directory_pos or self._find_segment('ZISRAWDIRECTORY')
+
+    def _check_segment(self, pos, want_id):
+        seg_id, _, used = self._segment_at(pos)
+        if seg_id != want_id:
+            raise CziHeaderError('expected {} at {} but found {}'.format(want_id, pos, seg_id))
+        return pos + SEGMENT_HEADER.size, used
+
+    @property
+    def metadata_xml(self):
+        """
+        The metadata XML as a str, or None if the file has no metadata segment
+        """
+        if not self.metadata_pos:
+            return None
+        data_pos, _ = self._check_segment(self.metadata_pos, 'ZISRAWMETADATA')
+        xml_size, _ = METADATA_HEADER.unpack_from(self._mm, data_pos)
+        start = data_pos + METADATA_DATA_OFFSET
+        if start + xml_size > len(self._mm):
+            raise CziHeaderError('metadata segment runs past the end of the file')
+        return self._mm[start:start + xml_size].decode('utf-8').rstrip('\0')
+
+    def iter_directory(self):
+        """
+        Yields (pixel_type, file_position, compression, pyramid_type,
+        [(dimension, start, size), ...]) for each subblock directory entry
+        """
+        if not self.directory_pos:
+            return
+        data_pos, _ = self._check_segment(self.directory_pos, 'ZISRAWDIRECTORY')
+        n_entries, = DIRECTORY_HEADER.unpack_from(self._mm, data_pos)
+        pos = data_pos + DIRECTORY_DATA_OFFSET
+        end = len(self._mm)
+        mm = self._mm
+        for _ in range(n_entries):
+            if pos + DIRECTORY_ENTRY.size > end:
+                raise CziHeaderError('subblock directory runs past the end of the file')
+            (schema, pixel_type, file_pos, _, compression, pyramid_type, _,
+             n_dims) = DIRECTORY_ENTRY.unpack_from(mm, pos)
+            if schema != b'DV':
+                raise CziHeaderError('unknown directory entry schema {!r}'.format(schema))
+            pos += DIRECTORY_ENTRY.size
+            dims = []
+            for _ in range(n_dims):
+                dim, start, size, _, _ = DIMENSION_ENTRY.unpack_from(mm, pos)
+                dims.append((dim.rstrip(b'\0').decode('ascii'), start, size))
+                pos += DIMENSION_ENTRY.size
+            yield pixel_type, file_pos, compression, pyramid_type, dims
+
+    def summary(self):
+        """
+        A compact summary of the file and its subblocks.  For each dimension
+        'start' and 'size' give the range covered by all subblocks; for index
+        dimensions such as C and Z 'count' is the number of distinct indices.
+        """
+        pixel_types = Counter()
+        compressions = Counter()
+        n_subblocks = n_pyramid = 0
+        ranges = {}
+        indices = {}
+        for pixel_type, _, compression, pyramid_type, dims in self.iter_directory():
+            n_subblocks += 1
+            pixel_types[PIXEL_TYPES.get(pixel_type, str(pixel_type))] += 1
+            compressions[COMPRESSIONS.get(compression, str(compression))] += 1
+            if pyramid_type:
+                n_pyramid += 1
+            for dim, start, size in dims:
+                lo, hi = ranges.get(dim, (start, start + size))
+                ranges[dim] = (min(lo, start), max(hi, start + size))
+                if dim in INDEX_DIMENSIONS:
+                    indices.setdefault(dim, set()).add(start)
+        dimensions = {}
+        for dim, (lo, hi) in sorted(ranges.items()):
+            dimensions[dim] = {'start': lo, 'size': hi - lo}
+            if dim in indices:
+                dimensions[dim]['count'] = len(indices[dim])
+        return {'file_version': '{}.{}'.format(self.major, self.minor),
+                'file_guid': self.file_guid,
+                'file_part': self.file_part,
+                'update_pending': self.update_pending,
+                'n_subblocks': n_subblocks,
+                'n_pyramid_subblocks': n_pyramid,
+                'pixel_types': dict(pixel_types),
+                'compression': dict(compressions),
+                'dimensions': dimensions}
+
+
+def read_czi_header(path):
+    """
+    Returns (metadata XML, summary) for the CZI file at path
+    """
+    with CziHeader(path) as czi:
+        return czi.metadata_xml, czi.summary()
@@ -0,0 +1,224 @@
+#! /usr/bin/env python
+
+"""
+A minimal TIFF reader which parses only the file header and the first
+image file directory (IFD), for callers that need the first page's
+ImageDescription but none of the image data.
+
+tifffile.TiffFile reads and decodes every tag of the first page, including
+the strip or tile offset arrays, and sets up its page and series machinery.
+This module reads the 8 or 16 byte header, the first IFD's tag entries,
+and the bytes of the tags that are asked for.  Classic and BigTIFF
+layouts are handled, and Hamamatsu NDPI files are recognized.  Tag value
+offsets are read as stored, 32 bits in classic and NDPI files, as
+tifffile 2019.7.26 reads them.  ImageDescription strings are decoded
+exactly as tifffile 2019.7.26 decodes them, so the results are
+interchangeable with TiffFile.pages[0].description.
+"""
+
+import struct
+
+TAG_IMAGE_DESCRIPTION = 270
+TAG_MAKE = 271
+TAG_NDPI_MAGIC = 65420
+
+# TIFF data type -> size in bytes of one element
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8,
+              13: 4, 16: 8, 17: 8, 18: 8}
+
+
+class TiffHeaderError(Exception):
+    pass
+
+
+class TiffLayout(object):
+    """
+    The structural parameters of one TIFF flavor
+    """
+    def __init__(self, name, byteorder, offsetsize, tagnoformat, tagformat):
+        self.name = name
+        self.byteorder = byteorder
+        self.offsetsize = offsetsize
+        self.offsetformat = byteorder + ('Q' if offsetsize == 8 else 'I')
+        self.tagnoformat = byteorder + tagnoformat
+        self.tagnosize = struct.calcsize(tagnoformat)
+        self.tagformat = byteorder + tagformat
+        self.tagsize = struct.calcsize('<' + tagformat)
+
+    def __repr__(self):
+        return '<%s(%s, %s)>' % (type(self).__name__, self.name, self.byteorder)
+
+
+def classic_layout(byteorder):
+    return TiffLayout('classic', byteorder, 4, 'H', 'HHI4s')
+
+
+def bigtiff_layout(byteorder):
+    return TiffLayout('bigtiff', byteorder, 8, 'Q', 'HHQ8s')
+
+
+class TiffHeader(object):
+    """
+    The header and first IFD of a TIFF file.  Tag values are not read until
+    requested through get_tag_bytes or description.
+
+    Hamamatsu NDPI files are classic little-endian TIFFs with a private
+    65420 tag.  The header can only point to a first IFD below 4 GB, and
+    its tag value offsets are not extended.
+    """
+
+    def __init__(self, fh):
+        self.fh = fh
+        fh.seek(0, 2)
+        self.size = fh.tell()
+        fh.seek(0)
+        header = fh.read(8)
+        try:
+            byteorder = {b'II': '<', b'MM': '>'}[header[:2]]
+        except KeyError:
+            raise TiffHeaderError('not a TIFF file')
+        version = struct.unpack(byteorder + 'H', header[2:4])[0]
+        if version == 43:
+            offsetsize, zero = struct.unpack(byteorder + 'HH', header[4:8])
+            if offsetsize != 8 or zero != 0:
+                raise TiffHeaderError('invalid BigTIFF file')
+            self.layout = bigtiff_layout(byteorder)
+            self.ifd_offset = struct.unpack(byteorder + 'Q', fh.read(8))[0]
+        elif version == 42:
+            self.layout = classic_layout(byteorder)
+            self.ifd_offset = struct.unpack(byteorder + 'I', header[4:8])[0]
+        else:
+            raise TiffHeaderError('invalid TIFF file')
+        self.tags = self._read_ifd(self.ifd_offset)
+        if (self.layout.name == 'classic' and byteorder == '<'
+                and TAG_NDPI_MAGIC in self.tags and TAG_MAKE in self.tags):
+            self.layout.name = 'ndpi'
+
+    def _read_ifd(self, offset):
+        """
+        Returns {code: (type, count, raw value field)} for the IFD at offset
+        """
+        layout = self.layout
+        if offset < 8 or offset + layout.tagnosize > self.size:
+            raise TiffHeaderError('invalid IFD offset %d' % offset)
+        self.fh.seek(offset)
+        tagno = struct.unpack(layout.tagnoformat, self.fh.read(layout.tagnosize))[0]
+        if tagno > 4096:
+            raise TiffHeaderError('suspicious number of tags')
+        data = self.fh.read(tagno * layout.tagsize)
+        if len(data) < tagno * layout.tagsize:
+            raise TiffHeaderError('truncated IFD at offset %d' % offset)
+        tags = {}
+        for idx in range(tagno):
+            code, type_, count, value = struct.unpack_from(layout.tagformat, data,
+                                                           idx * layout.tagsize)
+            if code not in tags:  # the first of duplicate tags wins, as in tifffile
+                tags[code] = (type_, count, value)
+        return tags
+
+    @property
+    def is_bigtiff(self):
+        return self.layout.name == 'bigtiff'
+
+    @property
+    def is_ndpi(self):
+        return self.layout.name == 'ndpi'
+
+    def _value_offset(self, raw, size):
+        offset = struct.unpack(self.layout.offsetformat, raw)[0]
+        if offset < 8 or offset > self.size - size:
+            raise TiffHeaderError('invalid tag value offset')
+        return offset
+
+    def get_tag_bytes(self, code):
+        """
+        Returns the raw bytes of the value of tag code in the first IFD, or
+        None if there is no such tag
+        """
+        if code not in self.tags:
+            return None
+        type_, count, raw = self.tags[code]
+        try:
+            size = count * TYPE_SIZES[type_]
+        except KeyError:
+            raise TiffHeaderError('unknown tag data type %d' % type_)
+        if size <= self.layout.offsetsize:
+            return raw[:size]
+        self.fh.seek(self._value_offset(raw, size))
+        return self.fh.read(size)
+
+    @property
+    def description(self):
+        """
+        The first page's ImageDescription as tifffile decodes it: '' if the
+        tag is missing or is not valid text
+        """
+        value = self.get_tag_bytes(TAG_IMAGE_DESCRIPTION)
+        if value is None or self.tags[TAG_IMAGE_DESCRIPTION][0] != 2:
+            return ''
+        value = stripascii(value).strip()
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            try:
+                return value.decode('cp1252')
+            except UnicodeDecodeError:
+                return ''
+
+
+def stripascii(string):
+    """
+    Return string truncated at the last byte that is printable 7-bit ASCII,
+    as tifffile.stripascii does
+    """
+    idx = len(string)
+    while idx:
+        idx -= 1
+        if 8 < string[idx] < 127:
+            break
+    else:
+        idx = -1
+    return string[:idx + 1]
+
+
+def is_ome_description(description):
+    """
+    Equivalent to tifffile.TiffPage.is_ome for the first page
+    """
+    return bool(description) and ((description[:13] == '<?xml version'
+                                   or description[:8] == '<ome:OME')
+                                  and description[-4:] == 'OME>')
+
+
+def is_scn_description(description):
+    """
+    Equivalent to tifffile.TiffPage.is_scn for the first page
+    """
+    return (bool(description) and description[:14] == '<?xml version='
+            and description[-6:] == '</scn>')
+
+
+def read_description(path):
+    """
+    Returns the ImageDescription of the first page of the TIFF file at path
+    """
+    with open(path, 'rb') as fh:
+        return TiffHeader(fh).description
+
+
+def read_ome_metadata(path):
+    """
+    Returns the OME-XML of the TIFF file at path, or None if it is not an
+    OME-TIFF; equivalent to tifffile.TiffFile.ome_metadata
+    """
+    description = read_description(path)
+    return description if is_ome_description(description) else None
+
+
+def read_scn_metadata(path):
+    """
+    Returns the Leica SCN XML of the TIFF file at path, or None if it is not
+    an SCN file
+    """
+    description = read_description(path)
+    return description if is_scn_description(description) else None
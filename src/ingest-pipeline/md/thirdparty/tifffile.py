@@ -591,6 +591,7 @@ __all__ = (
     'TiffPage',
     'TiffPageSeries',
     'TiffFrame',
+    'ZarrTiffStore',
     'TiffTag',
     'TIFF',
     # utility classes and functions used by oiffile, czifile, etc
@@ -603,6 +604,7 @@ __all__ = (
     'transpose_axes',
     'squeeze_axes',
     'create_output',
+    'read_region',
     'repeat_nd',
     'format_size',
     'astype',
@@ -634,14 +636,15 @@ import struct
 import pathlib
 import warnings
 import binascii
+import hashlib
 import datetime
 import threading
 import collections
 
 try:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Mapping
 except ImportError:
-    from collections import Iterable
+    from collections import Iterable, Mapping
 
 from concurrent.futures import ThreadPoolExecutor
 
@@ -686,6 +689,10 @@ def imread(files, **kwargs):
         kwargs,
         'is_ome',
         'multifile',
+        'indexcache',
+        'maxgap',
+        'usemmap',
+        'pagecache',
         '_useframes',
         'name',
         'offset',
@@ -890,8 +897,9 @@ class TiffWriter(object):
     TiffWriter instances are not thread-safe.
 
     TiffWriter's main purpose is saving nD numpy array's as TIFF,
-    not to create any possible TIFF format. Specifically, SubIFDs, ExifIFD,
-    and GPSIFD tags are not supported.
+    not to create any possible TIFF format. Specifically, ExifIFD and GPSIFD
+    tags are not supported. SubIFDs are written only for the reduced
+    resolution levels of pyramids (see TiffWriter.save_pyramid).
 
     """
 
@@ -1007,7 +1015,7 @@ class TiffWriter(object):
              rowsperstrip=None, predictor=False, subsampling=None,
              colormap=None, description=None, datetime=None, resolution=None,
              subfiletype=0, software='tifffile.py', metadata={},
-             ijmetadata=None, extratags=()):
+             ijmetadata=None, extratags=(), maxworkers=None):
         """Write numpy array and tags to TIFF file.
 
         The data shape's last dimensions are assumed to be image depth,
@@ -1151,6 +1159,10 @@ class TiffWriter(object):
                 binary data.
             writeonce : bool
                 If True, the tag is written to the first page only.
+        maxworkers : int or None
+            Maximum number of threads to concurrently compress tiles or
+            strips. If None (default), up to half the CPU cores are used.
+            Tiles and strips are written in order, regardless of maxworkers.
 
         """
         # TODO: refactor this function
@@ -1716,9 +1728,6 @@ class TiffWriter(object):
             addtag(tagbytecounts, bytecountformat, numtiles, databytecounts)
             addtag(tagoffsets, offsetformat, numtiles, [0] * numtiles)
             contiguous = contiguous and product(tiles) == 1
-            if not contiguous:
-                # allocate tile buffer
-                chunk = numpy.empty(tile + (shape[-1],), dtype=datadtype)
             bytecountformat = bytecountformat * numtiles
         elif contiguous and (bilevel or rowsperstrip is None):
             # one strip per plane
@@ -1789,6 +1798,14 @@ class TiffWriter(object):
                 def compress(data, compressor=compressor, level=compresslevel):
                     return compressor(data, level)
 
+            if len(databytecounts) < 2:
+                maxworkers = 1
+            elif maxworkers is None or maxworkers < 1:
+                import multiprocessing
+                maxworkers = max(multiprocessing.cpu_count() // 2, 1)
+        else:
+            maxworkers = 1
+
         # TODO: check TIFFReadDirectoryCheckOrder warning in files containing
         #   multiple tags of same code
         # the entries in an IFD must be sorted in ascending order by tag code
@@ -1801,6 +1818,9 @@ class TiffWriter(object):
         ):
             raise ValueError('data too large for standard TIFF file')
 
+        # compress tiles or strips in a thread pool
+        executor = ThreadPoolExecutor(maxworkers) if maxworkers > 1 else None
+
         # if not compressed or multi-tiled, write the first IFD and then
         # all data contiguously; else, write all IFDs and data interleaved
         for pageindex in range(1 if contiguous else shape[0]):
@@ -1871,71 +1891,35 @@ class TiffWriter(object):
                 else:
                     fh.write_array(data)
             elif tile:
-                # TODO: refactor this
-                # TODO: use multithreading and chunk buffer?
                 if data is None:
                     fh.write_empty(numtiles * databytecounts[0])
-                elif len(tile) == 3:
-                    stripindex = 0
-                    for plane in data[pageindex]:
-                        for tz in range(tiles[0]):
-                            for ty in range(tiles[1]):
-                                for tx in range(tiles[2]):
-                                    c0 = min(tile[0], shape[2] - tz * tile[0])
-                                    c1 = min(tile[1], shape[3] - ty * tile[1])
-                                    c2 = min(tile[2], shape[4] - tx * tile[2])
-                                    chunk[c0:, c1:, c2:] = 0
-                                    chunk[:c0, :c1, :c2] = plane[
-                                        tz * tile[0]: tz * tile[0] + c0,
-                                        ty * tile[1]: ty * tile[1] + c1,
-                                        tx * tile[2]: tx * tile[2] + c2,
-                                    ]
-                                    if compress:
-                                        t = compress(chunk)
-                                        fh.write(t)
-                                        databytecounts[stripindex] = len(t)
-                                        stripindex += 1
-                                    else:
-                                        fh.write_array(chunk)
-                                        # fh.flush()
                 else:
-                    stripindex = 0
-                    for plane in data[pageindex]:
-                        for ty in range(tiles[0]):
-                            for tx in range(tiles[1]):
-                                c1 = min(tile[0], shape[3] - ty * tile[0])
-                                c2 = min(tile[1], shape[4] - tx * tile[1])
-                                chunk[c1:, c2:] = 0
-                                chunk[:c1, :c2] = plane[
-                                    0,
-                                    ty * tile[0]: ty * tile[0] + c1,
-                                    tx * tile[1]: tx * tile[1] + c2,
-                                ]
-                                if compress:
-                                    t = compress(chunk)
-                                    fh.write(t)
-                                    databytecounts[stripindex] = len(t)
-                                    stripindex += 1
-                                else:
-                                    fh.write_array(chunk)
-                                    # fh.flush()
+                    segments = iter_tiles(data[pageindex], tile, tiles)
+                    if compress:
+                        segments = encode_segments(segments, compress,
+                                                   executor, maxworkers * 4)
+                        for stripindex, t in enumerate(segments):
+                            fh.write(t)
+                            databytecounts[stripindex] = len(t)
+                    else:
+                        for chunk in segments:
+                            fh.write_array(chunk)
             elif compress:
                 # write one strip per rowsperstrip
                 if data.shape[2] != 1:
                     # not handling depth
                     raise RuntimeError('data.shape[2] != 1')
                 numstrips = (shape[-3] + rowsperstrip - 1) // rowsperstrip
-                stripindex = 0
-                for plane in data[pageindex]:
-                    for i in range(numstrips):
-                        strip = plane[
-                            0,
-                            i * rowsperstrip: (i + 1) * rowsperstrip
-                        ]
-                        strip = compress(strip)
-                        fh.write(strip)
-                        databytecounts[stripindex] = len(strip)
-                        stripindex += 1
+                segments = (
+                    plane[0, i * rowsperstrip: (i + 1) * rowsperstrip]
+                    for plane in data[pageindex]
+                    for i in range(numstrips)
+                )
+                segments = encode_segments(segments, compress, executor,
+                                           maxworkers * 4)
+                for stripindex, strip in enumerate(segments):
+                    fh.write(strip)
+                    databytecounts[stripindex] = len(strip)
             else:
                 fh.write_array(data[pageindex])
 
@@ -1973,6 +1957,9 @@ class TiffWriter(object):
             if pageindex == 0:
                 tags = [tag for tag in tags if not tag[-1]]
 
+        if executor is not None:
+            executor.shutdown()
+
         self._shape = shape
         self._datashape = (1,) + input_shape
         self._datadtype = datadtype
@@ -1987,6 +1974,375 @@ class TiffWriter(object):
                 return dataoffset, sum(databytecounts)
         return None
 
+    def save_pyramid(self, data, shape=None, dtype=None, tile=(256, 256),
+                     levels=None, downsample='mean', photometric=None,
+                     compress=0, predictor=False, description=None,
+                     resolution=None, software='tifffile.py', extratags=(),
+                     maxworkers=None):
+        """Write tiled image and its reduced resolution levels to TIFF file.
+
+        The full resolution image is written as a page in the main IFD
+        chain. Each further level is half the length and width of the
+        previous one and written as a SubIFD of that page with
+        NewSubfileType 1, the layout OME-TIFF uses for pyramids.
+        Call save_pyramid once per image plane to write multi-dimensional
+        OME-TIFF pyramids, passing the OME-XML description with the first
+        plane only.
+
+        Image data are consumed one row of tiles at a time. Tiles of all
+        levels are compressed and written as soon as they are complete,
+        such that memory use is bounded by two rows of tiles per level,
+        independent of the image length.
+
+        Parameters
+        ----------
+        data : numpy.ndarray or iterator
+            Full resolution image of shape (length, width[, samples]), or
+            an iterator over its tiles in row-major order. Tiles are arrays
+            of shape (tilelength, tilewidth[, samples]). Tiles at the right
+            and bottom image edges may be clipped or padded.
+        shape : tuple or None
+            Shape of the image. Required if 'data' is an iterator.
+        dtype : numpy.dtype or None
+            Datatype of the image. Required if 'data' is an iterator.
+        tile : (int, int)
+            The shape (length, width) of image tiles to write in all levels.
+            The tile length and width must be a multiple of 16.
+        levels : int or None
+            Number of resolution levels, including the full resolution.
+            By default, levels are added until the image fits in one tile.
+        downsample : str or callable
+            Method to reduce each level from the previous one.
+            See downsample2.
+        photometric : {'MINISBLACK', 'RGB'}
+            The color space of the image data. By default, images with
+            3 or 4 samples are RGB(A), else MINISBLACK.
+        compress, predictor, description, software, extratags, maxworkers
+            See TiffWriter.save. The description, software, and extratags
+            are written to the full resolution page only.
+        resolution : (float, float[, str]) or ((int, int), (int, int)[, str])
+            X and Y resolutions of the full resolution image. See
+            TiffWriter.save. Resolutions of reduced levels are scaled.
+
+        >>> data = numpy.random.randint(0, 255, (301, 219, 3), 'uint8')
+        >>> with TiffWriter('temp.tif') as tif:
+        ...     tif.save_pyramid(data, tile=(64, 64), compress=6)
+        >>> with TiffFile('temp.tif') as tif:
+        ...     [level.shape for level in tif.series[0].levels]
+        [(301, 219, 3), (151, 110, 3), (76, 55, 3), (38, 28, 3)]
+
+        """
+        if self._imagej:
+            raise ValueError('ImageJ does not support pyramids')
+        byteorder = self._byteorder
+
+        if isinstance(data, numpy.ndarray):
+            shape = data.shape
+            dtype = data.dtype
+        elif shape is None or dtype is None:
+            raise ValueError('shape and dtype required for tile iterator')
+        shape = tuple(int(i) for i in shape)
+        if len(shape) == 2:
+            shape += (1,)
+        if len(shape) != 3 or 0 in shape:
+            raise ValueError('invalid image shape %s' % str(shape))
+        samplesperpixel = shape[2]
+        dtype = numpy.dtype(dtype).newbyteorder(byteorder)
+        if dtype.char not in 'BHILQbhilqefd':
+            raise ValueError('cannot write pyramid of %s' % dtype)
+
+        tile = tuple(int(i) for i in tile)
+        if len(tile) != 2 or tile[0] % 16 or tile[1] % 16 or 0 in tile:
+            raise ValueError('invalid tile shape')
+        tilelength, tilewidth = tile
+
+        if photometric is None:
+            if samplesperpixel in (3, 4):
+                photometric = TIFF.PHOTOMETRIC.RGB
+            else:
+                photometric = TIFF.PHOTOMETRIC.MINISBLACK
+        else:
+            photometric = enumarg(TIFF.PHOTOMETRIC, photometric)
+        if photometric == TIFF.PHOTOMETRIC.RGB:
+            if samplesperpixel < 3:
+                raise ValueError('not a RGB(A) image')
+            extrasamples = (2,) if samplesperpixel == 4 else (
+                (0,) * (samplesperpixel - 3))
+        elif photometric in (TIFF.PHOTOMETRIC.MINISBLACK,
+                             TIFF.PHOTOMETRIC.MINISWHITE):
+            extrasamples = (0,) * (samplesperpixel - 1)
+        else:
+            raise ValueError('cannot write pyramid of %s' % photometric)
+
+        # image shapes of all levels
+        levelshapes = [shape[:2]]
+        while (
+            (levels is None and (levelshapes[-1][0] > tilelength
+                                 or levelshapes[-1][1] > tilewidth))
+            or (levels is not None and len(levelshapes) < levels)
+        ):
+            length, width = levelshapes[-1]
+            if length == 1 and width == 1:
+                break
+            levelshapes.append(((length + 1) // 2, (width + 1) // 2))
+
+        # compress function
+        if not compress:
+            compresstag = 1
+        else:
+            if isinstance(compress, (tuple, list)):
+                compress, compresslevel = compress
+            elif isinstance(compress, int):
+                compress, compresslevel = 'ADOBE_DEFLATE', int(compress)
+                if not 0 <= compresslevel <= 9:
+                    raise ValueError('invalid compression level %s' % compress)
+            else:
+                compresslevel = None
+            compresstag = enumarg(TIFF.COMPRESSION, compress.upper())
+            compressor = TIFF.COMPESSORS[compresstag]
+        if predictor and compresstag not in (1, 7):
+            predictortag = 3 if dtype.kind == 'f' else 2
+            predictor = TIFF.PREDICTORS[predictortag]
+        else:
+            predictortag = 1
+            predictor = False
+
+        def encode(chunk):
+            if predictor:
+                chunk = predictor(chunk, axis=-2)
+            if compresstag == 1:
+                return chunk.tobytes()
+            return compressor(chunk, compresslevel)
+
+        if maxworkers is None or maxworkers < 1:
+            import multiprocessing
+            maxworkers = max(multiprocessing.cpu_count() // 2, 1)
+        if compresstag == 1:
+            maxworkers = 1
+
+        # finish pending contiguous pages before writing pyramid
+        self._write_remaining_pages()
+        self._write_image_description()
+        self._truncate = False
+        self._descriptionoffset = 0
+        self._descriptionlenoffset = 0
+        self._datashape = None
+        self._colormap = None
+
+        fh = self._fh
+        fh.seek(0, 2)
+        offsets = [[] for _ in levelshapes]
+        bytecounts = [[] for _ in levelshapes]
+        # rows of tiles of previous level that are not yet reduced
+        pending = [None] + [
+            numpy.empty((2 * tilelength, levelshapes[i - 1][1],
+                         samplesperpixel), dtype)
+            for i in range(1, len(levelshapes))
+        ]
+        pendingrows = [0] * len(levelshapes)
+
+        def write_tiles(level, rows, executor):
+            # write one row of tiles of level and reduce it to next level
+            length, width = rows.shape[:2]
+            tiles = (
+                (length + tilelength - 1) // tilelength,
+                (width + tilewidth - 1) // tilewidth,
+            )
+            segments = iter_tiles(rows.reshape((1, 1) + rows.shape), tile,
+                                  tiles)
+            for segment in encode_segments(segments, encode, executor,
+                                           maxworkers * 4):
+                offsets[level].append(fh.tell())
+                bytecounts[level].append(len(segment))
+                fh.write(segment)
+            level += 1
+            if level < len(levelshapes):
+                reduce_rows(level, rows, executor)
+
+        def reduce_rows(level, rows, executor):
+            # append rows of previous level to pending rows of level
+            buffer = pending[level]
+            start = pendingrows[level]
+            buffer[start: start + rows.shape[0]] = rows
+            pendingrows[level] += rows.shape[0]
+            if pendingrows[level] == buffer.shape[0]:
+                flush_rows(level, executor)
+
+        def flush_rows(level, executor):
+            # reduce pending rows and write them as row of tiles of level
+            if pendingrows[level] == 0:
+                return
+            rows = pending[level][:pendingrows[level]]
+            pendingrows[level] = 0
+            write_tiles(level, downsample2(rows, downsample), executor)
+
+        def tile_rows(data):
+            # return iterator over rows of tiles of full resolution image
+            length, width = levelshapes[0]
+            rows = numpy.empty((tilelength, width, samplesperpixel), dtype)
+            y = 0
+            x = 0
+            for chunk in data:
+                chunk = numpy.asarray(chunk)
+                chunk = chunk.reshape(chunk.shape[:2] + (samplesperpixel,))
+                h = min(tilelength, length - y)
+                w = min(tilewidth, width - x)
+                if chunk.shape[0] < h or chunk.shape[1] < w:
+                    raise ValueError('invalid tile shape %s'
+                                     % str(chunk.shape))
+                rows[:h, x: x + w] = chunk[:h, :w]
+                x += tilewidth
+                if x >= width:
+                    yield rows[:h]
+                    x = 0
+                    y += tilelength
+                    if y >= length:
+                        break
+            if y < length:
+                raise ValueError('tile iterator exhausted at row %i of %i'
+                                 % (y, length))
+
+        if isinstance(data, numpy.ndarray):
+            data = numpy.asarray(data, dtype).reshape(shape)
+            rowiter = (data[y: y + tilelength]
+                       for y in range(0, shape[0], tilelength))
+        else:
+            rowiter = tile_rows(data)
+
+        executor = ThreadPoolExecutor(maxworkers) if maxworkers > 1 else None
+        try:
+            for rows in rowiter:
+                write_tiles(0, rows, executor)
+            for level in range(1, len(levelshapes)):
+                flush_rows(level, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # tile offsets and bytecounts take most space of IFDs
+        ifdsize = sum(len(o) for o in offsets) * 8 + len(levelshapes) * 1024
+        if not self._bigtiff and fh.tell() + ifdsize > 2**32 - 1:
+            raise ValueError('data too large for standard TIFF file')
+
+        def rational(arg, scale):
+            # return nominator and denominator of arg / scale
+            from fractions import Fraction  # delayed import
+            try:
+                f = Fraction.from_float(arg)
+            except TypeError:
+                f = Fraction(arg[0], arg[1])
+            f = (f / scale).limit_denominator(1000000)
+            return f.numerator, f.denominator
+
+        # write IFDs of reduced levels, then IFD of full resolution image
+        offsettype = self._offsetformat
+        sampleformat = {'u': 1, 'i': 2, 'f': 3}[dtype.kind]
+        if resolution is not None:
+            unit = resolution[2] if len(resolution) > 2 else 'INCH'
+            unit = 1 if unit is None else enumarg(TIFF.RESUNIT, unit)
+        subifds = []
+        for level in range(len(levelshapes) - 1, -1, -1):
+            length, width = levelshapes[level]
+            tags = [
+                (254, 'I', 1, 1 if level else 0),
+                (256, 'I', 1, width),
+                (257, 'I', 1, length),
+                (258, 'H', samplesperpixel,
+                 (dtype.itemsize * 8,) * samplesperpixel),
+                (259, 'H', 1, compresstag),
+                (262, 'H', 1, int(photometric)),
+                (277, 'H', 1, samplesperpixel),
+                (322, 'I', 1, tilewidth),
+                (323, 'I', 1, tilelength),
+                (324, offsettype, len(offsets[level]), offsets[level]),
+                (325, offsettype, len(bytecounts[level]), bytecounts[level]),
+            ]
+            if samplesperpixel > 1:
+                tags.append((284, 'H', 1, 1))
+            if predictortag > 1:
+                tags.append((317, 'H', 1, predictortag))
+            if extrasamples:
+                tags.append((338, 'H', len(extrasamples), extrasamples))
+            if sampleformat > 1:
+                tags.append((339, 'H', samplesperpixel,
+                             (sampleformat,) * samplesperpixel))
+            if resolution is not None:
+                scale = 2**level
+                tags.append((282, '2I', 1, rational(resolution[0], scale)))
+                tags.append((283, '2I', 1, rational(resolution[1], scale)))
+                tags.append((296, 'H', 1, unit))
+            if level:
+                subifds.insert(0, self._write_ifd(tags)[0])
+                continue
+            if description:
+                tags.append((270, 's', 0, description))
+            if software:
+                tags.append((305, 's', 0, software))
+            if subifds:
+                tags.append((330, offsettype, len(subifds), subifds))
+            tags.extend(t[:4] for t in extratags)
+            ifdpos, nextifdoffset = self._write_ifd(tags)
+
+        # append full resolution page to main IFD chain
+        pos = fh.tell()
+        fh.seek(self._ifdoffset)
+        fh.write(struct.pack(byteorder + self._offsetformat, ifdpos))
+        fh.flush()
+        fh.seek(pos)
+        self._ifdoffset = nextifdoffset
+
+    def _write_ifd(self, tags):
+        """Write IFD at end of file.
+
+        Return offsets of IFD and of its pointer to next IFD in file.
+        Tags are (code, dtype, count, value) tuples as in TiffWriter.save
+        extratags. The pointer to the next IFD is zero.
+
+        """
+        fh = self._fh
+        byteorder = self._byteorder
+        offsetformat = byteorder + self._offsetformat
+        offsetsize = self._offsetsize
+
+        fh.seek(0, 2)
+        ifdpos = fh.tell()
+        if ifdpos % 2:
+            # location of IFD must begin on a word boundary
+            fh.write(b'\0')
+            ifdpos += 1
+        tags = sorted(tags, key=lambda x: int(x[0]))
+        ifd = [struct.pack(byteorder + self._tagnoformat, len(tags))]
+        nextifdoffset = (ifdpos + len(ifd[0]) + len(tags) * self._tagsize)
+        valuepos = nextifdoffset + offsetsize
+        values = []
+        for code, dtype, count, value in tags:
+            if dtype == 's':
+                value = bytestr(value, 'ascii') + b'\0'
+                count = len(value)
+            elif isinstance(value, bytes):
+                # packed binary data
+                count = len(value) // struct.calcsize(dtype)
+            else:
+                value = tuple(numpy.asarray(value).flat)
+                value = struct.pack(
+                    '%s%i%s' % (byteorder, len(value), dtype[-1]), *value)
+            ifd.append(struct.pack(byteorder + 'HH', int(code),
+                                   TIFF.DATA_DTYPES[dtype]))
+            ifd.append(struct.pack(offsetformat, count))
+            if len(value) <= offsetsize:
+                ifd.append(value.ljust(offsetsize, b'\0'))
+            else:
+                if valuepos % 2:
+                    # tag value is expected to begin on word boundary
+                    values.append(b'\0')
+                    valuepos += 1
+                ifd.append(struct.pack(offsetformat, valuepos))
+                values.append(value)
+                valuepos += len(value)
+        ifd.append(struct.pack(offsetformat, 0))
+        fh.write(b''.join(ifd + values))
+        return ifdpos, nextifdoffset
+
     def _write_remaining_pages(self):
         """Write outstanding IFDs and tags to file."""
         if not self._tags or self._truncate:
@@ -2184,7 +2540,8 @@ class TiffFile(object):
     """
 
     def __init__(self, arg, name=None, offset=None, size=None,
-                 multifile=True, _useframes=None, **kwargs):
+                 multifile=True, indexcache=None, maxgap=None, usemmap=False,
+                 pagecache=None, _useframes=None, **kwargs):
         """Initialize instance from file.
 
         Parameters
@@ -2203,6 +2560,25 @@ class TiffFile(object):
         multifile : bool
             If True (default), series may include pages from multiple files.
             Currently applies to OME-TIFF only.
+        indexcache : str
+            Optional directory of IFD index sidecar files.
+            If the directory holds an index for this file, matched by file
+            size, modification time, and offset of the first IFD, the page
+            offsets are taken from it instead of walking the IFD chain.
+            The index is (re)written on close if more pages were located.
+        maxgap : int
+            Maximum number of unused bytes between strips or tiles that are
+            read from file in one operation. By default, FileHandle.MAXGAP.
+            If negative, every strip or tile is read separately.
+        usemmap : bool
+            If True, strips and tiles are sliced from a read-only memory-map
+            of the file instead of being read, if the file can be mapped.
+        pagecache : bool or int
+            If True, all TiffPages and TiffFrames read are kept in memory.
+            If an int, at most that many are kept, and the least recently
+            used ones are released. By default, pages are cached only where
+            series require it. OME and LSM files cache all pages regardless.
+            See TiffPages.cache.
         kwargs : bool
             'is_ome': If False, disable processing of OME-XML metadata.
 
@@ -2226,9 +2602,13 @@ class TiffFile(object):
                     raise TypeError('unexpected keyword argument: %s' % key)
 
         fh = FileHandle(arg, mode='rb', name=name, offset=offset, size=size)
+        if maxgap is not None:
+            fh.maxgap = maxgap
+        fh.usemmap = usemmap
         self._fh = fh
         self._multifile = bool(multifile)
         self._files = {fh.name: self}  # cache of TiffFiles
+        self._indexcache = indexcache
         try:
             fh.seek(0)
             header = fh.read(4)
@@ -2273,8 +2653,13 @@ class TiffFile(object):
                 not self.is_bigtiff and self.filehandle.size >= 2**31
             ):
                 self.pages._load_virtual_frames()
-            elif _useframes:
-                self.pages.useframes = True
+            else:
+                if indexcache is not None:
+                    self._read_index()
+                if pagecache is not None:
+                    self.pages.cache = pagecache
+                if _useframes:
+                    self.pages.useframes = True
 
         except Exception:
             fh.close()
@@ -2308,10 +2693,77 @@ class TiffFile(object):
 
     def close(self):
         """Close open file handle(s)."""
+        if self._indexcache is not None and not self._fh.closed:
+            self._write_index()
+            self._indexcache = None
         for tif in self._files.values():
             tif.filehandle.close()
         self._files = {}
 
+    def _index_key(self):
+        """Return path of IFD index sidecar file and values it must match.
+
+        Return (None, None) if the file cannot be identified.
+
+        """
+        fstat = self.fstat
+        pages = self.pages.pages
+        if fstat is None or not pages or not self._fh.dirname:
+            return None, None
+        page0 = pages[0]
+        key = {
+            'size': self._fh.size,
+            'mtime_ns': fstat.st_mtime_ns,
+            'firstifd': page0 if isinstance(page0, inttypes) else page0.offset,
+            'tiff': [self.tiff.version, self.tiff.byteorder,
+                     self.tiff.offsetsize],
+        }
+        name = '%s@%i' % (self._fh.path, self._fh._offset)
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return os.path.join(self._indexcache, digest + '.ifdindex.json'), key
+
+    def _read_index(self):
+        """Set page offsets and signatures from IFD index sidecar file."""
+        pages = self.pages
+        pages._signatures = {}
+        filename, key = self._index_key()
+        if filename is None:
+            return
+        try:
+            with open(filename, 'r') as fh:
+                index = json.load(fh)
+        except FileNotFoundError:
+            index = None
+        except Exception as exc:
+            log_warning('TiffFile: failed to read IFD index %s: %s',
+                        filename, str(exc))
+            index = None
+        if index is not None and all(index.get(k) == v
+                                     for k, v in key.items()):
+            pages._set_index(index)
+        pages._indexstate = pages._index_state()
+
+    def _write_index(self):
+        """Write IFD index sidecar file if more pages were located."""
+        pages = self.pages
+        if pages._signatures is None or (
+                pages._index_state() == pages._indexstate):
+            return
+        filename, key = self._index_key()
+        if filename is None:
+            return
+        index = pages._get_index()
+        index.update(key)
+        try:
+            os.makedirs(self._indexcache, exist_ok=True)
+            tmpname = '%s.%i.tmp' % (filename, os.getpid())
+            with open(tmpname, 'w') as fh:
+                json.dump(index, fh, separators=(',', ':'))
+            os.replace(tmpname, filename)
+        except Exception as exc:
+            log_warning('TiffFile: failed to write IFD index %s: %s',
+                        filename, str(exc))
+
     def asarray(self, key=None, series=None, out=None, validate=True,
                 maxworkers=None):
         """Return image data from selected TIFF page(s) as numpy array.
@@ -3258,8 +3710,13 @@ class TiffFile(object):
             useframes = pages.useframes
             pages.useframes = False
             h = page.hash
+            signature = pages.signature(0)
             for i in (1, 7, -1):
-                if pages[i].aspage().hash != h:
+                known = pages.signature(i)
+                if known is not None:
+                    if known != signature:
+                        return False
+                elif pages[i].aspage().hash != h:
                     return False
         except IndexError:
             return False
@@ -3506,6 +3963,29 @@ class TiffFile(object):
         return self.pages[0].geotiff_tags
 
 
+def page_signature(page):
+    """Return tuple of integers identifying pages in same series.
+
+    Unlike TiffPage.hash, the signature is stable across processes and is
+    stored in IFD index sidecar files.
+
+    """
+    extrasamples = page.extrasamples
+    if not isinstance(extrasamples, tuple):
+        extrasamples = (extrasamples,)
+    return tuple(int(i) for i in page._shape + (
+        page.tilewidth,
+        page.tilelength,
+        page.tiledepth,
+        page.bitspersample,
+        page.fillorder,
+        page.predictor,
+        page.photometric,
+        page.compression,
+        page.planarconfig,
+    ) + extrasamples)
+
+
 class TiffPages(object):
     """Sequence of TIFF image file directories (IFD chain).
 
@@ -3529,7 +4009,11 @@ class TiffPages(object):
         self._tiffpage = TiffPage  # class used for reading pages
         self._keyframe = None  # current page that is used as keyframe
         self._cache = False  # do not cache frames or pages (if not keyframe)
+        self._cachesize = None  # maximum number of cached pages, if bounded
+        self._lru = collections.OrderedDict()  # cached page indices by use
         self._nextpageoffset = None
+        self._signatures = None  # page signatures, if tracked for IFD index
+        self._indexstate = None  # IFD index state when read from sidecar
 
         if isinstance(parent, TiffFile):
             # read offset to first page from current file position
@@ -3570,16 +4054,42 @@ class TiffPages(object):
 
     @property
     def cache(self):
-        """Return if pages/frames are currently being cached."""
+        """Return if pages/frames are currently being cached.
+
+        Return the maximum number of cached pages/frames if it is bounded.
+
+        """
+        if self._cache and self._cachesize:
+            return self._cachesize
         return self._cache
 
     @cache.setter
     def cache(self, value):
-        """Enable or disable caching of pages/frames. Clear cache if False."""
+        """Enable or disable caching of pages/frames. Clear cache if False.
+
+        If value is an int (not bool), at most that many pages/frames besides
+        the first page are cached, and the least recently used are evicted.
+
+        """
+        cachesize = None
+        if not isinstance(value, bool) and isinstance(value, inttypes):
+            cachesize = value if value > 0 else None
         value = bool(value)
         if self._cache and not value:
             self._clear()
         self._cache = value
+        self._cachesize = cachesize
+        if cachesize:
+            # track pages already in cache, then evict the excess
+            pages = self.pages
+            self._lru = collections.OrderedDict(
+                (i, None) for i in range(1, len(pages))
+                if not isinstance(pages[i], inttypes)
+            )
+            self._cached = False
+            self._evict()
+        else:
+            self._lru.clear()
 
     @property
     def useframes(self):
@@ -3624,6 +4134,55 @@ class TiffPages(object):
             self._tiffpage = tiffpage
         # always cache keyframes
         self.pages[index] = self._keyframe
+        if self._cachesize:
+            self._cache_add(index)
+
+    def signature(self, index):
+        """Return signature of page at index if known from IFD index, else None.
+
+        Pages with the same signature have the same hash.
+
+        """
+        if self._signatures is None:
+            return None
+        if index < 0:
+            index %= len(self)
+        signature = self._signatures.get(index)
+        if signature is None and index == 0:
+            signature = self._signatures[0] = page_signature(self.pages[0])
+        return signature
+
+    def _index_state(self):
+        """Return what an IFD index would record about located pages."""
+        return len(self.pages), self._indexed, len(self._signatures)
+
+    def _get_index(self):
+        """Return IFD index of located pages as JSON serializable dict."""
+        if 0 not in self._signatures:
+            self._signatures[0] = page_signature(self.pages[0])
+        return {
+            'version': 1,
+            'complete': bool(self._indexed),
+            'nextpageoffset': self._nextpageoffset,
+            'offsets': [page if isinstance(page, inttypes) else page.offset
+                        for page in self.pages],
+            'signatures': {str(index): list(signature)
+                           for index, signature in self._signatures.items()},
+        }
+
+    def _set_index(self, index):
+        """Set page offsets and signatures from IFD index."""
+        if index.get('version') != 1:
+            return
+        offsets = index['offsets']
+        pages = self.pages
+        if len(offsets) > len(pages):
+            pages.extend(offsets[len(pages):])
+        self._signatures.update((int(i), tuple(signature)) for i, signature
+                                in index['signatures'].items())
+        if index['complete']:
+            self._indexed = True
+            self._nextpageoffset = index['nextpageoffset']
 
     @property
     def next_page_offset(self):
@@ -3641,7 +4200,8 @@ class TiffPages(object):
             return
         if not self._indexed:
             self._seek(-1)
-        if not self._cache:
+        if not self._cache or self._cachesize:
+            # pages of a bounded cache are read on access
             return
         fh = self.parent.filehandle
         if keyframe is not None:
@@ -3712,8 +4272,38 @@ class TiffPages(object):
             for i, page in enumerate(pages):
                 if isinstance(page, TiffFrame) and page.offset is not None:
                     pages[i] = page.offset
+        self._lru = collections.OrderedDict(
+            (i, None) for i in self._lru if not isinstance(pages[i], inttypes)
+        )
         self._cached = False
 
+    def _cache_add(self, index):
+        """Mark page at index as most recently used and evict excess pages."""
+        if index == 0:
+            return
+        self._lru[index] = None
+        self._lru.move_to_end(index)
+        self._evict()
+
+    def _evict(self):
+        """Replace least recently used pages in bounded cache with offsets."""
+        pages = self.pages
+        lru = self._lru
+        keep = []
+        while len(lru) > self._cachesize:
+            index = lru.popitem(last=False)[0]
+            page = pages[index]
+            if isinstance(page, inttypes):
+                continue
+            if page is self._keyframe or page.offset is None:
+                # current keyframe and virtual frames stay in cache
+                keep.append(index)
+                continue
+            pages[index] = page.offset
+        for index in keep:
+            lru[index] = None
+            lru.move_to_end(index, last=False)
+
     def _seek(self, index, maxpages=None):
         """Seek file to offset of page specified by index."""
         pages = self.pages
@@ -3856,6 +4446,8 @@ class TiffPages(object):
                 if not isinstance(page, inttypes):
                     if validate and validate != page.hash:
                         raise RuntimeError('page hash mismatch')
+                    if self._cachesize and key in self._lru:
+                        self._lru.move_to_end(key)
                     return page
             elif isinstance(page, (TiffPage, self._tiffpage)):
                 if validate and validate != page.hash:
@@ -3864,10 +4456,14 @@ class TiffPages(object):
 
         self._seek(key)
         page = self._tiffpage(self.parent, index=key, keyframe=self._keyframe)
+        if self._signatures is not None and isinstance(page, TiffPage):
+            self._signatures[key] = page_signature(page)
         if validate and validate != page.hash:
             raise RuntimeError('page hash mismatch')
         if self._cache:
             pages[key] = page
+            if self._cachesize:
+                self._cache_add(key)
         return page
 
     def __getitem__(self, key):
@@ -3900,7 +4496,7 @@ class TiffPages(object):
                 i += 1
             except IndexError:
                 break
-        if self._cache:
+        if self._cache and not self._cachesize:
             self._cached = True
 
     def __bool__(self):
@@ -3951,6 +4547,13 @@ class TiffPage(object):
 
     """
 
+    # attributes set for every page are stored in slots; the dictionary
+    # per instance holds attributes from tags and those computed on access
+    __slots__ = (
+        'parent', 'index', 'offset', 'shape', '_shape', 'dtype', '_dtype',
+        'axes', 'tags', 'dataoffsets', 'databytecounts', '__dict__',
+    )
+
     # default properties; will be updated from tags
     subfiletype = 0
     imagewidth = 0
@@ -4425,81 +5028,7 @@ class TiffPage(object):
             # decompress, unpack,... individual strips or tiles
             result = create_output(out, shape, dtype)
 
-            decompress = TIFF.DECOMPESSORS[self.compression]
-
-            if self.compression in (6, 7):  # COMPRESSION.JPEG
-                colorspace = None
-                outcolorspace = None
-                jpegtables = None
-                if lsb2msb:
-                    log_warning('TiffPage %i: disabling LSB2MSB for JPEG',
-                                self.index)
-                    lsb2msb = False
-                if 'JPEGTables' in tags:
-                    # load JPEGTables from TiffFrame
-                    jpegtables = self_._gettags({347}, lock=lock)[0][1].value
-                # TODO: obtain table from OJPEG tags
-                # elif ('JPEGInterchangeFormat' in tags and
-                #       'JPEGInterchangeFormatLength' in tags and
-                #       tags['JPEGInterchangeFormat'].value != offsets[0]):
-                #     fh.seek(tags['JPEGInterchangeFormat'].value)
-                #     fh.read(tags['JPEGInterchangeFormatLength'].value)
-                if 'ExtraSamples' in tags:
-                    pass
-                elif self.photometric == 6:
-                    # YCBCR -> RGB
-                    outcolorspace = 'RGB'
-                elif self.photometric == 2:
-                    if self.planarconfig == 1:
-                        colorspace = outcolorspace = 'RGB'
-                else:
-                    outcolorspace = TIFF.PHOTOMETRIC(self.photometric).name
-                if istiled:
-                    heightwidth = tilelength, tilewidth
-                else:
-                    heightwidth = imagelength, imagewidth
-
-                def decompress(data, bitspersample=bitspersample,
-                               jpegtables=jpegtables, colorspace=colorspace,
-                               outcolorspace=outcolorspace, shape=heightwidth,
-                               out=None, _decompress=decompress):
-                    return _decompress(data, bitspersample, jpegtables,
-                                       colorspace, outcolorspace, shape, out)
-
-                def unpack(data):
-                    return data.reshape(-1)
-
-            elif bitspersample in (8, 16, 32, 64, 128):
-                if (bitspersample * runlen) % 8:
-                    raise ValueError(
-                        'TiffPage %i: data and sample size mismatch'
-                        % self.index)
-                if self.predictor == 3:  # PREDICTOR.FLOATINGPOINT
-                    # the floating-point horizontal differencing decoder
-                    # needs the raw byte order
-                    typecode = dtype.char
-
-                def unpack(data, typecode=typecode, out=None):
-                    try:
-                        # read only numpy array
-                        return numpy.frombuffer(data, typecode)
-                    except ValueError:
-                        # strips may be missing EOI
-                        # log_warning('TiffPage.asarray: ...')
-                        bps = bitspersample // 8
-                        xlen = (len(data) // bps) * bps
-                        return numpy.frombuffer(data[:xlen], typecode)
-
-            elif isinstance(bitspersample, tuple):
-
-                def unpack(data, out=None):
-                    return unpack_rgb(data, typecode, bitspersample)
-
-            else:
-
-                def unpack(data, out=None):
-                    return packints_decode(data, typecode, bitspersample,
-                                           runlen)
+            decompress, unpack, lsb2msb = TiffPage._decoders(self_, lock)
 
             # TODO: store decode function for future use
             # TODO: unify tile and strip decoding
@@ -4572,6 +5101,332 @@ class TiffPage(object):
             fh.close()
         return result
 
+    def segments(self, y0=0, y1=None, x0=0, x1=None, lock=None,
+                 reopen=True, maxworkers=None, buffersize=None):
+        """Return iterator over decoded strips or tiles of image data.
+
+        Only the strips or tiles intersecting rows y0:y1 and columns x0:x1
+        of the image are read and decoded. Contiguous, uncompressed data
+        are read in blocks of whole rows instead.
+
+        Parameters
+        ----------
+        y0, y1, x0, x1 : int
+            Region of the image. By default, the whole image.
+        lock : {RLock, NullContext}
+            A reentrant lock used to synchronize seeks and reads from file.
+            If None (default), the lock of the parent's filehandle is used.
+        reopen : bool
+            If True (default) and the parent file handle is closed, the file
+            is temporarily re-opened and closed when the iterator is done.
+        maxworkers : int or None
+            Maximum number of threads to concurrently decode compressed
+            segments. See TiffPage.asarray.
+        buffersize : int
+            Approximate number of decoded bytes to hold at once.
+            Default: 64 MB.
+
+        Yields
+        ------
+        indices : tuple of int
+            Position of the first pixel of the segment in the normalized
+            6D '_shape' array of the page: (plane, planar sample, depth,
+            length, width).
+        segment : numpy.ndarray
+            Decoded 4D segment of shape (depth, length, width, samples),
+            clipped to the image. Missing segments are skipped.
+
+        """
+        self_ = self
+        self = self.keyframe  # self or keyframe
+
+        shape = self._shape
+        if not shape or product(shape) == 0:
+            return
+        if self.compression not in TIFF.DECOMPESSORS:
+            raise ValueError('TiffPage %i: cannot decompress %s'
+                             % (self.index, self.compression.name))
+        imagelength = self.imagelength
+        imagewidth = self.imagewidth
+        y1 = imagelength if y1 is None else min(y1, imagelength)
+        x1 = imagewidth if x1 is None else min(x1, imagewidth)
+        y0 = max(y0, 0)
+        x0 = max(x0, 0)
+        if y1 <= y0 or x1 <= x0:
+            return
+        if buffersize is None:
+            buffersize = 2**26  # 64 MB
+
+        fh = self_.parent.filehandle
+        lock = fh.lock if lock is None else lock
+        with lock:
+            closed = fh.closed
+            if closed:
+                if reopen:
+                    fh.open()
+                else:
+                    raise IOError('TiffPage %i: file handle is closed'
+                                  % self.index)
+        try:
+            offsets, bytecounts = self_._offsetscounts
+            itemsize = self.dtype.itemsize
+            unpredict = TIFF.UNPREDICTORS[self.predictor]
+
+            if self.is_contiguous:
+                # read blocks of whole rows
+                typecode = self.parent.tiff.byteorder + self._dtype.char
+                rowsize = imagewidth * shape[5]
+                rows = max(1, min(y1 - y0, buffersize // (rowsize * itemsize)))
+                for plane, sample, depth in numpy.ndindex(*shape[:3]):
+                    image = (plane * shape[1] + sample) * shape[2] + depth
+                    for y in range(y0, y1, rows):
+                        n = min(rows, y1 - y)
+                        with lock:
+                            fh.seek(offsets[0] + (image * imagelength + y)
+                                    * rowsize * itemsize)
+                            segment = fh.read_array(typecode, n * rowsize)
+                        if self.fillorder == 2:
+                            bitorder_decode(segment, out=segment)
+                        segment.shape = 1, n, imagewidth, shape[5]
+                        if self.predictor != 1:
+                            segment = unpredict(segment, axis=-2, out=segment)
+                        yield (plane, sample, depth, y, 0), segment
+                return
+
+            decode = TiffPage._segment_decoder(self_, lock)
+            segmentshape, gridshape = self._segmentgrid
+            segmentsize = product(segmentshape) * itemsize
+            indices = [
+                (((plane * shape[1] + sample) * gridshape[0] + depth)
+                 * gridshape[1] + length) * gridshape[2] + width
+                for plane in range(shape[0])
+                for sample in range(shape[1])
+                for depth in range(gridshape[0])
+                for length in range(y0 // segmentshape[1],
+                                    (y1 - 1) // segmentshape[1] + 1)
+                for width in range(x0 // segmentshape[2],
+                                   (x1 - 1) // segmentshape[2] + 1)
+            ]
+            indices = [i for i in indices if i < len(offsets)]
+            if self.compression == 1 or len(indices) < 3:
+                maxworkers = 1
+            elif maxworkers is None or maxworkers < 1:
+                import multiprocessing
+                maxworkers = max(multiprocessing.cpu_count() // 2, 1)
+            batchsize = max(maxworkers, buffersize // segmentsize)
+
+            executor = None
+            if maxworkers > 1:
+                executor = ThreadPoolExecutor(maxworkers)
+            try:
+                for i in range(0, len(indices), batchsize):
+                    batch = indices[i: i + batchsize]
+                    segments = fh.read_segments(
+                        [offsets[j] for j in batch],
+                        [bytecounts[j] for j in batch],
+                        lock)
+                    if executor is None:
+                        decoded = map(decode, segments, batch)
+                    else:
+                        decoded = executor.map(decode, list(segments), batch)
+                    for item in decoded:
+                        if item is not None:
+                            yield item
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+        finally:
+            if closed:
+                fh.close()
+
+    @lazyattr
+    def _segmentgrid(self):
+        """Return shape of strip or tile segments and of their grid.
+
+        Segments are 4D (depth, length, width, samples). The grid is the
+        number of segments along depth, length, and width of the image,
+        for each plane and planar sample.
+
+        """
+        shape = self._shape
+        if self.is_tiled:
+            segmentshape = (self.tiledepth, self.tilelength, self.tilewidth,
+                            shape[5])
+        else:
+            segmentshape = (1, min(self.rowsperstrip, self.imagelength),
+                            self.imagewidth, shape[5])
+        gridshape = tuple(
+            (i + j - 1) // j
+            for i, j in zip(shape[2:5], segmentshape[:3])
+        )
+        return segmentshape, gridshape
+
+    def _segment_decoder(self, lock=None):
+        """Return function to decode strip or tile segments.
+
+        The function takes the bytes and index of a segment and returns
+        the position of its first pixel in the normalized 6D '_shape' array
+        and the decoded 4D segment clipped to the image, or None if the
+        segment is missing. Can be called with a TiffFrame.
+
+        """
+        self_ = self
+        self = self.keyframe  # self or keyframe
+        shape = self._shape
+        imageshape = shape[2:5]
+        decompress, unpack, lsb2msb = TiffPage._decoders(self_, lock)
+        unpredict = TIFF.UNPREDICTORS[self.predictor]
+        segmentshape, gridshape = self._segmentgrid
+
+        if self.is_tiled:
+            tiledshape = gridshape
+
+            def decode(tile, tileindex):
+                if tile is None:
+                    return None
+                (pl, td, tl, tw), tile = tile_segment_decode(
+                    tile, tileindex, segmentshape, tiledshape, imageshape,
+                    lsb2msb, decompress, unpack, unpredict)
+                return (0, pl, td, tl, tw), tile
+
+            return decode
+
+        rowsperstrip = segmentshape[1]
+        stripsperimage = gridshape[1]
+        rowsize = segmentshape[2] * segmentshape[3]
+        outsize = rowsperstrip * rowsize * self.dtype.itemsize
+        predictor = self.predictor
+
+        def decode(strip, stripindex):
+            if strip is None:
+                return None
+            image, y = divmod(stripindex, stripsperimage)
+            y *= rowsperstrip
+            if lsb2msb:
+                strip = bitorder_decode(strip, out=strip)
+            strip = unpack(decompress(strip, out=outsize))
+            n = min(rowsperstrip, imageshape[1] - y)
+            if strip.size < n * rowsize:
+                # incomplete strip
+                t = numpy.zeros(n * rowsize, strip.dtype)
+                t[:strip.size] = strip
+                strip = t
+            strip = strip[:n * rowsize].reshape(1, n, segmentshape[2],
+                                                 segmentshape[3])
+            if predictor != 1:
+                strip = unpredict(strip, axis=-2, out=strip)
+            plane, sample, depth = numpy.unravel_index(
+                image, (shape[0], shape[1], imageshape[0]))
+            return (int(plane), int(sample), int(depth), y, 0), strip
+
+        return decode
+
+    def _decoders(self, lock=None):
+        """Return functions to decompress and unpack strips or tiles.
+
+        Also return if the bit order of segments must be reversed.
+        Can be called with a TiffFrame, whose keyframe is used.
+
+        """
+        self_ = self
+        self = self.keyframe  # self or keyframe
+        tags = self.tags
+        dtype = self._dtype
+        imagewidth = self.imagewidth
+        imagelength = self.imagelength
+        bitspersample = self.bitspersample
+        typecode = self.parent.tiff.byteorder + dtype.char
+        lsb2msb = self.fillorder == 2
+        istiled = self.is_tiled
+
+        if istiled:
+            tilewidth = self.tilewidth
+            tilelength = self.tilelength
+            runlen = tilewidth
+        else:
+            runlen = imagewidth
+
+        if self.planarconfig == 1:
+            runlen *= self.samplesperpixel
+
+        decompress = TIFF.DECOMPESSORS[self.compression]
+
+        if self.compression in (6, 7):  # COMPRESSION.JPEG
+            colorspace = None
+            outcolorspace = None
+            jpegtables = None
+            if lsb2msb:
+                log_warning('TiffPage %i: disabling LSB2MSB for JPEG',
+                            self.index)
+                lsb2msb = False
+            if 'JPEGTables' in tags:
+                # load JPEGTables from TiffFrame
+                jpegtables = self_._gettags({347}, lock=lock)[0][1].value
+            # TODO: obtain table from OJPEG tags
+            # elif ('JPEGInterchangeFormat' in tags and
+            #       'JPEGInterchangeFormatLength' in tags and
+            #       tags['JPEGInterchangeFormat'].value != offsets[0]):
+            #     fh.seek(tags['JPEGInterchangeFormat'].value)
+            #     fh.read(tags['JPEGInterchangeFormatLength'].value)
+            if 'ExtraSamples' in tags:
+                pass
+            elif self.photometric == 6:
+                # YCBCR -> RGB
+                outcolorspace = 'RGB'
+            elif self.photometric == 2:
+                if self.planarconfig == 1:
+                    colorspace = outcolorspace = 'RGB'
+            else:
+                outcolorspace = TIFF.PHOTOMETRIC(self.photometric).name
+            if istiled:
+                heightwidth = tilelength, tilewidth
+            else:
+                heightwidth = imagelength, imagewidth
+
+            def decompress(data, bitspersample=bitspersample,
+                           jpegtables=jpegtables, colorspace=colorspace,
+                           outcolorspace=outcolorspace, shape=heightwidth,
+                           out=None, _decompress=decompress):
+                return _decompress(data, bitspersample, jpegtables,
+                                   colorspace, outcolorspace, shape, out)
+
+            def unpack(data):
+                return data.reshape(-1)
+
+        elif bitspersample in (8, 16, 32, 64, 128):
+            if (bitspersample * runlen) % 8:
+                raise ValueError(
+                    'TiffPage %i: data and sample size mismatch'
+                    % self.index)
+            if self.predictor == 3:  # PREDICTOR.FLOATINGPOINT
+                # the floating-point horizontal differencing decoder
+                # needs the raw byte order
+                typecode = dtype.char
+
+            def unpack(data, typecode=typecode, out=None):
+                try:
+                    # read only numpy array
+                    return numpy.frombuffer(data, typecode)
+                except ValueError:
+                    # strips may be missing EOI
+                    # log_warning('TiffPage.asarray: ...')
+                    bps = bitspersample // 8
+                    xlen = (len(data) // bps) * bps
+                    return numpy.frombuffer(data[:xlen], typecode)
+
+        elif isinstance(bitspersample, tuple):
+
+            def unpack(data, out=None):
+                return unpack_rgb(data, typecode, bitspersample)
+
+        else:
+
+            def unpack(data, out=None):
+                return packints_decode(data, typecode, bitspersample,
+                                       runlen)
+
+        return decompress, unpack, lsb2msb
+
     def asrgb(self, uint8=False, alpha=None, colormap=None,
               dmin=None, dmax=None, **kwargs):
         """Return image data as RGB(A).
@@ -5370,6 +6225,12 @@ class TiffFrame(object):
         kwargs['validate'] = False
         return TiffPage.asrgb(self, *args, **kwargs)
 
+    def segments(self, *args, **kwargs):
+        """Return iterator over decoded strips or tiles of image data."""
+        if self._keyframe is None:
+            raise RuntimeError('TiffFrame %i: keyframe not set' % self.index)
+        return TiffPage.segments(self, *args, **kwargs)
+
     @property
     def keyframe(self):
         """Return keyframe."""
@@ -5478,6 +6339,7 @@ class TiffTag(object):
 
         self.valueoffset = tagoffset + offsetsize + 4
         code, type_ = unpack(tiff.tagformat1, tagheader[:4])
+        code = TIFF.TAG_CODES.get(code, code)
         count, value = unpack(tiff.tagformat2, tagheader[4:])
 
         try:
@@ -5638,6 +6500,50 @@ class TiffPageSeries(object):
             return result
         return None
 
+    def aszarr(self, level=None, maxworkers=None):
+        """Return image data from series as read-only Zarr store.
+
+        If level is None (default) and the series has reduced resolution
+        levels, the store is a multiscales group with one array per level.
+        Else the store is a single array of the specified level.
+        See ZarrTiffStore.
+
+        """
+        if level is None and len(self.levels) > 1:
+            return ZarrTiffStore(self.levels, maxworkers=maxworkers)
+        return ZarrTiffStore(self.levels[level or 0], maxworkers=maxworkers)
+
+    @lazyattr
+    def levels(self):
+        """Return series at decreasing resolution, starting with self.
+
+        Reduced resolution levels are the SubIFDs of the pages in series.
+
+        """
+        levels = [self]
+        pages = [None if page is None else page.aspage() if isinstance(
+            page, TiffFrame) else page for page in self]
+        page0 = next((page for page in pages if page is not None), None)
+        if page0 is None or not page0.pages:
+            return levels
+        pageshape = self.shape[:len(self.shape) - len(page0.shape)]
+        for level in range(len(page0.pages)):
+            try:
+                subpages = [None if page is None else page.pages[level]
+                            for page in pages]
+            except IndexError:
+                break
+            keyframe = subpages[pages.index(page0)]
+            if keyframe.axes != page0.axes or keyframe.dtype != self.dtype:
+                break
+            series = TiffPageSeries(
+                subpages, pageshape + keyframe.shape, self.dtype, self.axes,
+                parent=self.parent, name=self.name, kind=self.kind,
+                truncated=True)
+            series.index = self.index
+            levels.append(series)
+        return levels
+
     @lazyattr
     def offset(self):
         """Return offset to series data in file, if any."""
@@ -5735,6 +6641,293 @@ class TiffPageSeries(object):
         return 'TiffPageSeries %i  %s' % (self.index, s)
 
 
+class ZarrTiffStore(Mapping):
+    """Read-only Zarr store of image data in TIFF page series.
+
+    The store maps Zarr (version 2) keys to JSON encoded array metadata and
+    to chunks, which are the decoded strips or tiles of the pages in series. Chunks
+    are read from file and decoded only when requested, so that arrays
+    larger than memory can be accessed by libraries such as zarr or dask.
+    Missing chunks are absent from the store. The TiffFile must remain
+    open while the store is used. Zarr 2.11 and later require mappings to
+    be wrapped, as in zarr.open(zarr.storage.KVStore(store), mode='r').
+
+    >>> data = numpy.arange(3 * 64 * 48, dtype='uint16').reshape(3, 64, 48)
+    >>> imwrite('temp.tif', data, tile=(16, 16), photometric='minisblack')
+    >>> with TiffFile('temp.tif') as tif:
+    ...     store = tif.series[0].aszarr()
+    ...     chunk = store['1.2.0']
+    >>> json.loads(store['.zarray'])['chunks']
+    [1, 16, 16]
+    >>> numpy.array_equal(numpy.frombuffer(chunk, 'uint16').reshape(16, 16),
+    ...                   data[1, 32:48, :16])
+    True
+
+    """
+
+    def __init__(self, levels, maxworkers=None):
+        """Initialize store from TiffPageSeries.
+
+        Parameters
+        ----------
+        levels : TiffPageSeries or sequence of TiffPageSeries
+            A single series is stored as an array at the root of the store.
+            A sequence of series, for example the levels of a pyramid in
+            decreasing resolution, is stored as a multiscales group with
+            arrays '0', '1', etc.
+        maxworkers : int or None
+            Maximum number of threads to concurrently read and decode
+            chunks in getitems. If None (default), up to half the CPU cores
+            are used.
+
+        """
+        if isinstance(levels, TiffPageSeries):
+            levels = [levels]
+            self._group = False
+        else:
+            levels = list(levels)
+            self._group = True
+        if maxworkers is None or maxworkers < 1:
+            import multiprocessing
+            maxworkers = max(multiprocessing.cpu_count() // 2, 1)
+        self._maxworkers = maxworkers
+        self._levels = [self._level(series) for series in levels]
+        self._decoders = {}
+        self._lock = threading.Lock()
+        for level in self._levels:
+            for page in level['pages']:
+                if page is not None:
+                    fh = page.parent.filehandle
+                    if isinstance(fh.lock, NullContext):
+                        fh.lock = True  # chunks may be read concurrently
+        self._metadata = {}
+        if self._group:
+            series = levels[0]
+            self._metadata['.zgroup'] = {'zarr_format': 2}
+            self._metadata['.zattrs'] = {'multiscales': [{
+                'version': '0.1',
+                'name': series.name,
+                'datasets': [{'path': str(i)} for i in range(len(levels))],
+            }]}
+            for i, level in enumerate(self._levels):
+                self._metadata['%i/.zarray' % i] = level['zarray']
+                self._metadata['%i/.zattrs' % i] = level['zattrs']
+        else:
+            self._metadata['.zarray'] = self._levels[0]['zarray']
+            self._metadata['.zattrs'] = self._levels[0]['zattrs']
+        self._metadata = {
+            key: json.dumps(value).encode('utf-8')
+            for key, value in self._metadata.items()
+        }
+
+    @staticmethod
+    def _level(series):
+        """Return chunk layout of series."""
+        pages = list(series)
+        keyframe = next((page for page in pages if page is not None), None)
+        if keyframe is None:
+            raise ValueError('series contains no pages')
+        keyframe = keyframe.keyframe
+        shape = series.shape
+        pageshape = keyframe.shape
+        npagedims = len(shape) - len(pageshape)
+        if (
+            npagedims < 0
+            or shape[npagedims:] != pageshape
+            or product(shape[:npagedims]) != len(pages)
+        ):
+            raise ValueError('series shape %s does not match %i pages of '
+                             'shape %s' % (shape, len(pages), pageshape))
+        # dimensions of normalized 6D page shape present in page shape
+        normalized = keyframe._shape
+        keep = [i for i in range(6) if i in (3, 4) or normalized[i] != 1]
+        if tuple(normalized[i] for i in keep) != pageshape:
+            raise ValueError('page shape %s not supported' % str(pageshape))
+        segmentshape, gridshape = keyframe._segmentgrid
+        chunks = (1,) * npagedims + tuple(
+            ((1, 1) + segmentshape)[i] for i in keep)
+        dtype = keyframe.dtype
+        fillvalue = keyframe.nodata
+        return {
+            'pages': pages,
+            'keyframe': keyframe,
+            'pageshape': shape[:npagedims],
+            'keep': keep,
+            'segmentshape': segmentshape,
+            'gridshape': gridshape,
+            'zarray': {
+                'zarr_format': 2,
+                'shape': list(shape),
+                'chunks': list(chunks),
+                'dtype': dtype.str,
+                'compressor': None,
+                'fill_value': fillvalue.item() if hasattr(
+                    fillvalue, 'item') else fillvalue,
+                'order': 'C',
+                'filters': None,
+            },
+            'zattrs': {'_ARRAY_DIMENSIONS': list(series.axes)},
+        }
+
+    def _chunkkey(self, key):
+        """Return level and chunk indices of key, or None if not a chunk."""
+        if self._group:
+            level, _, key = key.partition('/')
+            try:
+                level = int(level)
+            except ValueError:
+                return None
+            if not 0 <= level < len(self._levels):
+                return None
+        else:
+            level = 0
+        try:
+            indices = tuple(int(i) for i in key.split('.'))
+        except ValueError:
+            return None
+        zarray = self._levels[level]['zarray']
+        chunks = zarray['chunks']
+        shape = zarray['shape']
+        if len(indices) != len(chunks) or not all(
+            0 <= i < (n + c - 1) // c
+            for i, n, c in zip(indices, shape, chunks)
+        ):
+            return None
+        return level, indices
+
+    def _segment(self, level, indices):
+        """Return page and index, offset, and bytecount of chunk's segment."""
+        level = self._levels[level]
+        npagedims = len(level['pageshape'])
+        if npagedims:
+            pageindex = numpy.ravel_multi_index(
+                indices[:npagedims], level['pageshape'])
+        else:
+            pageindex = 0
+        page = level['pages'][pageindex]
+        if page is None:
+            return None
+        index6 = [0] * 6
+        for i, j in zip(level['keep'], indices[npagedims:]):
+            index6[i] = j
+        plane, sample, depth, length, width, _ = index6
+        normalized = level['keyframe']._shape
+        gridshape = level['gridshape']
+        index = (((plane * normalized[1] + sample) * gridshape[0] + depth)
+                 * gridshape[1] + length) * gridshape[2] + width
+        if isinstance(page, TiffPage):
+            offsets, bytecounts = page.dataoffsets, page.databytecounts
+        else:
+            offsets, bytecounts = page._offsetscounts
+            if not bytecounts:
+                # contiguous keyframe
+                bytecounts = page.keyframe.databytecounts
+        if (
+            index >= len(offsets)
+            or index >= len(bytecounts)
+            or offsets[index] <= 0
+            or bytecounts[index] <= 0
+        ):
+            return None
+        return page, index, offsets[index], bytecounts[index]
+
+    def _decoder(self, page):
+        """Return segment decoder of page."""
+        keyframe = page.keyframe
+        key = id(page) if keyframe.compression in (6, 7) else id(keyframe)
+        with self._lock:
+            decode = self._decoders.get(key)
+            if decode is None:
+                decode = TiffPage._segment_decoder(
+                    page, page.parent.filehandle.lock)
+                if key == id(keyframe):
+                    self._decoders[key] = decode
+        return decode
+
+    def _chunk(self, level, indices):
+        """Return decoded chunk bytes or None if chunk is missing."""
+        segment = self._segment(level, indices)
+        if segment is None:
+            return None
+        page, index, offset, bytecount = segment
+        fh = page.parent.filehandle
+        data = next(fh.read_segments([offset], [bytecount], fh.lock))
+        _, data = self._decoder(page)(data, index)
+        level = self._levels[level]
+        chunk = numpy.empty(level['segmentshape'], level['keyframe'].dtype)
+        if data.shape != chunk.shape:
+            # segment at edge of image
+            chunk[:] = level['keyframe'].nodata
+        chunk[:data.shape[0], :data.shape[1], :data.shape[2]] = data
+        return chunk.tobytes()
+
+    def __getitem__(self, key):
+        """Return array metadata or decoded bytes of chunk."""
+        value = self._metadata.get(key)
+        if value is not None:
+            return value
+        chunkkey = self._chunkkey(key)
+        if chunkkey is not None:
+            value = self._chunk(*chunkkey)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def getitems(self, keys, **kwargs):
+        """Return dict of values of keys in store.
+
+        Chunks are read and decoded concurrently by up to maxworkers threads.
+        Keys not in store are omitted.
+
+        """
+        keys = list(keys)
+
+        def getitem(key):
+            try:
+                return key, self[key]
+            except KeyError:
+                return key, None
+
+        if self._maxworkers > 1 and len(keys) > 1:
+            with ThreadPoolExecutor(self._maxworkers) as executor:
+                items = list(executor.map(getitem, keys))
+        else:
+            items = [getitem(key) for key in keys]
+        return {key: value for key, value in items if value is not None}
+
+    def __contains__(self, key):
+        """Return if key is array metadata or chunk, without reading it."""
+        if key in self._metadata:
+            return True
+        chunkkey = self._chunkkey(key)
+        return chunkkey is not None and self._segment(*chunkkey) is not None
+
+    def __iter__(self):
+        """Return iterator over metadata and chunk keys."""
+        for key in self._metadata:
+            yield key
+        for i, level in enumerate(self._levels):
+            prefix = '%i/' % i if self._group else ''
+            zarray = level['zarray']
+            for indices in numpy.ndindex(*(
+                (n + c - 1) // c
+                for n, c in zip(zarray['shape'], zarray['chunks'])
+            )):
+                if self._segment(i, indices) is not None:
+                    yield prefix + '.'.join(str(j) for j in indices)
+
+    def __len__(self):
+        """Return number of keys in store."""
+        return sum(1 for _ in self)
+
+    def __str__(self):
+        """Return string with information about store."""
+        return 'ZarrTiffStore  %i levels  %s' % (
+            len(self._levels),
+            ', '.join('x'.join(str(i) for i in level['zarray']['shape'])
+                      for level in self._levels))
+
+
 class FileSequence(object):
     """Series of files containing array data of compatible shape and data type.
 
@@ -5991,13 +7184,21 @@ class FileHandle(object):
         Size of file in bytes.
     is_file : bool
         If True, file has a filno and can be memory-mapped.
+    maxgap : int
+        Maximum number of unused bytes between segments that read_segments
+        reads in one operation. Negative to read segments separately.
+    usemmap : bool
+        If True, read_segments slices segments from a memory-map of the file.
 
-    All attributes are read-only.
+    All attributes but lock, maxgap, and usemmap are read-only.
 
     """
 
     __slots__ = ('_fh', '_file', '_mode', '_name', '_dir', '_lock',
-                 '_offset', '_size', '_close', 'is_file')
+                 '_offset', '_size', '_close', 'is_file', '_mmap',
+                 'maxgap', 'usemmap')
+
+    MAXGAP = 2**16  # default maxgap
 
     def __init__(self, file, mode='rb', name=None, offset=None, size=None):
         """Initialize file handle from file name or another file handle.
@@ -6029,6 +7230,9 @@ class FileHandle(object):
         self._close = True
         self.is_file = False
         self._lock = NullContext()
+        self._mmap = None
+        self.maxgap = FileHandle.MAXGAP
+        self.usemmap = False
         self.open()
 
     def open(self):
@@ -6160,16 +7364,97 @@ class FileHandle(object):
 
         return result
 
-    def read_segments(self, offsets, bytecounts, lock=None, buffersize=None):
+    def read_segments(self, offsets, bytecounts, lock=None, buffersize=None,
+                      maxgap=None):
         """Return iterator over segments read from file.
 
         A reentrant lock can be used to synchronize seeks and reads up to
         buffersize bytes.
 
+        Segments are yielded in the order given, as bytes or memoryview,
+        or None if their offset or bytecount is zero. Segments that are
+        at most maxgap bytes apart in the file are read in one operation
+        and returned as memoryview slices of the buffer read. If the file
+        is memory-mapped (usemmap), segments are slices of the map.
+
         """
         length = len(offsets)
         if length < 1:
             return
+        if self.usemmap:
+            view = self._memoryview()
+            if view is not None:
+                start = self._offset
+                for offset, bytecount in zip(offsets, bytecounts):
+                    if offset > 0 and bytecount > 0:
+                        offset += start
+                        yield view[offset: offset + bytecount]
+                    else:
+                        yield None
+                return
+        if maxgap is None:
+            maxgap = self.maxgap
+        if length == 1 or maxgap < 0:
+            for segment in self._read_segments_separately(
+                offsets, bytecounts, lock, buffersize
+            ):
+                yield segment
+            return
+
+        if lock is None:
+            lock = self._lock
+        if buffersize is None:
+            buffersize = 2**26  # 64 MB
+
+        seek = self.seek
+        read = self._fh.read
+        index = 0
+        while index < length:
+            # segments up to buffersize bytes, in file order
+            batch = []
+            size = 0
+            first = index
+            while size < buffersize and index < length:
+                offset = offsets[index]
+                bytecount = bytecounts[index]
+                if offset > 0 and bytecount > 0:
+                    batch.append((offset, bytecount, index - first))
+                    size += bytecount
+                index += 1
+            batch.sort()
+            segments = [None] * (index - first)
+            with lock:
+                i = 0
+                while i < len(batch):
+                    # coalesce segments into one read
+                    start = batch[i][0]
+                    end = start + batch[i][1]
+                    j = i + 1
+                    while j < len(batch):
+                        offset, bytecount, _ = batch[j]
+                        if (
+                            offset - end > maxgap
+                            or offset + bytecount - start > buffersize
+                        ):
+                            break
+                        end = max(end, offset + bytecount)
+                        j += 1
+                    seek(start)
+                    if j == i + 1:
+                        segments[batch[i][2]] = read(end - start)
+                    else:
+                        view = memoryview(read(end - start))
+                        for offset, bytecount, k in batch[i:j]:
+                            offset -= start
+                            segments[k] = view[offset: offset + bytecount]
+                    i = j
+            for segment in segments:
+                yield segment
+
+    def _read_segments_separately(self, offsets, bytecounts, lock=None,
+                                  buffersize=None):
+        """Return iterator over segments read one by one from file."""
+        length = len(offsets)
         if length == 1:
             if bytecounts[0] > 0 and offsets[0] > 0:
                 if lock is None:
@@ -6253,8 +7538,30 @@ class FileHandle(object):
                 return
         self._fh.seek(offset, whence)
 
+    def _memoryview(self):
+        """Return memoryview of read-only memory-map of file or None."""
+        if self._mmap is None:
+            if not self.is_file or self._fh is None or 'r' not in self._mode:
+                return None
+            import mmap
+            try:
+                self._mmap = mmap.mmap(self._fh.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as exc:
+                log_warning('FileHandle: failed to memory-map %s: %s',
+                            self._name, str(exc))
+                self.usemmap = False
+                return None
+        return memoryview(self._mmap)
+
     def close(self):
         """Close file."""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # segments still in use; unmapped when released
+            self._mmap = None
         if self._close and self._fh:
             self._fh.close()
             self._fh = None
@@ -7179,6 +8486,11 @@ class TIFF(object):
     def TAG_NAMES():
         return {v: c for c, v in TIFF.TAGS.items()}
 
+    def TAG_CODES():
+        # Map tag codes to shared int objects, which TiffTags reference
+        # instead of allocating one int per tag of each page
+        return {c: c for c in TIFF.TAGS}
+
     def TAG_READERS():
         # Map TIFF tag codes to import functions
         return {
@@ -7628,6 +8940,7 @@ class TIFF(object):
                 None: identityfunc,
                 1: identityfunc,
                 2: delta_encode,
+                3: floatpred_encode,
             }
         return {
             None: imagecodecs.none_encode,
@@ -7643,6 +8956,7 @@ class TIFF(object):
                 None: identityfunc,
                 1: identityfunc,
                 2: delta_decode,
+                3: floatpred_decode,
             }
         return {
             None: imagecodecs.none_decode,
@@ -7723,8 +9037,10 @@ class TIFF(object):
             return {
                 None: identityfunc,
                 1: identityfunc,
+                5: lzw_decode,
                 8: zlib_decode,
                 32946: zlib_decode,
+                32773: packbits_decode,
                 # 34925: lzma.decompress
             }
 
@@ -10096,20 +11412,47 @@ def tile_decode(tile, tileindex, tileshape, tiledshape,
                 lsb2msb, decompress, unpack, unpredict, nodata, out):
     """Decode tile segment bytes into 5D output array."""
     _, imagedepth, imagelength, imagewidth, _ = out.shape
-    tileddepth, tiledlength, tiledwidth = tiledshape
-    tiledepth, tilelength, tilewidth, samples = tileshape
-    tilesize = tiledepth * tilelength * tilewidth * samples
-    pl = tileindex // (tiledwidth * tiledlength * tileddepth)
-    td = (tileindex // (tiledwidth * tiledlength)) % tileddepth * tiledepth
-    tl = (tileindex // tiledwidth) % tiledlength * tilelength
-    tw = tileindex % tiledwidth * tilewidth
-
     if tile is None:
+        pl, td, tl, tw = tile_indices(tileindex, tileshape, tiledshape)
+        tiledepth, tilelength, tilewidth, _ = tileshape
         out[pl,
             td: td + tiledepth,
             tl: tl + tilelength,
             tw: tw + tilewidth] = nodata
         return
+    (pl, td, tl, tw), tile = tile_segment_decode(
+        tile, tileindex, tileshape, tiledshape,
+        (imagedepth, imagelength, imagewidth),
+        lsb2msb, decompress, unpack, unpredict)
+    out[pl,
+        td: td + tile.shape[0],
+        tl: tl + tile.shape[1],
+        tw: tw + tile.shape[2]] = tile
+
+
+def tile_indices(tileindex, tileshape, tiledshape):
+    """Return indices of first pixel of tile in 5D image array."""
+    tileddepth, tiledlength, tiledwidth = tiledshape
+    tiledepth, tilelength, tilewidth, _ = tileshape
+    pl = tileindex // (tiledwidth * tiledlength * tileddepth)
+    td = (tileindex // (tiledwidth * tiledlength)) % tileddepth * tiledepth
+    tl = (tileindex // tiledwidth) % tiledlength * tilelength
+    tw = tileindex % tiledwidth * tilewidth
+    return pl, td, tl, tw
+
+
+def tile_segment_decode(tile, tileindex, tileshape, tiledshape, imageshape,
+                        lsb2msb, decompress, unpack, unpredict):
+    """Decode tile segment bytes.
+
+    Return indices of first pixel of tile in 5D image array and 4D tile
+    array clipped to imageshape (depth, length, width).
+
+    """
+    imagedepth, imagelength, imagewidth = imageshape
+    tiledepth, tilelength, tilewidth, samples = tileshape
+    tilesize = tiledepth * tilelength * tilewidth * samples
+    pl, td, tl, tw = tile_indices(tileindex, tileshape, tiledshape)
 
     if lsb2msb:
         tile = bitorder_decode(tile, out=tile)
@@ -10139,12 +11482,163 @@ def tile_decode(tile, tileindex, tileshape, tiledshape,
             t[:s] = tile[:s]
             tile = t.reshape(tileshape)
     tile = unpredict(tile, axis=-2, out=tile)
-    out[pl,
-        td: td + tiledepth,
-        tl: tl + tilelength,
-        tw: tw + tilewidth] = tile[:imagedepth - td,
-                                   :imagelength - tl,
-                                   :imagewidth - tw]
+    return (pl, td, tl, tw), tile[:imagedepth - td,
+                                  :imagelength - tl,
+                                  :imagewidth - tw]
+
+
+def read_region(page, y0, y1, x0, x1, squeeze=True, lock=None,
+                maxworkers=None, buffersize=None):
+    """Return image data in rows y0:y1 and columns x0:x1 of page.
+
+    Only the strips or tiles of the TiffPage or TiffFrame that intersect
+    the region are read from file and decoded, in batches of about
+    buffersize bytes (see TiffPage.segments), so that memory use is
+    proportional to the region rather than the page.
+
+    If squeeze is True (default), the array has the shape of page.shape
+    with the length and width of the region. Else it has the normalized
+    6D shape of the page.
+
+    >>> data = numpy.arange(64 * 64, dtype='uint16').reshape(64, 64)
+    >>> imwrite('temp.tif', data, tile=(16, 16), compress=6)
+    >>> with TiffFile('temp.tif') as tif:
+    ...     region = read_region(tif.pages[0], 10, 20, 30, 50)
+    >>> numpy.array_equal(region, data[10:20, 30:50])
+    True
+
+    """
+    keyframe = page.keyframe
+    shape = keyframe._shape
+    y0 = max(y0, 0)
+    x0 = max(x0, 0)
+    y1 = min(y1, keyframe.imagelength)
+    x1 = min(x1, keyframe.imagewidth)
+    if y1 <= y0 or x1 <= x0:
+        raise ValueError('empty region [%i:%i, %i:%i]' % (y0, y1, x0, x1))
+    result = numpy.empty(
+        shape[:3] + (y1 - y0, x1 - x0, shape[5]), keyframe.dtype)
+    result[:] = keyframe.nodata  # missing segments
+    for (plane, sample, depth, y, x), segment in page.segments(
+        y0, y1, x0, x1, lock=lock, maxworkers=maxworkers,
+        buffersize=buffersize
+    ):
+        sy0 = max(y0 - y, 0)
+        sy1 = min(y1 - y, segment.shape[1])
+        sx0 = max(x0 - x, 0)
+        sx1 = min(x1 - x, segment.shape[2])
+        result[plane,
+               sample,
+               depth: depth + segment.shape[0],
+               y + sy0 - y0: y + sy1 - y0,
+               x + sx0 - x0: x + sx1 - x0] = segment[:, sy0:sy1, sx0:sx1]
+    if squeeze:
+        # shape of page with the region's length and width
+        squeezed = list(keyframe.shape)
+        i = -3 if shape[5] > 1 else -2
+        squeezed[i] = y1 - y0
+        squeezed[i + 1] = x1 - x0
+        try:
+            result.shape = squeezed
+        except ValueError:
+            log_warning('read_region: failed to reshape %s to %s',
+                        result.shape, squeezed)
+    return result
+
+
+def iter_tiles(data, tile, tiles):
+    """Return iterator over tiles of image array in TIFF storage order.
+
+    Data is a 5D array of shape (planar samples, depth, length, width,
+    contig samples). Tile is the ([depth,] length, width) shape of tiles
+    and tiles the number of tiles along the same dimensions.
+    Tiles at the image edges are zero padded to the full tile shape.
+
+    """
+    if len(tile) == 2:
+        tile = (1,) + tuple(tile)
+        tiles = (1,) + tuple(tiles)
+    shape = data.shape
+    for plane in data:
+        for tz in range(tiles[0]):
+            for ty in range(tiles[1]):
+                for tx in range(tiles[2]):
+                    c0 = min(tile[0], shape[1] - tz * tile[0])
+                    c1 = min(tile[1], shape[2] - ty * tile[1])
+                    c2 = min(tile[2], shape[3] - tx * tile[2])
+                    chunk = numpy.empty(tile + (shape[-1],), data.dtype)
+                    if (c0, c1, c2) != tile:
+                        chunk[c0:] = 0
+                        chunk[:, c1:] = 0
+                        chunk[:, :, c2:] = 0
+                    chunk[:c0, :c1, :c2] = plane[
+                        tz * tile[0]: tz * tile[0] + c0,
+                        ty * tile[1]: ty * tile[1] + c1,
+                        tx * tile[2]: tx * tile[2] + c2,
+                    ]
+                    yield chunk
+
+
+def encode_segments(segments, encode, executor=None, maxpending=16):
+    """Return iterator over encoded segments, in order of segments.
+
+    If executor is a ThreadPoolExecutor, segments are encoded concurrently,
+    but no more than maxpending segments ahead of the consumer, such that
+    memory use is bounded for long segment iterators.
+
+    """
+    if executor is None:
+        for segment in segments:
+            yield encode(segment)
+        return
+    pending = collections.deque()
+    for segment in segments:
+        pending.append(executor.submit(encode, segment))
+        if len(pending) >= maxpending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def downsample2(data, method='mean'):
+    """Return image array reduced by a factor of two in length and width.
+
+    Data is a 3D array of shape (length, width, samples). Odd lengths and
+    widths are rounded up.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        Image to reduce.
+    method : str or callable
+        'mean': average 2x2 pixel blocks (default). Integers are rounded.
+        'nearest': take the first pixel of each 2x2 block.
+        A callable is passed the data and must return the reduced image.
+
+    >>> downsample2(numpy.arange(9).reshape(3, 3, 1))[..., 0]
+    array([[2, 4],
+           [7, 8]])
+
+    """
+    if callable(method):
+        return method(data)
+    if method == 'nearest':
+        return data[::2, ::2]
+    if method != 'mean':
+        raise ValueError('invalid downsample method %s' % method)
+    length, width, samples = data.shape
+    if length % 2:
+        data = numpy.concatenate((data, data[-1:]), axis=0)
+    if width % 2:
+        data = numpy.concatenate((data, data[:, -1:]), axis=1)
+    data = data.reshape(
+        (length + 1) // 2, 2, (width + 1) // 2, 2, samples)
+    if data.dtype.kind in 'iu':
+        result = data.sum(axis=(1, 3), dtype='int64')
+        result += 2
+        result //= 4
+        return result.astype(data.dtype)
+    return data.mean(axis=(1, 3)).astype(data.dtype)
 
 
 def unpack_rgb(data, dtype=None, bitspersample=None, rescale=True):
@@ -10241,6 +11735,160 @@ def delta_decode(data, axis=-1, out=None):
     return numpy.cumsum(data, axis=axis, dtype=data.dtype, out=out)
 
 
+def floatpred_decode(data, axis=-1, out=None):
+    """Decode floating-point horizontal differencing.
+
+    The TIFF predictor 3 stores each row as the bytes of its values
+    grouped by significance (all most significant bytes first), then
+    byte-wise horizontally differenced with a stride of one sample.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        Floating-point array holding the undecoded bytes of the file in
+        native order. Rows run along `axis`; any axes after it are samples.
+    axis : int
+        Axis of the row, usually the image width.
+    out : numpy.ndarray
+        Optional array in which to store the result. Can be `data`.
+
+    Examples
+    --------
+    >>> data = numpy.array([[1.0, 2.0, 4.0]], 'f4')
+    >>> floatpred_decode(floatpred_encode(data), axis=-1)
+    array([[1., 2., 4.]], dtype=float32)
+
+    """
+    if data.dtype.kind != 'f':
+        raise ValueError('not a floating-point array')
+    axis = axis % data.ndim
+    shape = data.shape
+    dtype = data.dtype
+    itemsize = dtype.itemsize
+    samples = product(shape[axis + 1:])
+    rowlen = shape[axis] * samples
+    rows = numpy.ascontiguousarray(data).view('u1').reshape(-1, rowlen * itemsize)
+    rows = numpy.cumsum(rows.reshape(rows.shape[0], -1, samples), axis=1,
+                        dtype='u1')
+    rows = rows.reshape(-1, itemsize, rowlen).transpose(0, 2, 1)
+    result = numpy.ascontiguousarray(rows).view('>' + dtype.char)
+    result = result.reshape(shape)
+    if out is not None and out.flags.writeable and out.shape == shape:
+        out[...] = result
+        return out
+    return result.astype(dtype.newbyteorder('='), copy=False)
+
+
+def floatpred_encode(data, axis=-1, out=None):
+    """Encode floating-point horizontal differencing.
+
+    The inverse of floatpred_decode, returning an array of the same
+    shape and dtype as data holding the encoded bytes.
+
+    """
+    if data.dtype.kind != 'f':
+        raise ValueError('not a floating-point array')
+    axis = axis % data.ndim
+    shape = data.shape
+    dtype = data.dtype
+    itemsize = dtype.itemsize
+    samples = product(shape[axis + 1:])
+    rowlen = shape[axis] * samples
+    rows = numpy.ascontiguousarray(data, '>' + dtype.char).view('u1')
+    rows = rows.reshape(-1, rowlen, itemsize).transpose(0, 2, 1)
+    rows = numpy.ascontiguousarray(rows).reshape(-1, rowlen * itemsize // samples,
+                                                 samples)
+    diff = numpy.diff(rows, axis=1)
+    rows = numpy.concatenate([rows[:, :1], diff], axis=1)
+    return rows.reshape(-1).view(dtype).reshape(shape)
+
+
+def lzw_decode(encoded, buffersize=0, out=None):
+    """Decompress LZW (Lempel-Ziv-Welch) encoded TIFF strip (byte string).
+
+    Codes are 9 to 12 bits, most significant bit first, and widen one
+    code before the table fills (the TIFF "early change" convention).
+    The decoding is sequential by nature, so this is much slower than
+    the imagecodecs implementation.
+
+    Examples
+    --------
+    >>> lzw_decode(b'\\x80\\x1c\\xcc\\'\\x91\\x01\\xa0\\xc2m6\\x99NB\\x03\\xc9\\xbe\\x0b'
+    ...            b'\\x07\\x84\\xc2\\xcd\\xa68|"\\x14 3\\xc3\\xa0\\xd1c\\x94\\x04')
+    b'say hammer yo hammer mc hammer go hammer'
+
+    """
+    encoded = bytes(encoded)
+    if encoded[:2] == b'\x00\x01':
+        raise NotImplementedError('old-style LZW codes not supported')
+    maxbits = len(encoded) * 8
+    encoded += b'\x00\x00\x00\x00'
+    unpack = struct.Struct('>I').unpack_from
+    table = [bytes((i,)) for i in range(256)] + [b'', b'']
+    result = []
+    append = result.append
+    bitcount = 0
+    bitw = 9
+    shr = 32 - bitw
+    mask = 511
+    previous = None
+    while bitcount + bitw <= maxbits:
+        code = (unpack(encoded, bitcount >> 3)[0] >> (shr - (bitcount & 7))) & mask
+        bitcount += bitw
+        if code == 257:  # EOI
+            break
+        if code == 256:  # CLEAR
+            del table[258:]
+            bitw = 9
+            shr = 32 - bitw
+            mask = 511
+            previous = None
+            continue
+        if code < len(table):
+            decoded = table[code]
+            if previous is not None:
+                table.append(previous + decoded[:1])
+        elif code == len(table) and previous is not None:
+            decoded = previous + previous[:1]
+            table.append(decoded)
+        else:
+            raise ValueError('corrupted LZW stream: code %i out of range' % code)
+        append(decoded)
+        previous = decoded
+        lentable = len(table)
+        if lentable >= mask and bitw < 12:
+            bitw += 1
+            shr -= 1
+            mask = (mask << 1) | 1
+    return b''.join(result)
+
+
+def packbits_decode(encoded, out=None):
+    """Decompress PackBits encoded byte string.
+
+    Examples
+    --------
+    >>> packbits_decode(b'\\xfe\\xaa\\x02\\x80\\x00\\x2a\\xf7\\xaa')
+    b'\\xaa\\xaa\\xaa\\x80\\x00*\\xaa\\xaa\\xaa\\xaa\\xaa\\xaa\\xaa\\xaa\\xaa\\xaa'
+
+    """
+    encoded = bytes(encoded)
+    result = []
+    append = result.append
+    i = 0
+    n = len(encoded)
+    while i < n:
+        header = encoded[i]
+        i += 1
+        if header < 128:
+            append(encoded[i:i + header + 1])
+            i += header + 1
+        elif header > 128 and i < n:
+            append(encoded[i:i + 1] * (257 - header))
+            i += 1
+    return b''.join(result)
+
+
 def bitorder_decode(data, out=None, _bitorder=[]):
     """Reverse bits in each byte of byte string or numpy array.
 
@@ -10285,6 +11933,8 @@ def bitorder_decode(data, out=None, _bitorder=[]):
         numpy.take(_bitorder[1], view, out=view)
         return data
     except AttributeError:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
         return data.translate(_bitorder[0])
     except ValueError:
         raise NotImplementedError('slices of arrays not supported')
@@ -10294,8 +11944,9 @@ def bitorder_decode(data, out=None, _bitorder=[]):
 def packints_decode(data, dtype, numbits, runlen=0, out=None):
     """Decompress byte string to array of integers.
 
-    This implementation only handles itemsizes 1, 8, 16, 32, and 64 bits.
-    Install the imagecodecs package for decoding other integer sizes.
+    Integers of 1 to 64 bits are unpacked most significant bit first.
+    Sizes other than 1, 8, 16, 32 and 64 bits are unpacked bit by bit,
+    which is slower than the imagecodecs implementation.
 
     Parameters
     ----------
@@ -10312,6 +11963,8 @@ def packints_decode(data, dtype, numbits, runlen=0, out=None):
     --------
     >>> packints_decode(b'a', 'B', 1)
     array([0, 1, 1, 0, 0, 0, 0, 1], dtype=uint8)
+    >>> packints_decode(b'\\x12\\x34\\x50', 'H', 12)
+    array([ 291, 1104], dtype=uint16)
 
     """
     if numbits == 1:  # bitarray
@@ -10323,9 +11976,34 @@ def packints_decode(data, dtype, numbits, runlen=0, out=None):
         return data.astype(dtype)
     if numbits in (8, 16, 32, 64):
         return numpy.frombuffer(data, dtype)
-    raise NotImplementedError(
-        'unpacking %s-bit integers to %s not supported'
-        % (numbits, numpy.dtype(dtype)))
+    if not 0 < numbits < 64:
+        raise NotImplementedError(
+            'unpacking %s-bit integers to %s not supported'
+            % (numbits, numpy.dtype(dtype)))
+    bits = numpy.unpackbits(numpy.frombuffer(data, '|B'))
+    if runlen:
+        rowbits = (runlen * numbits + 7) // 8 * 8
+        nrows = bits.size // rowbits
+        bits = bits[:nrows * rowbits].reshape(nrows, rowbits)
+        bits = bits[:, :runlen * numbits]
+    count = bits.size // numbits
+    bits = bits.reshape(-1)[:count * numbits].reshape(count, numbits)
+    itembits = next(i for i in (8, 16, 32, 64) if i >= numbits)
+    padded = numpy.zeros((count, itembits), '|B')
+    padded[:, itembits - numbits:] = bits
+    values = numpy.packbits(padded, axis=-1).view('>u%i' % (itembits // 8))
+    return values.reshape(-1).astype(dtype)
+
+
+# The NumPy implementations, which imagecodecs replaces where installed
+NUMPY_CODECS = {
+    'bitorder_decode': bitorder_decode,
+    'packints_decode': packints_decode,
+    'delta_decode': delta_decode,
+    'floatpred_decode': floatpred_decode,
+    'lzw_decode': lzw_decode,
+    'packbits_decode': packbits_decode,
+}
 
 
 if imagecodecs is not None:
@@ -12112,7 +13790,7 @@ def decodelzw(encoded):
     warnings.warn(
         'The decodelzw function was removed from the tifffile package.\n'
         'Use the lzw_decode function from the imagecodecs package instead.')
-    return imagecodecs.lzw_decode(encoded)
+    return TIFF.DECOMPESSORS[5](encoded)
 
 
 decode_lzw = decodelzw
@@ -0,0 +1,221 @@
+#! /usr/bin/env python
+
+"""
+A streaming replacement for xmltodict.parse built on lxml.etree.iterparse.
+
+Elements are converted as soon as they are complete and are then removed
+from the partial tree, so memory use is bounded by the size of the
+resulting dict rather than the dict plus a full document tree.  Subtrees
+can be pruned by path while parsing, which is what makes this worthwhile
+for OME-XML with one <Plane> and <TiffData> element per image plane.
+
+Without pruning the result is the same as xmltodict.parse with its default
+options (process_namespaces=False), with one exception: lxml does not
+report where namespace declarations appear among an element's attributes,
+so '@xmlns' entries are always placed before the other attributes.  XML
+writers almost always emit them first anyway.
+
+Paths are '/'-separated element names as they appear in the document
+(including any namespace prefix), starting with the root element, for
+example 'OME/Image/Pixels/Plane'.  Each segment may be an fnmatch-style
+pattern, so 'OME/*/Pixels/Plane' matches Plane elements in every Image.
+"""
+
+from io import BytesIO
+from fnmatch import fnmatchcase
+
+import xmltodict
+from lxml import etree
+
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+# Match the dict type of the installed xmltodict (OrderedDict before 0.13)
+DEFAULT_DICT = type(xmltodict.parse('<a b="c"/>')['a'])
+
+KEEP, KEEP_ANCESTOR, SKIP = 'keep', 'keep_ancestor', 'skip'
+
+# Completed children are removed from the partial tree in batches of this size
+PRUNE_BATCH = 64
+
+
+class PathFilter(object):
+    """
+    Decides whether an element is kept, given its path from the root.  An
+    element is skipped if it is at or below an exclude path.  If include
+    paths are given, an element is kept only if it is at or below one of
+    them, or is an ancestor of one; ancestors keep their attributes and
+    text but only the children leading to included paths.
+    """
+    def __init__(self, include=None, exclude=None):
+        self.include = [tuple(path.strip('/').split('/')) for path in include or []]
+        self.exclude = [tuple(path.strip('/').split('/')) for path in exclude or []]
+        self._cache = {}
+
+    @staticmethod
+    def _prefix_match(path, pattern):
+        return all(fnmatchcase(seg, pat) for seg, pat in zip(path, pattern))
+
+    def state(self, path):
+        """
+        Returns KEEP, KEEP_ANCESTOR or SKIP for the element at path, a tuple
+        of element names
+        """
+        rslt = self._cache.get(path)
+        if rslt is None:
+            rslt = self._state(path)
+            self._cache[path] = rslt
+        return rslt
+
+    def _state(self, path):
+        for pattern in self.exclude:
+            if len(path) >= len(pattern) and self._prefix_match(path, pattern):
+                return SKIP
+        if not self.include:
+            return KEEP
+        rslt = SKIP
+        for pattern in self.include:
+            if self._prefix_match(path, pattern):
+                if len(path) >= len(pattern):
+                    return KEEP
+                rslt = KEEP_ANCESTOR
+        return rslt
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[1] if tag[:1] == '{' else tag
+
+
+def _qualified_name(elt):
+    local = _local_name(elt.tag)
+    return '{}:{}'.format(elt.prefix, local) if elt.prefix else local
+
+
+def _attr_name(key, elt):
+    uri, local = key[1:].split('}', 1)
+    if uri == XML_NAMESPACE:
+        return 'xml:' + local
+    for prefix, ns_uri in elt.nsmap.items():
+        if prefix and ns_uri == uri:
+            return '{}:{}'.format(prefix, local)
+    return key
+
+
+def _push_data(item, key, data, dict_constructor):
+    if item is None:
+        item = dict_constructor()
+    if key in item:
+        value = item[key]
+        if isinstance(value, list):
+            value.append(data)
+        else:
+            item[key] = [value, data]
+    else:
+        item[key] = data
+    return item
+
+
+def _events(source, encoding):
+    """
+    Returns (events, clear), where clear says whether processed elements
+    may be removed from the tree
+    """
+    events = ('start', 'end', 'start-ns')
+    if etree.iselement(source):
+        # An already parsed tree belongs to the caller; walk it unchanged
+        return etree.iterwalk(source, events=events), False
+    if isinstance(source, str):
+        source = BytesIO(source.encode(encoding or 'utf-8'))
+        encoding = encoding or 'utf-8'
+    elif isinstance(source, bytes):
+        source = BytesIO(source)
+    return etree.iterparse(source, events=events, encoding=encoding, huge_tree=True,
+                           remove_comments=False, resolve_entities=False), True
+
+
+def parse(source, include=None, exclude=None, encoding=None, attr_prefix='@',
+          cdata_key='#text', dict_constructor=DEFAULT_DICT):
+    """
+    Convert an XML document to nested dicts as xmltodict.parse does.
+
+    source may be XML text (str or bytes), a file name or file object, or an
+    lxml element, which is walked without being modified.  include and
+    exclude are lists of paths, as described for PathFilter.  Returns None
+    if the root element itself is excluded.
+    """
+    path_filter = PathFilter(include, exclude) if include or exclude else None
+    events, clear = _events(source, encoding)
+    names = {}  # (tag, prefix) -> qualified name
+    stack = []  # [elt, item, tails, name, n_new_children] for each open element
+    path = []
+    ns_decls = []
+    skip_depth = 0
+    rslt = None
+    for event, elt in events:
+        if event == 'start':
+            if clear and stack:
+                parent = stack[-1]
+                parent[4] += 1
+                if parent[4] > PRUNE_BATCH:
+                    # Earlier siblings are complete, tails included.  The
+                    # parser may have read ahead, so elt need not be the
+                    # last child.
+                    parent_elt = parent[0]
+                    idx = parent_elt.index(elt)
+                    if parent[2] is not None:
+                        parent[2].extend(child.tail for child in parent_elt[:idx])
+                    del parent_elt[:idx]
+                    parent[4] = 0
+            tag_key = (elt.tag, elt.prefix)
+            name = names.get(tag_key)
+            if name is None:
+                name = names[tag_key] = _qualified_name(elt)
+            if path_filter is not None:
+                path.append(name)
+                if skip_depth or path_filter.state(tuple(path)) == SKIP:
+                    skip_depth += 1
+                    ns_decls = []
+                    stack.append([elt, None, None, name, 0])
+                    continue
+            attrs = [(attr_prefix + ('xmlns:' + prefix if prefix else 'xmlns'), uri)
+                     for prefix, uri in ns_decls] if ns_decls else []
+            ns_decls = []
+            for key, value in elt.attrib.items():
+                if key[:1] == '{':
+                    key = _attr_name(key, elt)
+                attrs.append((attr_prefix + key, value))
+            stack.append([elt, dict_constructor(attrs) if attrs else None, [], name, 0])
+        elif event == 'end':
+            _, item, tails, name, _ = stack.pop()
+            if path_filter is not None:
+                path.pop()
+                if skip_depth:
+                    # An excluded element's tail still belongs to its parent's text
+                    skip_depth -= 1
+                    if clear:
+                        del elt[:]
+                    continue
+            data = elt.text
+            if tails or len(elt):
+                pieces = [data] + tails + [child.tail for child in elt]
+                data = ''.join(piece for piece in pieces if piece)
+                if clear:
+                    del elt[:]
+            if clear:
+                elt.text = None
+            if data:
+                data = data.strip() or None
+            else:
+                data = None
+            if item is not None:
+                if data:
+                    _push_data(item, cdata_key, data, dict_constructor)
+                value = item
+            else:
+                value = data
+            if stack:
+                stack[-1][1] = _push_data(stack[-1][1], name, value, dict_constructor)
+            else:
+                rslt = _push_data(None, name, value, dict_constructor)
+        else:  # 'start-ns'
+            ns_decls.append(elt)
+    return rslt